@@ -11,6 +11,7 @@ from airport.models import (
     Flight,
     Order,
     Ticket, City, Country,
+    SeatHold,
 )
 
 
@@ -138,3 +139,12 @@ class TicketAdmin(admin.ModelAdmin):
         "seat",
         "flight"
     ]
+
+
+@admin.register(SeatHold)
+class SeatHoldAdmin(admin.ModelAdmin):
+    list_display = [
+        "user",
+        "flight",
+        "expires_at"
+    ]
@@ -0,0 +1,18 @@
+from django.urls import re_path
+
+from airport.async_views import (
+    flight_list,
+    flight_detail,
+    flight_seats,
+    airport_autocomplete,
+)
+
+# Paths of the router's views with numeric pks only, so other routes
+# like public-flights/availability/ and requests with a format suffix
+# still reach ROOT_URLCONF
+urlpatterns = [
+    re_path(r"^public-flights/$", flight_list),
+    re_path(r"^public-flights/(?P<pk>[0-9]+)/$", flight_detail),
+    re_path(r"^public-flights/(?P<pk>[0-9]+)/seats/$", flight_seats),
+    re_path(r"^airports/autocomplete/$", airport_autocomplete),
+]
@@ -0,0 +1,172 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django_filters.utils import translate_validation
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAcceptable, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from airport.autocomplete import aget_index, search_limit
+from airport.filters import FlightFilter
+from airport.models import Flight
+from airport.pagination import AsyncFlightCursorPagination
+from airport.readers import flight_reader
+from airport.response_cache import acached_response, response_cache_key
+from airport.seats import seat_map, taken_seats
+from airport.shapes import EXPAND_ALL, Shape
+from airport.urls import router
+
+ALLOWED_METHODS = "GET, HEAD, OPTIONS"
+
+NOT_FOUND = "No Flight matches the given query."
+
+# The DRF views requests the async views can't serve are passed on to
+DRF_VIEWS = {pattern.name: pattern.callback for pattern in router.urls}
+drf_flight_list = sync_to_async(DRF_VIEWS["flight-list"])
+drf_flight_detail = sync_to_async(DRF_VIEWS["flight-detail"])
+drf_flight_seats = sync_to_async(DRF_VIEWS["flight-seats"])
+drf_airport_autocomplete = sync_to_async(DRF_VIEWS["airport-autocomplete"])
+
+
+def renders_json(request):
+    """Whether the DRF view would answer request with JSONRenderer"""
+    negotiator = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS()
+    renderers = [
+        renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+    ]
+    try:
+        renderer, _ = negotiator.select_renderer(Request(request), renderers)
+    except NotAcceptable:
+        return False
+    return isinstance(renderer, JSONRenderer)
+
+
+def serves_async(request, authenticated=True):
+    """Whether an async view renders what the DRF view would
+
+    Anything else, from other methods and renderers to credentials the
+    DRF view would check, is passed on to the DRF view.
+    """
+    return (
+        request.method in ("GET", "HEAD")
+        and not (authenticated and "Authorization" in request.headers)
+        and renders_json(request)
+    )
+
+
+def serves_default_shape(request):
+    shape = Shape.from_query_params(request.GET)
+    return shape.fields is None and shape.expand is EXPAND_ALL
+
+
+def render(data, status_code=status.HTTP_200_OK):
+    response = HttpResponse(
+        JSONRenderer().render(data),
+        content_type="application/json",
+        status=status_code,
+    )
+    response["Vary"] = "Accept"
+    response["Allow"] = ALLOWED_METHODS
+    return response
+
+
+def render_error(exc):
+    """Response rest_framework.views.exception_handler would give"""
+    data = exc.detail
+    if not isinstance(data, (list, dict)):
+        data = {"detail": data}
+    return render(data, exc.status_code)
+
+
+def flight_rows(queryset=None):
+    if queryset is None:
+        queryset = Flight.objects.all()
+    return queryset.with_available_seats().values(*flight_reader.fields)
+
+
+def filter_flights(request):
+    """Flights filtered like DjangoFilterBackend does for FlightViewSet
+
+    Filters on city and country names add subqueries and run no queries
+    themselves, the queryset is evaluated by the async ORM.
+    """
+    filterset = FlightFilter(
+        request.GET, queryset=Flight.objects.all(), request=request
+    )
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+    return filterset.qs
+
+
+@csrf_exempt
+async def flight_list(request):
+    """FlightViewSet.list served by the async ORM"""
+    if not (serves_async(request) and serves_default_shape(request)):
+        return await drf_flight_list(request)
+
+    async def build():
+        queryset = filter_flights(request)
+        paginator = AsyncFlightCursorPagination()
+        drf_request = Request(request)
+        page = await paginator.apaginate_queryset(
+            flight_rows(queryset), drf_request
+        )
+        return paginator.get_paginated_response(
+            await flight_reader.aread(page)
+        ).data
+
+    key = response_cache_key(request, "flight", "list", {})
+    try:
+        return await acached_response(request, key, build, render)
+    except APIException as exc:
+        return render_error(exc)
+
+
+@csrf_exempt
+async def flight_detail(request, pk):
+    """FlightViewSet.retrieve served by the async ORM"""
+    if not (serves_async(request) and serves_default_shape(request)):
+        return await drf_flight_detail(request, pk=pk)
+
+    async def build():
+        rows = [row async for row in flight_rows().filter(pk=pk)]
+        if not rows:
+            raise NotFound(NOT_FOUND)
+        flight, = await flight_reader.aread(rows)
+        return flight
+
+    key = response_cache_key(request, "flight", "retrieve", {"pk": pk})
+    try:
+        return await acached_response(request, key, build, render)
+    except APIException as exc:
+        return render_error(exc)
+
+
+@csrf_exempt
+async def flight_seats(request, pk):
+    """FlightViewSet.seats served by the async ORM"""
+    if not serves_async(request):
+        return await drf_flight_seats(request, pk=pk)
+
+    flight = await (
+        Flight.objects.select_related("airplane").filter(pk=pk).afirst()
+    )
+    if flight is None:
+        return render_error(NotFound(NOT_FOUND))
+    return render(
+        seat_map(flight, [seat async for seat in taken_seats(flight)])
+    )
+
+
+@csrf_exempt
+async def airport_autocomplete(request):
+    """AirportViewSet.autocomplete served by the async ORM"""
+    if not serves_async(request, authenticated=False):
+        return await drf_airport_autocomplete(request)
+
+    index = await aget_index()
+    query = request.GET.get("q", "")
+    limit = search_limit(request.GET.get("limit"))
+    return render(index.search(query, limit=limit))
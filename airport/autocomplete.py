@@ -0,0 +1,198 @@
+import heapq
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from airport.models import Airport
+from airport.search import normalize_search_key
+from airport.versions import aget_version, get_version
+
+VERSION_NAME = "autocomplete"
+
+MAX_CACHED_RESULTS = 4096
+
+DEFAULT_LIMIT = 10
+
+MAX_LIMIT = 50
+
+# Typo variants cost O(query length x alphabet), longer queries match
+# exactly only
+MAX_TYPO_QUERY_LENGTH = 64
+
+AIRPORT_FIELDS = ("id", "name", "city__name", "country__name")
+
+# Airport names rank before city names, city names before country names
+FIELD_RANKS = {"name": 0, "city": 1, "country": 2}
+
+
+def one_typo_variants(word, alphabet):
+    """Strings one deletion, transposition, replacement or insertion away"""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    variants = set()
+    for head, tail in splits:
+        if tail:
+            variants.add(head + tail[1:])
+            variants.update(head + char + tail[1:] for char in alphabet)
+        if len(tail) > 1:
+            variants.add(head + tail[1] + tail[0] + tail[2:])
+        variants.update(head + char + tail for char in alphabet)
+    variants.discard(word)
+    return variants
+
+
+def airport_entry(airport):
+    return {
+        "id": airport["id"],
+        "name": airport["name"],
+        "city": airport["city__name"],
+        "country": airport["country__name"],
+    }
+
+
+def search_limit(value):
+    """Number of suggestions asked for by ?limit=, at most MAX_LIMIT"""
+    try:
+        return min(int(value), MAX_LIMIT)
+    except (TypeError, ValueError):
+        return DEFAULT_LIMIT
+
+
+class AutocompleteIndex:
+    """Sorted array of name words for prefix and typo tolerant lookups"""
+
+    def __init__(self, airports):
+        self.airports = {}
+        postings = defaultdict(set)
+        for airport in airports:
+            self.airports[airport["id"]] = airport
+            for field, rank in FIELD_RANKS.items():
+                key = normalize_search_key(airport[field])
+                for word in {key, *key.split()}:
+                    postings[word].add((rank, airport["name"], airport["id"]))
+        self.keys = sorted(postings)
+        self.max_key_length = max(map(len, self.keys), default=0)
+        self.postings = {
+            key: sorted(airports) for key, airports in postings.items()
+        }
+        self.alphabet = set("".join(self.keys)) - {" "}
+        # Typeahead repeats the same short queries, which match the most
+        self.results = {}
+
+    @classmethod
+    def from_database(cls):
+        return cls(map(airport_entry, Airport.objects.values(*AIRPORT_FIELDS)))
+
+    @classmethod
+    async def afrom_database(cls):
+        """from_database for async code"""
+        return cls(
+            [
+                airport_entry(airport)
+                async for airport in Airport.objects.values(*AIRPORT_FIELDS)
+            ]
+        )
+
+    def prefixed(self, prefix):
+        index = bisect_left(self.keys, prefix)
+        while index < len(self.keys) and self.keys[index].startswith(prefix):
+            yield self.keys[index]
+            index += 1
+
+    def ranked(self, matches):
+        """Airport ids of matched words, best score first
+
+        matches maps each word to its edit distance from the query and
+        the length of the prefix it matched.
+        """
+        heap = []
+        for key, (distance, length) in matches.items():
+            rank, name, airport_id = self.postings[key][0]
+            heap.append(
+                (distance, rank, len(key) - length, name, airport_id, key, 0)
+            )
+        heapq.heapify(heap)
+        while heap:
+            distance, _, extra, _, airport_id, key, position = heapq.heappop(
+                heap
+            )
+            yield airport_id
+            position += 1
+            if position < len(self.postings[key]):
+                rank, name, next_id = self.postings[key][position]
+                heapq.heappush(
+                    heap, (distance, rank, extra, name, next_id, key, position)
+                )
+
+    def search(self, query, limit=10):
+        """Airports whose names start with query, allowing one typo
+
+        Matches are ranked by edit distance to the query, then by the
+        matched field and by how much longer the matched word is.
+        """
+        query = normalize_search_key(query).strip()
+        # Past the longest word, even with a deletion, nothing can match
+        if not query or len(query) > self.max_key_length + 1 or limit < 1:
+            return []
+        if (query, limit) in self.results:
+            return self.results[query, limit]
+
+        found = {}
+
+        def collect(matches):
+            for airport_id in self.ranked(matches):
+                if len(found) == limit:
+                    break
+                found.setdefault(airport_id, self.airports[airport_id])
+
+        exact = {key: (0, len(query)) for key in self.prefixed(query)}
+        collect(exact)
+
+        if len(found) < limit and 3 <= len(query) <= MAX_TYPO_QUERY_LENGTH:
+            fuzzy = {}
+            for variant in one_typo_variants(query, self.alphabet):
+                for key in self.prefixed(variant):
+                    if key not in exact:
+                        fuzzy[key] = max(
+                            fuzzy.get(key, (1, 0)), (1, len(variant))
+                        )
+            collect(fuzzy)
+
+        results = list(found.values())
+        # Other threads share the cache, keep using the local list
+        if len(self.results) >= MAX_CACHED_RESULTS:
+            self.results.clear()
+        self.results[query, limit] = results
+        return results
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Autocomplete index of this worker, rebuilt when places change"""
+    global _index, _index_version
+    version = get_version(VERSION_NAME)
+    if _index is None or _index_version != version:
+        with _index_lock:
+            if _index is None or _index_version != version:
+                _index = AutocompleteIndex.from_database()
+                _index_version = version
+    return _index
+
+
+async def aget_index():
+    """get_index for async code
+
+    The index is built outside of the lock, another worker thread
+    building it at the same time only costs a duplicate query.
+    """
+    global _index, _index_version
+    version = await aget_version(VERSION_NAME)
+    if _index is None or _index_version != version:
+        index = await AutocompleteIndex.afrom_database()
+        with _index_lock:
+            _index = index
+            _index_version = version
+    return _index
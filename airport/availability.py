@@ -0,0 +1,245 @@
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import (
+    DatabaseError,
+    close_old_connections,
+    connection,
+    transaction,
+)
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airport.changes import ChangesPurged, read_changes
+from airport.models import Flight, SeatHold, ChangeLogEntry
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, flight_ids):
+        self.flight_ids = frozenset(flight_ids)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+
+class AvailabilityHub:
+    """In-process pub/sub of available seats per flight
+
+    Publishers may run in any thread, events are handed to the event loop
+    of each subscriber.
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, flight_ids):
+        subscription = Subscription(flight_ids)
+        with self._lock:
+            for flight_id in subscription.flight_ids:
+                self._subscriptions[flight_id].add(subscription)
+        start_bridge()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for flight_id in subscription.flight_ids:
+                subscriptions = self._subscriptions[flight_id]
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[flight_id]
+
+    def watched(self, flight_ids):
+        with self._lock:
+            return {
+                flight_id for flight_id in flight_ids
+                if flight_id in self._subscriptions
+            }
+
+    def publish(self, availability):
+        """Send {flight id: available seats} to the flights' subscribers"""
+        with self._lock:
+            deliveries = [
+                (subscription, flight_id, seats)
+                for flight_id, seats in availability.items()
+                for subscription in self._subscriptions.get(flight_id, ())
+            ]
+        for subscription, flight_id, seats in deliveries:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.queue.put_nowait, (flight_id, seats)
+                )
+            except RuntimeError:
+                # The subscriber's event loop has been closed
+                self.unsubscribe(subscription)
+
+
+hub = AvailabilityHub()
+
+
+def available_seats(flight_ids):
+    return dict(
+        Flight.objects
+        .filter(pk__in=flight_ids)
+        .with_available_seats()
+        .values_list("id", "available_seats")
+    )
+
+
+def publish_watched(flight_ids):
+    watched = hub.watched(flight_ids)
+    if watched:
+        hub.publish(available_seats(watched))
+
+
+def publish_availability(flight_ids):
+    """Publish seats of flights watched in this worker after the commit"""
+    flight_ids = set(flight_ids)
+    transaction.on_commit(lambda: publish_watched(flight_ids))
+
+
+class HoldExpiries:
+    """Publishes seats of watched flights again when their holds expire
+
+    Holds free their seats without any write, so one timer per worker
+    waits for the earliest expiry. Holds deleted or booked earlier are
+    published once more, subscribers ignore the unchanged seat count.
+    """
+
+    def __init__(self):
+        self._expiries = []
+        self._timer = None
+        self._due = None
+        self._lock = threading.Lock()
+
+    def add(self, expiries):
+        """Watch (expires_at, flight_id) pairs of flights streamed here"""
+        expiries = list(expiries)
+        watched = hub.watched({flight_id for _, flight_id in expiries})
+        with self._lock:
+            for expires_at, flight_id in expiries:
+                if flight_id in watched:
+                    heapq.heappush(self._expiries, (expires_at, flight_id))
+            self._schedule()
+
+    def _schedule(self):
+        if not self._expiries:
+            return
+        due = self._expiries[0][0]
+        if self._timer is not None:
+            if self._due <= due:
+                return
+            self._timer.cancel()
+        self._due = due
+        self._timer = threading.Timer(
+            max((due - timezone.now()).total_seconds(), 0), self._expire
+        )
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self):
+        now = timezone.now()
+        flight_ids = set()
+        with self._lock:
+            if self._timer is threading.current_thread():
+                self._timer = None
+            while self._expiries and self._expiries[0][0] <= now:
+                flight_ids.add(heapq.heappop(self._expiries)[1])
+            self._schedule()
+        try:
+            publish_watched(flight_ids)
+        except DatabaseError:
+            logger.exception("Publishing expired seat holds failed")
+        finally:
+            connection.close()
+
+
+hold_expiries = HoldExpiries()
+
+
+def publish_hold(flight_id, expires_at):
+    """Publish seats of a flight after the commit and when the hold expires"""
+    def publish():
+        publish_watched({flight_id})
+        hold_expiries.add([(expires_at, flight_id)])
+    transaction.on_commit(publish)
+
+
+def watch_availability(flight_ids):
+    """Available seats of flights to stream, watching their holds expire"""
+    hold_expiries.add(
+        SeatHold.objects
+        .live()
+        .filter(flight_id__in=flight_ids)
+        .values_list("expires_at", "flight_id")
+    )
+    return available_seats(flight_ids)
+
+
+_bridge = None
+_bridge_lock = threading.Lock()
+
+
+def publish_seat_changes(cursor):
+    """Publish seats of watched flights with seat changes after cursor"""
+    changes = has_more = True
+    while changes and has_more:
+        changes, cursor, has_more = read_changes(cursor, 1000)
+        publish_watched({
+            change.data["flight"]
+            for change in changes
+            if change.model in ("ticket", "seathold")
+        })
+        hold_expiries.add(
+            (parse_datetime(change.data["expires_at"]), change.data["flight"])
+            for change in changes
+            if change.model == "seathold"
+            and change.action != ChangeLogEntry.Action.DELETED
+        )
+    return cursor
+
+
+def poll_seat_changes(interval):
+    """Publish availability of flights other workers sold or held seats of
+
+    Each worker's own changes are published twice, subscribers ignore the
+    second event as it carries the same seat count.
+    """
+    cursor = (
+        ChangeLogEntry.objects.order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    ) or 0
+    while True:
+        time.sleep(interval)
+        try:
+            cursor = publish_seat_changes(cursor)
+        except ChangesPurged as exc:
+            cursor = exc.detail["cursor"]
+        except DatabaseError:
+            logger.exception("Polling the change log failed")
+        finally:
+            close_old_connections()
+
+
+def start_bridge():
+    """Follow other workers' changes once the first subscriber arrives"""
+    global _bridge
+    interval = settings.AVAILABILITY_POLL_INTERVAL
+    if interval is None or _bridge is not None:
+        return
+    with _bridge_lock:
+        if _bridge is None:
+            _bridge = threading.Thread(
+                target=poll_seat_changes,
+                args=(interval.total_seconds(),),
+                name="availability-bridge",
+                daemon=True,
+            )
+            _bridge.start()
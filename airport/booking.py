@@ -0,0 +1,208 @@
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from airport.changes import record_changes
+from airport.models import (
+    Flight,
+    Route,
+    Airplane,
+    Order,
+    Ticket,
+    SeatHold,
+    HeldSeat,
+    ChangeLogEntry,
+)
+from airport.response_cache import CATALOG_VERSION
+from airport.versions import bump_version
+
+
+class SeatConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the requested seats are already taken."
+    default_code = "seat_conflict"
+
+    def __init__(self, seats):
+        super().__init__()
+        # Keep seat numbers as integers instead of ErrorDetail strings
+        self.detail = {
+            "detail": self.detail,
+            "seats": [
+                {"flight": flight_id, "row": row, "seat": seat}
+                for flight_id, row, seat in sorted(seats)
+            ],
+        }
+
+
+def lock_flights(flight_ids):
+    """Lock flight rows in id order, so concurrent bookings can't deadlock"""
+    return list(
+        Flight.objects
+        .select_for_update()
+        .filter(pk__in=flight_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def ticket_lookups():
+    """Paths from a ticket to the objects whose deletion takes it along"""
+    return {
+        Ticket: "pk",
+        Order: "order",
+        get_user_model(): "order__user",
+        Flight: "flight",
+        Route: "flight__route",
+        Airplane: "flight__airplane",
+    }
+
+
+def lock_deleted_flights(origin):
+    """Lock the flights of every ticket deleting origin takes along
+
+    Deletion sends pre_delete for the tickets in their own order, locking
+    each flight then could deadlock with lock_flights. Locks are taken
+    once per deletion, origin being the instance or queryset deleted.
+    """
+    if origin is None or getattr(origin, "_flights_locked", False):
+        return
+    if isinstance(origin, QuerySet):
+        model, deleted = origin.model, origin
+    else:
+        model, deleted = type(origin), [origin.pk]
+    lookup = ticket_lookups().get(model)
+    if lookup is not None:
+        lock_flights(set(
+            Ticket.objects
+            .filter(**{f"{lookup}__in": deleted})
+            .values_list("flight_id", flat=True)
+        ))
+    origin._flights_locked = True
+
+
+def find_taken_seats(seats):
+    """Requested (flight_id, row, seat) triples that are sold or held"""
+    lookup = {
+        "flight_id__in": {flight_id for flight_id, _, _ in seats},
+        "row__in": {row for _, row, _ in seats},
+        "seat__in": {seat for _, _, seat in seats},
+    }
+    taken_seats = (
+        Ticket.objects
+        .filter(**lookup)
+        .values_list("flight_id", "row", "seat")
+        .union(
+            HeldSeat.objects
+            .live()
+            .filter(**lookup)
+            .values_list("flight_id", "row", "seat"),
+            all=True,
+        )
+    )
+    return set(taken_seats) & set(seats)
+
+
+def create_tickets(order, tickets_data):
+    tickets = Ticket.objects.bulk_create(
+        Ticket(order=order, **ticket_data)
+        for ticket_data in tickets_data
+    )
+    # bulk_create skips the signals maintaining sold_seats
+    sold_seats = Counter(ticket.flight_id for ticket in tickets)
+    for flight_id, count in sold_seats.items():
+        Flight.objects.filter(pk=flight_id).add_sold_seats(count)
+    record_changes(tickets, ChangeLogEntry.Action.CREATED)
+    bump_version(CATALOG_VERSION)
+    return tickets
+
+
+def book_tickets(order, tickets_data):
+    """Create the tickets of an order or raise SeatConflict for lost seats
+
+    Flights are locked before their seats are checked, so two bookings of
+    the same flight are serialized instead of racing to the unique
+    constraint.
+    """
+    seats = [
+        (ticket_data["flight"].id, ticket_data["row"], ticket_data["seat"])
+        for ticket_data in tickets_data
+    ]
+    with transaction.atomic():
+        lock_flights({flight_id for flight_id, _, _ in seats})
+
+        taken_seats = find_taken_seats(seats)
+        if taken_seats:
+            raise SeatConflict(taken_seats)
+
+        try:
+            with transaction.atomic():
+                return create_tickets(order, tickets_data)
+        except IntegrityError:
+            # Seat taken by a write that doesn't lock its flight
+            raise SeatConflict(find_taken_seats(seats))
+
+
+def hold_seats(flight, user, seats):
+    """Reserve (row, seat) pairs of a flight for SEAT_HOLD_TTL"""
+    requested = [(flight.id, row, seat) for row, seat in seats]
+    with transaction.atomic():
+        lock_flights({flight.id})
+        SeatHold.objects.expired().filter(flight=flight).delete()
+
+        taken_seats = find_taken_seats(requested)
+        if taken_seats:
+            raise SeatConflict(taken_seats)
+
+        hold = SeatHold.objects.create(
+            flight=flight,
+            user=user,
+            expires_at=timezone.now() + settings.SEAT_HOLD_TTL,
+        )
+        HeldSeat.objects.bulk_create(
+            HeldSeat(hold=hold, flight=flight, row=row, seat=seat)
+            for row, seat in seats
+        )
+    return hold
+
+
+def book_hold(order, hold):
+    """Turn the seats of a live hold into tickets of the order
+
+    Held seats can't be taken through the booking engine, so contention
+    isn't checked again, a seat sold elsewhere raises SeatConflict.
+    """
+    with transaction.atomic():
+        lock_flights({hold.flight_id})
+        if not (
+            SeatHold.objects
+            .live()
+            .select_for_update()
+            .filter(pk=hold.pk)
+            .exists()
+        ):
+            raise ValidationError({"hold": "Seat hold has expired."})
+
+        tickets_data = [
+            {"flight": hold.flight, "row": row, "seat": seat}
+            for row, seat in hold.seats.values_list("row", "seat")
+        ]
+        try:
+            with transaction.atomic():
+                hold.delete()
+                return create_tickets(order, tickets_data)
+        except IntegrityError:
+            # Held seat sold by a write that doesn't check holds, the
+            # rollback keeps the hold
+            held_seats = {
+                (hold.flight_id, ticket_data["row"], ticket_data["seat"])
+                for ticket_data in tickets_data
+            }
+            raise SeatConflict(held_seats & set(
+                hold.flight.tickets.values_list("flight_id", "row", "seat")
+            ))
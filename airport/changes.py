@@ -0,0 +1,122 @@
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from airport.models import (
+    Flight,
+    Route,
+    Airplane,
+    Ticket,
+    SeatHold,
+    ChangeLogEntry,
+)
+
+# Fields each change log entry carries, foreign keys as ids
+TRACKED_FIELDS = {
+    Flight: ("route", "airplane", "departure_time", "arrival_time"),
+    Route: ("source", "destination", "distance"),
+    Airplane: ("name", "airplane_type", "rows", "seats_in_row"),
+    Ticket: ("flight", "row", "seat"),
+    SeatHold: ("flight", "expires_at"),
+}
+
+
+class ChangesPurged(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = (
+        "Changes after this cursor were purged, list the data again and "
+        "continue from the returned cursor."
+    )
+    default_code = "changes_purged"
+
+    def __init__(self, cursor):
+        super().__init__()
+        self.detail = {"detail": self.detail, "cursor": cursor}
+
+
+def change_entry(instance, action):
+    fields = TRACKED_FIELDS[type(instance)]
+    return ChangeLogEntry(
+        model=instance._meta.model_name,
+        object_id=instance.pk,
+        action=action,
+        data={
+            name: instance._meta.get_field(name).value_from_object(instance)
+            for name in fields
+        },
+    )
+
+
+def record_changes(instances, action):
+    """Log changes of rows saved or deleted without signals, like bulk_create"""
+    ChangeLogEntry.objects.bulk_create(
+        change_entry(instance, action) for instance in instances
+    )
+
+
+def read_changes(since, limit):
+    """Entries after the since cursor, the cursor to continue from and
+    whether more entries can be read right away
+
+    Ids are taken when a row is inserted but become visible when its
+    transaction commits, so a missing id may still show up. Reading stops
+    at such a gap until CHANGE_FEED_SETTLE has passed since the entry
+    after it was written, after that the gap counts as a rollback. A
+    transaction still open that long after its insert has its entries
+    skipped, so the setting must outlast the longest write transaction.
+    Stopped at a gap, there is nothing more to read until it fills or
+    settles. Reading from the start, since 0, begins at the oldest entry
+    kept.
+
+    Raises ChangesPurged when entries after since are gone along with
+    everything up to it, as purge_change_log leaves it. The consumer has
+    to list the data again, and continue from the newest entry.
+    """
+    entries = list(
+        ChangeLogEntry.objects.filter(id__gt=since).order_by("id")[:limit + 1]
+    )
+    if (
+        since
+        and entries
+        and entries[0].id != since + 1
+        and not ChangeLogEntry.objects.filter(id__lte=since).exists()
+    ):
+        raise ChangesPurged(ChangeLogEntry.objects.latest("id").id)
+    settled = timezone.now() - settings.CHANGE_FEED_SETTLE
+    changes = []
+    cursor = since
+    for entry in entries[:limit]:
+        gap = cursor and entry.id != cursor + 1
+        if gap and entry.created_at > settled:
+            return changes, cursor, False
+        changes.append(entry)
+        cursor = entry.id
+    return changes, cursor, len(entries) > limit
+
+
+def seat_flight(entry):
+    """Id of the flight whose seats a flight, ticket or hold entry is about"""
+    if entry.model == "flight":
+        return entry.object_id
+    if entry.model in ("ticket", "seathold"):
+        return entry.data["flight"]
+    return None
+
+
+def add_available_seats(changes):
+    """Set available_seats on flight, ticket and hold entries, None on others
+
+    The count is the flight's current one rather than the one at the
+    change, None once the flight is deleted.
+    """
+    flight_ids = {seat_flight(entry) for entry in changes} - {None}
+    seats = dict(
+        Flight.objects
+        .filter(pk__in=flight_ids)
+        .with_available_seats()
+        .values_list("id", "available_seats")
+    )
+    for entry in changes:
+        entry.available_seats = seats.get(seat_flight(entry))
+    return changes
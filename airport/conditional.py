@@ -0,0 +1,83 @@
+import hashlib
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """Answer list and retrieve requests for unchanged data with 304
+
+    The validators come from one aggregate query over the filtered
+    queryset: the number of rows and the newest updated_at of the rows
+    and of the related rows in last_modified_fields. Pages and
+    serializers are only built when If-None-Match or If-Modified-Since
+    don't match.
+    """
+    last_modified_fields = ("updated_at",)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        return queryset
+
+    def get_conditional_aggregates(self):
+        return {
+            "count": Count("pk", distinct=True),
+            **{
+                field: Max(field)
+                for field in self.last_modified_fields
+            },
+        }
+
+    def conditional_response(self, view, request, *args, **kwargs):
+        try:
+            state = (
+                self.get_conditional_queryset()
+                .order_by()
+                .aggregate(**self.get_conditional_aggregates())
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            # Malformed lookups are reported by the view itself
+            return view(request, *args, **kwargs)
+        if self.action == "retrieve" and not state["count"]:
+            return view(request, *args, **kwargs)
+
+        last_modified = max(
+            (
+                state[field] for field in self.last_modified_fields
+                if state[field] is not None
+            ),
+            default=None,
+        )
+        identity = repr(
+            [request.accepted_renderer.format, sorted(state.items())]
+        )
+        etag = quote_etag(hashlib.sha256(identity.encode()).hexdigest())
+        last_modified = last_modified and int(last_modified.timestamp())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = view(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
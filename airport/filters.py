@@ -1,6 +1,110 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django_filters.constants import EMPTY_VALUES
 from django_filters.rest_framework import filters
 from django_filters import FilterSet
 
+from airport.models import City, Country
+from airport.search import matching_ids, normalize_search_key
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class DayFilter(filters.DateFilter):
+    """Match datetimes of the given day in the current time zone
+
+    Filters on the half-open [start of day, start of next day) range,
+    which an index on the column can serve, unlike the __date lookup.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        if self.distinct:
+            qs = qs.distinct()
+        return self.get_method(qs)(
+            **{
+                f"{self.field_name}__gte": start_of_day(value),
+                f"{self.field_name}__lt": start_of_day(
+                    value + timedelta(days=1)
+                ),
+            }
+        )
+
+
+class SearchKeyFilter(filters.CharFilter):
+    """Match names by their case and accent folded search_key"""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("field_name", "search_key")
+        kwargs.setdefault("lookup_expr", "contains")
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        return super().filter(qs, normalize_search_key(value))
+
+
+class ThroughFilterMixin:
+    """Filter on field_name of the rows of the reverse relation through
+
+    The lookup goes into an EXISTS subquery over that relation, which
+    doesn't multiply the filtered rows the way a join would.
+    """
+
+    def __init__(self, *args, through=None, **kwargs):
+        self.through = through
+        super().__init__(*args, **kwargs)
+
+    def get_method(self, qs):
+        method = super().get_method(qs)
+        if not self.through:
+            return method
+        relation = qs.model._meta.get_field(self.through)
+
+        def filter_through(**lookup):
+            related = relation.related_model.objects.filter(
+                **{relation.field.name: OuterRef("pk")}, **lookup
+            )
+            return method(Exists(related))
+
+        return filter_through
+
+
+class ThroughDateFromToRangeFilter(
+    ThroughFilterMixin, filters.DateFromToRangeFilter
+):
+    pass
+
+
+class ThroughCharFilter(ThroughFilterMixin, filters.CharFilter):
+    pass
+
+
+class RelatedSearchKeyFilter(ThroughFilterMixin, filters.CharFilter):
+    """Match a related City, Country or Airport by its search_key
+
+    The text is resolved to ids of matching rows in a subquery, so the
+    main query filters on the foreign key instead of joining the name
+    column. See ThroughFilterMixin for through.
+    """
+
+    def __init__(self, *args, search_model, **kwargs):
+        self.search_model = search_model
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        return self.get_method(qs)(**{
+            f"{self.field_name}__in": matching_ids(self.search_model, value)
+        })
+
 
 class NameFilter(FilterSet):
     name = filters.CharFilter(
@@ -8,73 +112,72 @@ class NameFilter(FilterSet):
     )
 
 
+class SearchNameFilter(FilterSet):
+    name = SearchKeyFilter()
+
+
 class AirportFilter(FilterSet):
-    name = filters.CharFilter(
-        field_name="name", lookup_expr="icontains"
+    name = SearchKeyFilter()
+    city_name = RelatedSearchKeyFilter(
+        field_name="city", search_model=City
     )
-    city_name = filters.CharFilter(
-        field_name="city__name", lookup_expr="icontains"
-    )
-    country_name = filters.CharFilter(
-        field_name="country__name", lookup_expr="icontains"
+    country_name = RelatedSearchKeyFilter(
+        field_name="country", search_model=Country
     )
 
 
 class FlightFilter(FilterSet):
-    country = filters.CharFilter(
-        field_name="route__destination__country__name",
-        lookup_expr="icontains"
-    )
-    city = filters.CharFilter(
-        field_name="route__destination__city__name",
-        lookup_expr="icontains"
+    country = RelatedSearchKeyFilter(
+        field_name="route__destination__country",
+        search_model=Country
     )
-    departure_time = filters.DateFilter(
-        field_name="departure_time", lookup_expr="date"
-    )
-    arrival_time = filters.DateFilter(
-        field_name="arrival_time", lookup_expr="date"
+    city = RelatedSearchKeyFilter(
+        field_name="route__destination__city",
+        search_model=City
     )
+    departure_time = DayFilter(field_name="departure_time")
+    arrival_time = DayFilter(field_name="arrival_time")
 
 
 class TicketFilter(FilterSet):
-    country = filters.CharFilter(
-        field_name="flight__route__destination__country__name",
-        lookup_expr="icontains"
-    )
-    city = filters.CharFilter(
-        field_name="flight__route__destination__city__name",
-        lookup_expr="icontains"
+    country = RelatedSearchKeyFilter(
+        field_name="flight__route__destination__country",
+        search_model=Country
     )
-    departure_time = filters.DateFilter(
-        field_name="flight__departure_time", lookup_expr="date"
-    )
-    arrival_time = filters.DateFilter(
-        field_name="flight__arrival_time", lookup_expr="date"
+    city = RelatedSearchKeyFilter(
+        field_name="flight__route__destination__city",
+        search_model=City
     )
+    departure_time = DayFilter(field_name="flight__departure_time")
+    arrival_time = DayFilter(field_name="flight__arrival_time")
     name = filters.CharFilter(
         field_name="flight__airplane__name", lookup_expr="icontains"
     )
 
 
 class OrderFilter(FilterSet):
-    country = filters.CharFilter(
-        field_name="tickets__flight__route__destination__country__name",
-        lookup_expr="icontains"
+    country = RelatedSearchKeyFilter(
+        field_name="flight__route__destination__country",
+        search_model=Country,
+        through="tickets"
     )
-    city = filters.CharFilter(
-        field_name="tickets__flight__route__destination__city__name",
-        lookup_expr="icontains"
+    city = RelatedSearchKeyFilter(
+        field_name="flight__route__destination__city",
+        search_model=City,
+        through="tickets"
     )
-    departure_time = filters.DateFromToRangeFilter(
-        field_name="tickets__flight__departure_time"
+    departure_time = ThroughDateFromToRangeFilter(
+        field_name="flight__departure_time",
+        through="tickets"
     )
-    arrival_time = filters.DateFromToRangeFilter(
-        field_name="tickets__flight__arrival_time"
+    arrival_time = ThroughDateFromToRangeFilter(
+        field_name="flight__arrival_time",
+        through="tickets"
     )
-    name = filters.CharFilter(
-        field_name="tickets__flight__airplane__name",
-        lookup_expr="icontains"
+    name = ThroughCharFilter(
+        field_name="flight__airplane__name",
+        lookup_expr="icontains",
+        through="tickets"
     )
 
 
@@ -85,19 +188,19 @@ class OrderAdminFilter(OrderFilter):
 
 
 class RouteFilter(FilterSet):
-    source_country = filters.CharFilter(
-        field_name="source__country__name",
-        lookup_expr="icontains"
+    source_country = RelatedSearchKeyFilter(
+        field_name="source__country",
+        search_model=Country
     )
-    source_city = filters.CharFilter(
-        field_name="source__city__name",
-        lookup_expr="icontains"
+    source_city = RelatedSearchKeyFilter(
+        field_name="source__city",
+        search_model=City
     )
-    destination_country = filters.CharFilter(
-        field_name="destination__country__name",
-        lookup_expr="icontains"
+    destination_country = RelatedSearchKeyFilter(
+        field_name="destination__country",
+        search_model=Country
     )
-    destination_city = filters.CharFilter(
-        field_name="destination__city__name",
-        lookup_expr="icontains"
+    destination_city = RelatedSearchKeyFilter(
+        field_name="destination__city",
+        search_model=City
     )
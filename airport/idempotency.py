@@ -0,0 +1,119 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from airport.models import IdempotencyKey
+
+
+def request_hash(data):
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """Replay the stored response of a create repeated with the same key
+
+    The first request with an Idempotency-Key header claims the key, a
+    repeated request within IDEMPOTENCY_KEY_TTL gets the stored response
+    back without running create again. The response is stored in the
+    transaction of the create, and a claim left unfinished for
+    IDEMPOTENCY_CLAIM_TIMEOUT is taken over by the next retry.
+    """
+    idempotency_header = "Idempotency-Key"
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(self.idempotency_header)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            raise ValidationError(
+                {self.idempotency_header: "Idempotency key is too long."}
+            )
+
+        body_hash = request_hash(request.data)
+        stored = (
+            IdempotencyKey.objects.live()
+            .filter(user=request.user, key=key)
+            .first()
+        )
+        if stored is not None:
+            if stored.request_hash != body_hash or not self.take_over(stored):
+                return self.replay(stored, body_hash)
+        else:
+            now = timezone.now()
+            try:
+                with transaction.atomic():
+                    IdempotencyKey.objects.expired().filter(
+                        user=request.user, key=key
+                    ).delete()
+                    stored = IdempotencyKey.objects.create(
+                        user=request.user,
+                        key=key,
+                        request_hash=body_hash,
+                        expires_at=now + settings.IDEMPOTENCY_KEY_TTL,
+                        locked_until=now + settings.IDEMPOTENCY_CLAIM_TIMEOUT,
+                    )
+            except IntegrityError:
+                return self.in_progress()
+
+        try:
+            with transaction.atomic():
+                response = super().create(request, *args, **kwargs)
+                stored.response_status = response.status_code
+                stored.response_body = response.data
+                stored.save(
+                    update_fields=["response_status", "response_body"]
+                )
+        except Exception:
+            # Failed requests may be retried with the same key
+            stored.delete()
+            raise
+        return response
+
+    def take_over(self, stored):
+        """Claim a key again if its request stopped without finishing"""
+        now = timezone.now()
+        if stored.response_status is not None or (
+            stored.locked_until is not None and stored.locked_until > now
+        ):
+            return False
+        locked_until = now + settings.IDEMPOTENCY_CLAIM_TIMEOUT
+        taken = (
+            IdempotencyKey.objects
+            .filter(pk=stored.pk, response_status=None)
+            .filter(Q(locked_until__isnull=True) | Q(locked_until__lte=now))
+            .update(locked_until=locked_until)
+        )
+        stored.locked_until = locked_until
+        return bool(taken)
+
+    def replay(self, stored, body_hash):
+        if stored.request_hash != body_hash:
+            return Response(
+                {
+                    "detail": "Idempotency key was already used "
+                    "with a different request."
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        if stored.response_status is None:
+            return self.in_progress()
+        return Response(
+            stored.response_body,
+            status=stored.response_status,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    def in_progress(self):
+        return Response(
+            {"detail": "A request with this idempotency key is in progress."},
+            status=status.HTTP_409_CONFLICT,
+        )
@@ -0,0 +1,112 @@
+from collections import defaultdict
+from collections.abc import Mapping
+
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField
+
+IDENTITY_MAP_KEY = "identity_map"
+
+
+class IdentityMap:
+    """Objects loaded while validating one payload, by model and pk
+
+    The first queryset a model is loaded through decides what it selects,
+    so fields resolving the same model must not filter their querysets.
+    """
+
+    def __init__(self):
+        self._objects = defaultdict(dict)
+
+    def load(self, queryset, pks):
+        """Load the pks not loaded yet with one in_bulk query"""
+        objects = self._objects[queryset.model]
+        missing = set(pks) - objects.keys()
+        if missing:
+            found = queryset.in_bulk(missing)
+            for pk in missing:
+                objects[pk] = found.get(pk)
+
+    def get(self, queryset, pk):
+        """Object with the pk or None if there is none"""
+        self.load(queryset, (pk,))
+        return self._objects[queryset.model][pk]
+
+
+def get_identity_map(context):
+    if IDENTITY_MAP_KEY not in context:
+        context[IDENTITY_MAP_KEY] = IdentityMap()
+    return context[IDENTITY_MAP_KEY]
+
+
+def to_pk(data):
+    """Integer pk of a payload value or None if it isn't one"""
+    if isinstance(data, int) and not isinstance(data, bool):
+        return data
+    if isinstance(data, str) and data.isdigit():
+        return int(data)
+    return None
+
+
+class IdentityMapRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key related field resolving pks through the identity map"""
+
+    def to_internal_value(self, data):
+        pk = to_pk(data)
+        if pk is None:
+            return super().to_internal_value(data)
+        instance = get_identity_map(self.context).get(self.get_queryset(), pk)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
+
+
+class IdentityMapSerializerMixin:
+    """Load every object a payload refers to by pk before validating it
+
+    Pks of related fields, including those of nested serializers using
+    this mixin, are collected first and loaded with one in_bulk query per
+    model into an identity map kept in the serializer context. Fields then
+    resolve pks from the map, so each object is loaded once per payload
+    however often it is referred to.
+    """
+    serializer_related_field = IdentityMapRelatedField
+
+    def collect_related_pks(self, data, pks):
+        """Add the pks data refers to to pks, {model: (queryset, pks)}"""
+        if not isinstance(data, Mapping):
+            return
+        for field in self._writable_fields:
+            value = data.get(field.field_name)
+            if isinstance(field, ManyRelatedField):
+                relation = field.child_relation
+                values = value if isinstance(value, list) else ()
+            else:
+                relation = field
+                values = (value,)
+            if isinstance(relation, IdentityMapRelatedField):
+                queryset = relation.get_queryset()
+                _, model_pks = pks.setdefault(
+                    queryset.model, (queryset, set())
+                )
+                model_pks.update(
+                    pk for pk in map(to_pk, values) if pk is not None
+                )
+            elif isinstance(field, serializers.ListSerializer):
+                if isinstance(field.child, IdentityMapSerializerMixin):
+                    for item in value if isinstance(value, list) else ():
+                        field.child.collect_related_pks(item, pks)
+            elif isinstance(field, IdentityMapSerializerMixin):
+                field.collect_related_pks(value, pks)
+
+    def preload_related(self, items):
+        """Load the related objects of every payload in items"""
+        pks = {}
+        for item in items:
+            self.collect_related_pks(item, pks)
+        identity_map = get_identity_map(self.context)
+        for queryset, model_pks in pks.values():
+            identity_map.load(queryset, model_pks)
+
+    def to_internal_value(self, data):
+        self.preload_related((data,))
+        return super().to_internal_value(data)
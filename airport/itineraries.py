@@ -0,0 +1,131 @@
+import heapq
+import itertools
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from airport.models import Flight
+
+Leg = namedtuple(
+    "Leg",
+    "id source destination distance departure_time arrival_time "
+    "available_seats",
+)
+Itinerary = namedtuple("Itinerary", "legs duration distance connections")
+
+# Later legs may leave up to a day after the searched date
+SEARCH_HORIZON = timedelta(days=1)
+
+MAX_EXPANSIONS = 20000
+
+
+class FlightNetwork:
+    """Time-expanded graph of flights, departures indexed per airport"""
+
+    def __init__(self, legs):
+        departures = defaultdict(list)
+        for leg in legs:
+            departures[leg.source].append(leg)
+        self.departures = {}
+        self.departure_times = {}
+        for airport_id, airport_legs in departures.items():
+            airport_legs.sort(key=lambda leg: (leg.departure_time, leg.id))
+            self.departures[airport_id] = airport_legs
+            self.departure_times[airport_id] = [
+                leg.departure_time for leg in airport_legs
+            ]
+
+    @classmethod
+    def from_database(cls, start, end, seats=1):
+        """Flights departing in [start, end + SEARCH_HORIZON) with seats"""
+        rows = (
+            Flight.objects
+            .with_available_seats()
+            .filter(
+                departure_time__gte=start,
+                departure_time__lt=end + SEARCH_HORIZON,
+                available_seats__gte=seats,
+            )
+            .values_list(
+                "id",
+                "route__source_id",
+                "route__destination_id",
+                "route__distance",
+                "departure_time",
+                "arrival_time",
+                "available_seats",
+            )
+        )
+        return cls(Leg(*row) for row in rows)
+
+    def departing(self, airport_id, earliest, latest):
+        """Legs leaving the airport in [earliest, latest]"""
+        times = self.departure_times.get(airport_id, [])
+        legs = self.departures.get(airport_id, [])
+        return legs[bisect_left(times, earliest):bisect_right(times, latest)]
+
+    def search(
+        self,
+        source,
+        destination,
+        start,
+        end,
+        max_legs=2,
+        min_connection=timedelta(minutes=45),
+        max_connection=timedelta(hours=6),
+        sort="duration",
+        limit=10,
+    ):
+        """Itineraries first departing in [start, end), best first
+
+        A best-first search over partial itineraries ordered by total
+        duration or distance. Both only grow when a leg is added, so
+        itineraries reach the destination in ranking order and the search
+        stops after limit of them.
+        """
+        def cost(legs):
+            if sort == "distance":
+                return sum(leg.distance for leg in legs)
+            return legs[-1].arrival_time - legs[0].departure_time
+
+        heap = []
+        order = itertools.count()
+        for leg in self.departing(source, start, end):
+            if leg.departure_time < end:
+                heapq.heappush(heap, (cost((leg,)), next(order), (leg,)))
+
+        itineraries = []
+        expansions = 0
+        while heap and len(itineraries) < limit:
+            _, _, legs = heapq.heappop(heap)
+            last = legs[-1]
+            if last.destination == destination:
+                itineraries.append(self.itinerary(legs))
+                continue
+            if len(legs) == max_legs or expansions >= MAX_EXPANSIONS:
+                continue
+
+            expansions += 1
+            visited = {leg.source for leg in legs}
+            for leg in self.departing(
+                last.destination,
+                last.arrival_time + min_connection,
+                last.arrival_time + max_connection,
+            ):
+                if leg.destination not in visited:
+                    path = legs + (leg,)
+                    heapq.heappush(heap, (cost(path), next(order), path))
+
+        return itineraries
+
+    @staticmethod
+    def itinerary(legs):
+        return Itinerary(
+            legs=legs,
+            duration=legs[-1].arrival_time - legs[0].departure_time,
+            distance=sum(leg.distance for leg in legs),
+            connections=[
+                following.departure_time - previous.arrival_time
+                for previous, following in zip(legs, legs[1:])
+            ],
+        )
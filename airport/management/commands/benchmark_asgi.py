@@ -0,0 +1,201 @@
+import asyncio
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from airport.models import (
+    City,
+    Country,
+    Airport,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the public read endpoints served through the WSGI handler "
+        "by a thread pool with the ASGI handler on one event loop"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, nargs="+", default=[8, 32, 128]
+        )
+        parser.add_argument("--requests", type=int, default=1_000)
+        parser.add_argument("--flights", type=int, default=200)
+
+    def handle(self, *args, **options):
+        # Requests run in worker threads with their own connections, so
+        # the data is committed and deleted again at the end
+        city = City.objects.create(name="Benchmark City")
+        try:
+            urls = self.create_objects(city, options["flights"])
+            # DEBUG would keep every query and the toolbar, which only
+            # runs sync, would turn the ASGI middleware chain sync
+            with override_settings(
+                DEBUG=False,
+                ALLOWED_HOSTS=["testserver"],
+                MIDDLEWARE=[
+                    middleware
+                    for middleware in settings.MIDDLEWARE
+                    if not middleware.startswith("debug_toolbar.")
+                ],
+            ):
+                for concurrency in options["concurrency"]:
+                    for name, run in (
+                        ("wsgi", self.run_wsgi),
+                        ("asgi", self.run_asgi),
+                    ):
+                        self.report(
+                            name,
+                            concurrency,
+                            *self.measure(
+                                run, urls, options["requests"], concurrency
+                            ),
+                        )
+        finally:
+            Airport.objects.filter(city=city).delete()
+            AirplaneType.objects.filter(name="Benchmark").delete()
+            Country.objects.filter(name="Benchmark Country").delete()
+            city.delete()
+
+    def create_objects(self, city, size):
+        country = Country.objects.create(name="Benchmark Country")
+        airports = Airport.objects.bulk_create(
+            Airport(name=f"Benchmark {number}", city=city, country=country)
+            for number in range(20)
+        )
+        routes = Route.objects.bulk_create(
+            Route(
+                source=airports[number],
+                destination=airports[(number + 1) % 20],
+                distance=1000 + number,
+            )
+            for number in range(20)
+        )
+        airplane_type = AirplaneType.objects.create(name="Benchmark")
+        airplanes = Airplane.objects.bulk_create(
+            Airplane(
+                name=f"Benchmark {number}",
+                airplane_type=airplane_type,
+                rows=30,
+                seats_in_row=6,
+            )
+            for number in range(10)
+        )
+        departure = timezone.now()
+        flights = Flight.objects.bulk_create(
+            Flight(
+                route=routes[number % 20],
+                airplane=airplanes[number % 10],
+                departure_time=departure,
+                arrival_time=departure,
+            )
+            for number in range(size)
+        )
+
+        urls = []
+        for flight in flights:
+            urls += [
+                reverse("airport:flight-detail", args=[flight.id]),
+                reverse("airport:flight-seats", args=[flight.id]),
+            ]
+        urls += [
+            f"{reverse('airport:flight-list')}?page_size=20",
+            f"{reverse('airport:airport-autocomplete')}?q=benchmrk",
+        ] * (size // 10 + 1)
+        return urls
+
+    def measure(self, run, urls, requests, concurrency):
+        """Timings and failures of a run, and peak memory of another
+
+        The memory is traced in a second run, tracing slows requests down
+        several times over.
+        """
+        urls = list(islice(cycle(urls), requests))
+        cache.clear()
+        started = time.perf_counter()
+        results = run(urls, concurrency)
+        elapsed = time.perf_counter() - started
+
+        cache.clear()
+        tracemalloc.start()
+        run(urls, concurrency)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings = [timing for timing, _ in results]
+        failures = sum(status != 200 for _, status in results)
+        return elapsed, timings, peak, failures
+
+    def run_wsgi(self, urls, concurrency):
+        """Up to concurrency requests in flight on as many threads
+
+        Each thread keeps its own database connection until the end.
+        """
+        local = threading.local()
+        barrier = threading.Barrier(concurrency)
+
+        def get(url):
+            if not hasattr(local, "client"):
+                local.client = Client(raise_request_exception=False)
+            started = time.perf_counter()
+            status = local.client.get(url).status_code
+            return time.perf_counter() - started, status
+
+        def close(_):
+            # Holds every thread until each one has taken a close call
+            barrier.wait()
+            connections.close_all()
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            results = list(executor.map(get, urls))
+            list(executor.map(close, range(concurrency)))
+        return results
+
+    def run_asgi(self, urls, concurrency):
+        """Up to concurrency requests in flight on one event loop
+
+        The async ORM runs queries on a single thread with one
+        connection.
+        """
+        async def run():
+            client = AsyncClient(raise_request_exception=False)
+            limit = asyncio.Semaphore(concurrency)
+
+            async def get(url):
+                async with limit:
+                    started = time.perf_counter()
+                    status = (await client.get(url)).status_code
+                    return time.perf_counter() - started, status
+
+            try:
+                return await asyncio.gather(*map(get, urls))
+            finally:
+                await sync_to_async(connections.close_all)()
+
+        return asyncio.run(run())
+
+    def report(self, name, concurrency, elapsed, timings, peak, failures):
+        quantiles = statistics.quantiles(timings, n=100)
+        self.stdout.write(self.style.SUCCESS(
+            f"{name} x{concurrency}: {len(timings) / elapsed:.0f} req/s, "
+            f"p50 {quantiles[49] * 1000:.1f} ms, "
+            f"p99 {quantiles[98] * 1000:.1f} ms, "
+            f"peak {peak / 2 ** 20:.1f} MiB, {failures} failed"
+        ))
@@ -0,0 +1,166 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from airport.models import (
+    City,
+    Country,
+    Airport,
+    Route,
+    AirplaneType,
+    Airplane,
+    Crew,
+    Flight,
+    Order,
+    Ticket,
+)
+from airport.readers import flight_reader, ticket_admin_reader, order_reader
+from airport.serializers import (
+    FlightSerializer,
+    TicketAdminSerializer,
+    OrderSerializer,
+)
+
+FLIGHT_RELATED = (
+    "route__source__city",
+    "route__source__country",
+    "route__destination__city",
+    "route__destination__country",
+    "airplane__airplane_type",
+)
+TICKET_RELATED = tuple(f"flight__{lookup}" for lookup in FLIGHT_RELATED)
+
+
+class Command(BaseCommand):
+    help = "Time serializers against readers rendering synthetic lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[1_000, 10_000]
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        # Everything created here is rolled back at the end
+        with transaction.atomic():
+            self.create_objects(max(options["sizes"]))
+            for size in options["sizes"]:
+                self.compare(size, options["repeat"])
+            transaction.set_rollback(True)
+
+    def create_objects(self, size):
+        city = City.objects.create(name="Benchmark City")
+        country = Country.objects.create(name="Benchmark Country")
+        airports = Airport.objects.bulk_create(
+            Airport(name=f"Benchmark {number}", city=city, country=country)
+            for number in range(100)
+        )
+        routes = Route.objects.bulk_create(
+            Route(
+                source=airports[number % 100],
+                destination=airports[(number + number // 100 + 1) % 100],
+                distance=1000 + number,
+            )
+            for number in range(500)
+        )
+        airplane_type = AirplaneType.objects.create(name="Benchmark")
+        airplanes = Airplane.objects.bulk_create(
+            Airplane(
+                name=f"Benchmark {number}",
+                airplane_type=airplane_type,
+                rows=30,
+                seats_in_row=6,
+            )
+            for number in range(50)
+        )
+        crew = Crew.objects.bulk_create(
+            Crew(first_name=f"Pilot {number}", last_name="Benchmark")
+            for number in range(20)
+        )
+        departure = timezone.now()
+        flights = Flight.objects.bulk_create(
+            Flight(
+                route=routes[number % 500],
+                airplane=airplanes[number % 50],
+                departure_time=departure,
+                arrival_time=departure,
+            )
+            for number in range(size)
+        )
+        Flight.crew.through.objects.bulk_create(
+            Flight.crew.through(flight=flight, crew=crew[number % 20])
+            for number, flight in enumerate(flights)
+        )
+        user = get_user_model().objects.create_user(
+            email="benchmark@example.com", password="benchmark"
+        )
+        orders = Order.objects.bulk_create(
+            Order(user=user) for _ in range(size)
+        )
+        Ticket.objects.bulk_create(
+            Ticket(row=1, seat=1, flight=flight, order=order)
+            for flight, order in zip(flights, orders)
+        )
+
+    def compare(self, size, repeat):
+        flights = Flight.objects.with_available_seats().order_by("id")
+        tickets = Ticket.objects.order_by("id")
+        orders = Order.objects.order_by("id")
+        for name, serializer_class, queryset, reader in (
+            (
+                "flights",
+                FlightSerializer,
+                flights.select_related(*FLIGHT_RELATED),
+                flight_reader,
+            ),
+            (
+                "tickets",
+                TicketAdminSerializer,
+                tickets.select_related(*TICKET_RELATED).prefetch_related(
+                    "flight__crew"
+                ),
+                ticket_admin_reader,
+            ),
+            (
+                "orders",
+                OrderSerializer,
+                orders.prefetch_related(
+                    Prefetch(
+                        "tickets",
+                        queryset=Ticket.objects.select_related(
+                            *TICKET_RELATED
+                        ),
+                    )
+                ),
+                order_reader,
+            ),
+        ):
+            queryset = queryset[:size]
+            serialized = self.best(
+                repeat,
+                lambda: serializer_class(queryset.all(), many=True).data,
+            )
+            read = self.best(
+                repeat,
+                lambda: reader.read(list(queryset.values(*reader.fields))),
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"{size} {name}: serializer {serialized * 1000:.0f} ms, "
+                f"reader {read * 1000:.0f} ms "
+                f"({serialized / read:.1f}x)"
+            ))
+
+    def best(self, repeat, build):
+        """Fastest of repeat builds and renders, caches warmed up first"""
+        JSONRenderer().render(build())
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            JSONRenderer().render(build())
+            timings.append(time.perf_counter() - started)
+        return min(timings)
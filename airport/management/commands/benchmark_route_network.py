@@ -0,0 +1,61 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport.route_network import RouteNetwork
+
+
+class Command(BaseCommand):
+    help = "Time route network queries on a synthetic network"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--airports", type=int, default=10_000)
+        parser.add_argument("--routes", type=int, default=200_000)
+        parser.add_argument("--queries", type=int, default=100)
+        parser.add_argument("--hops", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        airports = options["airports"]
+
+        def airport():
+            # Skew endpoints towards low ids so the network has hubs
+            return int(airports * rng.random() ** 2) + 1
+
+        routes = []
+        while len(routes) < options["routes"]:
+            source, destination = airport(), airport()
+            if source != destination:
+                routes.append((source, destination, rng.randint(100, 5000)))
+
+        started = time.perf_counter()
+        network = RouteNetwork(routes)
+        self.report("build", time.perf_counter() - started)
+
+        pairs = [
+            (rng.randint(1, airports), rng.randint(1, airports))
+            for _ in range(options["queries"])
+        ]
+        started = time.perf_counter()
+        for source, destination in pairs:
+            network.shortest_path(source, destination)
+        self.report(
+            "shortest path", (time.perf_counter() - started) / len(pairs)
+        )
+
+        started = time.perf_counter()
+        for source, _ in pairs:
+            network.reachable(source, options["hops"])
+        self.report(
+            f"reachable within {options['hops']} hops",
+            (time.perf_counter() - started) / len(pairs),
+        )
+
+        started = time.perf_counter()
+        network.hubs(10)
+        self.report("top 10 hubs", time.perf_counter() - started)
+
+    def report(self, name, seconds):
+        self.stdout.write(self.style.SUCCESS(f"{name}: {seconds * 1000:.2f} ms"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from airport.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete change log entries older than CHANGE_LOG_RETENTION. The "
+        "newest entry is kept, so readers behind it can tell they missed "
+        "purged changes"
+    )
+
+    def handle(self, *args, **options):
+        expired = ChangeLogEntry.objects.expired()
+        newest = ChangeLogEntry.objects.order_by("-id").first()
+        if newest is not None:
+            expired = expired.exclude(pk=newest.pk)
+        purged, _ = expired.delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Purged {purged} change log entries")
+        )
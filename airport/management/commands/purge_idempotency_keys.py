@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from airport.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete idempotency keys past their expiry"
+
+    def handle(self, *args, **options):
+        purged, _ = IdempotencyKey.objects.expired().delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Purged {purged} expired idempotency key(s)")
+        )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from airport.models import Order
+from airport.order_documents import rebuild_documents
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the missing order history documents, or all with --all. "
+        "Changes rebuild the documents they touch once committed, this "
+        "fills in documents of orders from before them or from fixtures"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild documents that are stored already as well",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        orders = Order.objects.order_by("id")
+        if not options["all"]:
+            orders = orders.filter(document__isnull=True)
+
+        built = 0
+        last_id = 0
+        while True:
+            order_ids = list(
+                orders.filter(id__gt=last_id)
+                .values_list("id", flat=True)[:options["batch_size"]]
+            )
+            if not order_ids:
+                break
+            built += rebuild_documents(order_ids, options["batch_size"])
+            last_id = order_ids[-1]
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Built {built} order document(s)")
+        )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from airport.models import City, Country, Airport
+from airport.response_cache import CATALOG_VERSION
+from airport.search import normalize_search_key
+from airport.versions import bump_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Repair search keys of cities, countries and airports that bulk "
+        "operations, like bulk_create or update(name=...), left stale"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        repaired = 0
+        with transaction.atomic():
+            for model in (City, Country, Airport):
+                stale = [
+                    model(pk=pk, search_key=normalize_search_key(name))
+                    for pk, name, search_key in (
+                        model.objects
+                        .order_by("pk")
+                        .values_list("pk", "name", "search_key")
+                        .iterator()
+                    )
+                    if search_key != normalize_search_key(name)
+                ]
+                model.objects.bulk_update(
+                    stale, ["search_key"], batch_size=options["batch_size"]
+                )
+                repaired += len(stale)
+            if repaired:
+                # Cached flight lists were filtered with the stale keys
+                bump_version(CATALOG_VERSION)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Repaired search keys of {repaired} row(s)")
+        )
@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.db.models import Count
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport.availability import publish_availability
+from airport.changes import record_changes
+from airport.models import Flight, Ticket, ChangeLogEntry
+from airport.response_cache import CATALOG_VERSION
+from airport.versions import bump_version
+
+
+class Command(BaseCommand):
+    help = "Repair drifted Flight.sold_seats counters from the ticket table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        repaired = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                # Lock first, in id order like lock_flights, and count in a
+                # later statement that sees the bookings committed meanwhile
+                flight_ids = list(
+                    Flight.objects
+                    .select_for_update()
+                    .filter(pk__gt=last_id)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)[:options["batch_size"]]
+                )
+                if not flight_ids:
+                    break
+                last_id = flight_ids[-1]
+                repaired += self.repair(flight_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Repaired occupancy of {repaired} flight(s)")
+        )
+
+    def repair(self, flight_ids):
+        sold_seats = dict(
+            Ticket.objects
+            .filter(flight_id__in=flight_ids)
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values_list("flight", "count")
+        )
+        drifted = []
+        for flight in Flight.objects.filter(pk__in=flight_ids).order_by("pk"):
+            actual_sold_seats = sold_seats.get(flight.pk, 0)
+            if flight.sold_seats != actual_sold_seats:
+                flight.sold_seats = actual_sold_seats
+                flight.updated_at = timezone.now()
+                drifted.append(flight)
+        if not drifted:
+            return 0
+
+        # bulk_update skips the signals, log and publish the repairs here
+        Flight.objects.bulk_update(drifted, ["sold_seats", "updated_at"])
+        record_changes(drifted, ChangeLogEntry.Action.UPDATED)
+        publish_availability({flight.pk for flight in drifted})
+        bump_version(CATALOG_VERSION)
+        return len(drifted)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from airport.models import SeatHold
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds, releasing their seats"
+
+    def handle(self, *args, **options):
+        _, deleted = SeatHold.objects.expired().delete()
+        released = deleted.get(SeatHold._meta.label, 0)
+        self.stdout.write(
+            self.style.SUCCESS(f"Released {released} expired seat hold(s)")
+        )
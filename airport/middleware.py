@@ -0,0 +1,26 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.decorators import sync_and_async_middleware
+
+
+@sync_and_async_middleware
+def asgi_urlconf_middleware(get_response):
+    """Resolve requests served over ASGI with settings.ASGI_URLCONF
+
+    Checks the request rather than the mode of the chain, which a single
+    sync only middleware turns sync under ASGI as well.
+    """
+    def route(request):
+        if isinstance(request, ASGIRequest):
+            request.urlconf = settings.ASGI_URLCONF
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            route(request)
+            return await get_response(request)
+    else:
+        def middleware(request):
+            route(request)
+            return get_response(request)
+    return middleware
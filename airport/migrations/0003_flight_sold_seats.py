@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-18 18:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_sold_seats(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+    Flight.objects.update(
+        sold_seats=Coalesce(
+            Subquery(
+                Ticket.objects.filter(flight=OuterRef("pk"))
+                .order_by()
+                .values("flight")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0002_alter_airplane_name_alter_airplanetype_name_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="sold_seats",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_sold_seats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.1 on 2026-10-18 18:21
+
+import unicodedata
+
+from django.db import migrations, models
+
+SEARCHABLE_MODELS = ("airport", "city", "country")
+
+
+def normalize_search_key(text):
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).casefold()
+
+
+def populate_search_keys(apps, schema_editor):
+    for model_name in SEARCHABLE_MODELS:
+        model = apps.get_model("airport", model_name)
+        for instance in model.objects.only("name"):
+            instance.search_key = normalize_search_key(instance.name)
+            instance.save(update_fields=["search_key"])
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for model_name in SEARCHABLE_MODELS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS airport_{model_name}_search_key_trgm "
+            f"ON airport_{model_name} USING gin (search_key gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for model_name in SEARCHABLE_MODELS:
+        schema_editor.execute(
+            f"DROP INDEX IF EXISTS airport_{model_name}_search_key_trgm"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0007_flight_time_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="airport",
+            name="search_key",
+            field=models.CharField(default="", editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="city",
+            name="search_key",
+            field=models.CharField(default="", editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="country",
+            name="search_key",
+            field=models.CharField(default="", editable=False, max_length=255),
+        ),
+        migrations.RunPython(populate_search_keys, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
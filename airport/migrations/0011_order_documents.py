@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-18 19:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0010_change_log"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderDocument",
+            fields=[
+                (
+                    "order",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="document",
+                        serialize=False,
+                        to="airport.order",
+                    ),
+                ),
+                ("body", models.TextField()),
+                ("built_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,23 +1,63 @@
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 
-class City(models.Model):
+class UpdatedAtModel(models.Model):
+    """Keep updated_at, when the row last changed, for conditional requests
+
+    Raw saves of fixtures skip auto_now, a pre_save receiver fills in the
+    ones that lack it.
+    """
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields:
+            kwargs["update_fields"] = {*update_fields, "updated_at"}
+        super().save(*args, **kwargs)
+
+
+class SearchKeyModel(UpdatedAtModel):
+    """Keep search_key, the folded form of name, for airport.search
+
+    A pre_save receiver fills it, which fixtures run as well. Bulk
+    operations skip it, rebuild_search_keys repairs their rows.
+    """
+    search_key = models.CharField(max_length=255, editable=False, default="")
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "search_key"}
+        super().save(*args, **kwargs)
+
+
+class City(SearchKeyModel):
     name = models.CharField(max_length=255, unique=True)
 
     def __str__(self):
         return f"{self.name}"
 
 
-class Country(models.Model):
+class Country(SearchKeyModel):
     name = models.CharField(max_length=255, unique=True)
 
     def __str__(self):
         return f"{self.name}"
 
 
-class Airport(models.Model):
+class Airport(SearchKeyModel):
     name = models.CharField(max_length=255, unique=True)
     city = models.ForeignKey(
         City, on_delete=models.CASCADE, related_name="airports"
@@ -30,7 +70,7 @@ class Airport(models.Model):
         return f"{self.name} ({self.city}, {self.country})"
 
 
-class Route(models.Model):
+class Route(UpdatedAtModel):
     source = models.ForeignKey(
         Airport, on_delete=models.CASCADE, related_name="routes_from"
     )
@@ -48,14 +88,14 @@ class Route(models.Model):
         return f"{self.source} - {self.destination}"
 
 
-class AirplaneType(models.Model):
+class AirplaneType(UpdatedAtModel):
     name = models.CharField(max_length=255, unique=True)
 
     def __str__(self):
         return f"{self.name}"
 
 
-class Airplane(models.Model):
+class Airplane(UpdatedAtModel):
     name = models.CharField(max_length=255, unique=True)
     airplane_type = models.ForeignKey(
         AirplaneType, on_delete=models.CASCADE, related_name="airplanes"
@@ -63,6 +103,22 @@ class Airplane(models.Model):
     rows = models.IntegerField()
     seats_in_row = models.IntegerField()
 
+    def clean(self):
+        if self.pk is None:
+            return
+        outside = Q(row__gt=self.rows) | Q(seat__gt=self.seats_in_row)
+        taken = (
+            Ticket.objects.filter(outside, flight__airplane=self).exists()
+            or HeldSeat.objects.live()
+            .filter(outside, flight__airplane=self)
+            .exists()
+        )
+        if taken:
+            raise ValidationError(
+                "Flights of this airplane have tickets or held seats "
+                "outside of these rows and seats."
+            )
+
     def __str__(self):
         return f"{self.name} ({self.airplane_type})"
 
@@ -75,7 +131,33 @@ class Crew(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
-class Flight(models.Model):
+class FlightQuerySet(models.QuerySet):
+    def with_available_seats(self):
+        held_seats = Subquery(
+            HeldSeat.objects
+            .live()
+            .filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        return self.annotate(
+            available_seats=(
+                F("airplane__rows")
+                * F("airplane__seats_in_row")
+                - F("sold_seats")
+                - Coalesce(held_seats, 0)
+            )
+        )
+
+    def add_sold_seats(self, delta):
+        return self.update(
+            sold_seats=F("sold_seats") + delta, updated_at=timezone.now()
+        )
+
+
+class Flight(UpdatedAtModel):
     route = models.ForeignKey(
         Route, on_delete=models.CASCADE, related_name="flights"
     )
@@ -85,6 +167,19 @@ class Flight(models.Model):
     crew = models.ManyToManyField(Crew, blank=True)
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
+    sold_seats = models.IntegerField(default=0, editable=False)
+
+    objects = FlightQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["departure_time", "id"]),
+            models.Index(fields=["arrival_time"]),
+            # City or country and day filters find the few routes to the
+            # destination first, then the day's flights of each route
+            models.Index(fields=["route", "departure_time"]),
+            models.Index(fields=["route", "arrival_time"]),
+        ]
 
     def __str__(self):
         return f"{self.route} - {self.airplane}"
@@ -96,6 +191,11 @@ class Order(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="orders"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"]),
+        ]
+
     def __str__(self):
         return f"{self.user} ({self.created_at})"
 
@@ -132,6 +232,12 @@ class Ticket(models.Model):
                     }
                 )
 
+    def save(self, *args, **kwargs):
+        # Keep the flight's sold_seats counter in the same transaction
+        # as the ticket row, see airport.signals
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def clean(self):
         Ticket.validate_ticket(
             self.row,
@@ -142,3 +248,136 @@ class Ticket(models.Model):
 
     def __str__(self):
         return f"{self.order} (flight: {self.flight})"
+
+
+class OrderDocument(models.Model):
+    """Stored representation of an order in the user's order history
+
+    Kept as JSON text, jsonb would not keep the order of the keys.
+    """
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="document",
+    )
+    body = models.TextField()
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Document of order {self.order_id}"
+
+
+class SeatHoldQuerySet(models.QuerySet):
+    def live(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class SeatHold(models.Model):
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.user} (flight: {self.flight}, until {self.expires_at})"
+
+
+class HeldSeatQuerySet(models.QuerySet):
+    def live(self):
+        return self.filter(hold__expires_at__gt=timezone.now())
+
+
+class HeldSeat(models.Model):
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="held_seats"
+    )
+    hold = models.ForeignKey(
+        SeatHold, on_delete=models.CASCADE, related_name="seats"
+    )
+
+    objects = HeldSeatQuerySet.as_manager()
+
+    class Meta:
+        unique_together = (
+            "row", "seat", "flight"
+        )
+
+    def __str__(self):
+        return f"{self.row}-{self.seat} ({self.hold})"
+
+
+class IdempotencyKeyQuerySet(models.QuerySet):
+    def live(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class IdempotencyKey(models.Model):
+    key = models.CharField(max_length=255)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys"
+    )
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField(db_index=True)
+    # Until when the request that claimed the key may still finish it
+    locked_until = models.DateTimeField(null=True)
+
+    objects = IdempotencyKeyQuerySet.as_manager()
+
+    class Meta:
+        unique_together = (
+            "user", "key"
+        )
+
+    def __str__(self):
+        return f"{self.key} ({self.user})"
+
+
+class ChangeLogEntryQuerySet(models.QuerySet):
+    def expired(self):
+        return self.filter(
+            created_at__lte=timezone.now() - settings.CHANGE_LOG_RETENTION
+        )
+
+
+class ChangeLogEntry(models.Model):
+    """Append-only record of a row change, written in the same transaction"""
+
+    class Action(models.TextChoices):
+        CREATED = "created"
+        UPDATED = "updated"
+        DELETED = "deleted"
+
+    model = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=7, choices=Action.choices)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = ChangeLogEntryQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("id",)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} {self.action}"
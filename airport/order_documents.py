@@ -0,0 +1,132 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+
+from airport.models import (
+    City,
+    Country,
+    Airport,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    Order,
+    OrderDocument,
+)
+from airport.readers import order_reader
+
+REBUILD_BATCH_SIZE = 1000
+
+# Lookups from an order to the objects of each model its document shows
+DOCUMENT_LOOKUPS = {
+    Flight: ("tickets__flight",),
+    Route: ("tickets__flight__route",),
+    Airplane: ("tickets__flight__airplane",),
+    AirplaneType: ("tickets__flight__airplane__airplane_type",),
+    Airport: (
+        "tickets__flight__route__source",
+        "tickets__flight__route__destination",
+    ),
+    City: (
+        "tickets__flight__route__source__city",
+        "tickets__flight__route__destination__city",
+    ),
+    Country: (
+        "tickets__flight__route__source__country",
+        "tickets__flight__route__destination__country",
+    ),
+}
+
+
+def save_documents(rows):
+    """Build and store the documents of order_reader rows, by order id"""
+    bodies = {
+        row["id"]: json.dumps(order)
+        for row, order in zip(rows, order_reader.read(rows))
+    }
+    OrderDocument.objects.bulk_create(
+        [
+            OrderDocument(order_id=order_id, body=body)
+            for order_id, body in bodies.items()
+        ],
+        update_conflicts=True,
+        unique_fields=("order",),
+        update_fields=("body", "built_at"),
+    )
+    return bodies
+
+
+def rebuild_documents(orders, batch_size=REBUILD_BATCH_SIZE):
+    """Store the documents of orders built from their committed rows
+
+    Each batch locks its order rows before reading. A rebuild that read
+    rows a change replaced holds the lock until it has stored its
+    documents, so the rebuild the change schedules after its commit
+    waits for it and stores the current ones last.
+    """
+    order_ids = list(
+        Order.objects.filter(pk__in=orders)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    for start in range(0, len(order_ids), batch_size):
+        with transaction.atomic():
+            rows = list(
+                Order.objects.select_for_update()
+                .filter(pk__in=order_ids[start:start + batch_size])
+                .order_by("id")
+                .values(*order_reader.fields)
+            )
+            save_documents(rows)
+    return len(order_ids)
+
+
+def refresh_documents(orders):
+    """Drop the documents of orders now, rebuild them after the commit
+
+    Until then the order history renders the orders from their rows.
+    """
+    OrderDocument.objects.filter(order__in=orders).delete()
+    transaction.on_commit(lambda: rebuild_documents(orders))
+
+
+def invalidate_documents(instance):
+    """Refresh documents of orders showing instance, see DOCUMENT_LOOKUPS"""
+    lookups = DOCUMENT_LOOKUPS[type(instance)]
+    condition = reduce(
+        or_, (Q(**{lookup: instance.pk}) for lookup in lookups)
+    )
+    refresh_documents(Order.objects.filter(condition).values("pk"))
+
+
+class OrderDocumentReader:
+    """Order history from stored documents, rendering those missing
+
+    Renders what order_reader does without touching tickets or flights
+    as long as every document on the page is stored. Missing documents
+    are not stored here, a request could write one built from rows a
+    change has replaced since; booking and the rebuild after a change
+    store them.
+    """
+    fields = order_reader.fields
+
+    def read(self, rows):
+        bodies = dict(
+            OrderDocument.objects
+            .filter(order__in=[row["id"] for row in rows])
+            .values_list("order", "body")
+        )
+        documents = {
+            order_id: json.loads(body) for order_id, body in bodies.items()
+        }
+        missing = [row for row in rows if row["id"] not in documents]
+        if missing:
+            for row, order in zip(missing, order_reader.read(missing)):
+                documents[row["id"]] = order
+        return [documents[row["id"]] for row in rows]
+
+
+order_document_reader = OrderDocumentReader()
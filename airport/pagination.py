@@ -0,0 +1,304 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+    _reverse_ordering,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class StandardPagePagination(PageNumberPagination):
+    page_size = 5
+    max_page_size = 100
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Cursor pagination on every field of the ordering
+
+    DRF's CursorPagination filters on the first ordering field only and
+    steps over rows sharing its value with an offset. Here the cursor
+    holds the values of all fields, the ordering ending with a unique
+    one, and a page continues after them with (a > x) OR (a = x AND
+    id > y), without an offset. A reverse cursor without a position
+    starts at the end.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset[:self.page_size + 1]))
+
+    def page_queryset(self, queryset, request, view=None):
+        """Queryset ordered and filtered for the page, None if unpaginated"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if self.cursor is not None and self.cursor.reverse:
+            ordering = _reverse_ordering(ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None and self.cursor.position is not None:
+            queryset = queryset.filter(
+                self.following(ordering, self.cursor.position)
+            )
+        return queryset
+
+    def following(self, ordering, position):
+        """Condition on rows after position in ordering"""
+        conditions = []
+        ties = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            conditions.append(Q(**ties, **{f"{name}__{lookup}": value}))
+            ties[name] = value
+        return reduce(or_, conditions)
+
+    def set_page(self, results):
+        """Keep the page of results fetched with one row extra"""
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+        positioned = (
+            self.cursor is not None and self.cursor.position is not None
+        )
+        if self.cursor is not None and self.cursor.reverse:
+            self.page.reverse()
+            self.has_next = positioned
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = positioned
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_position(self, instance):
+        return tuple(
+            str(
+                instance[field.lstrip("-")] if isinstance(instance, dict)
+                else getattr(instance, field.lstrip("-"))
+            )
+            for field in self.ordering
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # Past an empty page of a reverse cursor everything follows
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=self.get_position(
+                self.page[-1]
+            ))
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        # Before an empty page everything precedes, up to the last row
+        position = self.get_position(self.page[0]) if self.page else None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position)
+        )
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not (
+            isinstance(position, list)
+            and len(position) == len(self.ordering)
+            and all(isinstance(value, str) for value in position)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                self.parse_value(field, value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def parse_value(self, field, value):
+        """Position value of an ordering field, as the field would store it"""
+        model_field = self.model._meta.get_field(field.lstrip("-"))
+        value = model_field.to_python(value)
+        model_field.run_validators(value)
+        return value
+
+    def encode_cursor(self, cursor):
+        if cursor.position is not None:
+            cursor = cursor._replace(position=json.dumps(cursor.position))
+        return super().encode_cursor(cursor)
+
+
+class FlightCursorPagination(KeysetCursorPagination):
+    page_size = 2
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("departure_time", "id")
+
+
+class AsyncCursorPaginationMixin:
+    """apaginate_queryset, paginate_queryset of KeysetCursorPagination
+    fetching the page with async for
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(
+            [row async for row in queryset[:self.page_size + 1]]
+        )
+
+
+class AsyncFlightCursorPagination(
+    AsyncCursorPaginationMixin, FlightCursorPagination
+):
+    pass
+
+
+class OrderCursorPagination(KeysetCursorPagination):
+    page_size = 2
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+def estimate_count(queryset):
+    """Row count estimated by the PostgreSQL planner, None elsewhere"""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class FlexibleCountPagination(PageNumberPagination):
+    """Page number pagination with a selectable total count
+
+    "exact" runs COUNT(*), "estimate" reports the planner's row estimate
+    once it is above estimate_threshold and "none" skips the count,
+    fetching one extra row to find out whether there is a next page.
+    The mode comes from ?count=, the view's pagination_count_mode or
+    count_mode, in that order, so responses keep count unless asked.
+    """
+    page_size = 2
+    max_page_size = 100
+    count_mode = "exact"
+    count_mode_query_param = "count"
+    count_modes = ("exact", "estimate", "none")
+    estimate_threshold = 10000
+
+    def get_count_mode(self, request, view=None):
+        count_mode = request.query_params.get(self.count_mode_query_param)
+        if count_mode in self.count_modes:
+            return count_mode
+        return getattr(view, "pagination_count_mode", self.count_mode)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = self.get_count_mode(request, view)
+        if self.count_mode == "exact":
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        try:
+            self.page_number = int(
+                request.query_params.get(self.page_query_param, 1)
+            )
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=request.query_params.get(self.page_query_param),
+                message=InvalidPage.__name__,
+            ))
+
+        if not queryset.ordered:
+            queryset = queryset.order_by("pk")
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and self.page_number > 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=self.page_number, message="That page is empty"
+            ))
+        self.has_next = len(rows) > page_size
+
+        self.count = None
+        self.count_is_estimate = False
+        if self.count_mode == "estimate":
+            self.count = estimate_count(queryset)
+            self.count_is_estimate = (
+                self.count is not None
+                and self.count >= self.estimate_threshold
+            )
+            if not self.count_is_estimate:
+                self.count = queryset.count()
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if self.count_mode == "exact":
+            return super().get_paginated_response(data)
+
+        response = {}
+        if self.count is not None:
+            response["count"] = self.count
+            response["count_is_estimate"] = self.count_is_estimate
+        response["next"] = self.get_next_link()
+        response["previous"] = self.get_previous_link()
+        response["results"] = data
+        return Response(response)
+
+    def get_next_link(self):
+        if self.count_mode == "exact":
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.page_query_param, self.page_number + 1
+        )
+
+    def get_previous_link(self):
+        if self.count_mode == "exact":
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
@@ -0,0 +1,215 @@
+from collections import defaultdict
+
+from django.utils import timezone
+from rest_framework.response import Response
+
+from airport.models import Airport, Airplane, Crew, Ticket
+from airport.serializers import airport_cache, airplane_cache
+from airport.shapes import EXPAND_ALL
+
+DATETIME_FORMAT = "%H:%M:%S %d.%m.%Y"
+
+AIRPORTS = Airport.objects.select_related("city", "country")
+AIRPLANES = Airplane.objects.select_related("airplane_type")
+
+
+def format_datetime(value):
+    """Same as DateTimeField(format=DATETIME_FORMAT).to_representation"""
+    return timezone.localtime(value).strftime(DATETIME_FORMAT)
+
+
+class FlightReader:
+    """Flight representations built straight from values() rows
+
+    Renders what FlightSerializer, or FlightAdminSerializer with crew,
+    renders with every relation expanded. prefix is the lookup of the
+    flight in the rows, like "flight__" for ticket rows.
+    """
+
+    def __init__(self, prefix="", available_seats=False, crew=False):
+        self.available_seats = available_seats
+        self.crew = crew
+        self.id = f"{prefix}id"
+        self.route = f"{prefix}route"
+        self.source = f"{prefix}route__source"
+        self.destination = f"{prefix}route__destination"
+        self.distance = f"{prefix}route__distance"
+        self.airplane = f"{prefix}airplane"
+        self.departure_time = f"{prefix}departure_time"
+        self.arrival_time = f"{prefix}arrival_time"
+        self.fields = (
+            self.id,
+            self.route,
+            self.source,
+            self.destination,
+            self.distance,
+            self.airplane,
+            self.departure_time,
+            self.arrival_time,
+        )
+        if available_seats:
+            # Annotated by Flight.objects.with_available_seats()
+            self.fields += ("available_seats",)
+
+    def crew_rows(self, flight_ids):
+        return Crew.objects.filter(flight__in=flight_ids).values(
+            "flight", "id", "first_name", "last_name"
+        )
+
+    def group_crew(self, members):
+        crew = defaultdict(list)
+        for member in members:
+            crew[member.pop("flight")].append(member)
+        return crew
+
+    def airport_pks(self, rows):
+        return (
+            {row[self.source] for row in rows}
+            | {row[self.destination] for row in rows}
+        )
+
+    def airplane_pks(self, rows):
+        return {row[self.airplane] for row in rows}
+
+    def read(self, rows):
+        airports = airport_cache.get_many(self.airport_pks(rows), AIRPORTS)
+        airplanes = airplane_cache.get_many(
+            self.airplane_pks(rows), AIRPLANES
+        )
+        crew = None
+        if self.crew:
+            crew = self.group_crew(
+                self.crew_rows({row[self.id] for row in rows})
+            )
+        return self.assemble(rows, airports, airplanes, crew)
+
+    async def aread(self, rows):
+        """read for async code"""
+        airports = await airport_cache.aget_many(
+            self.airport_pks(rows), AIRPORTS
+        )
+        airplanes = await airplane_cache.aget_many(
+            self.airplane_pks(rows), AIRPLANES
+        )
+        crew = None
+        if self.crew:
+            crew = self.group_crew(
+                [
+                    member
+                    async for member in self.crew_rows(
+                        {row[self.id] for row in rows}
+                    )
+                ]
+            )
+        return self.assemble(rows, airports, airplanes, crew)
+
+    def assemble(self, rows, airports, airplanes, crew):
+        flights = []
+        for row in rows:
+            flight = {
+                "id": row[self.id],
+                "route": {
+                    "id": row[self.route],
+                    "source": airports[row[self.source]],
+                    "destination": airports[row[self.destination]],
+                    "distance": row[self.distance],
+                },
+                "airplane": airplanes[row[self.airplane]],
+            }
+            if self.crew:
+                flight["crew"] = crew.get(row[self.id], [])
+            if self.available_seats:
+                flight["available_seats"] = row["available_seats"]
+            flight["departure_time"] = format_datetime(
+                row[self.departure_time]
+            )
+            flight["arrival_time"] = format_datetime(row[self.arrival_time])
+            flights.append(flight)
+        return flights
+
+
+class TicketReader:
+    """What TicketSerializer or TicketAdminSerializer render, from rows"""
+
+    def __init__(self, admin=False):
+        self.admin = admin
+        self.flights = FlightReader("flight__", crew=admin)
+        self.fields = ("id", "row", "seat", "order") + self.flights.fields
+
+    def read(self, rows):
+        tickets = []
+        for row, flight in zip(rows, self.flights.read(rows)):
+            ticket = {
+                "id": row["id"],
+                "row": row["row"],
+                "seat": row["seat"],
+                "flight": flight,
+            }
+            if not self.admin:
+                ticket["order"] = row["order"]
+            tickets.append(ticket)
+        return tickets
+
+
+class OrderReader:
+    """What OrderSerializer or OrderAdminSerializer render, from rows"""
+
+    def __init__(self, admin=False):
+        self.admin = admin
+        self.tickets = TicketReader(admin)
+        self.fields = ("id", "user", "created_at")
+
+    def read(self, rows):
+        ticket_rows = list(
+            Ticket.objects
+            .filter(order__in=[row["id"] for row in rows])
+            .order_by("id")
+            .values(*self.tickets.fields)
+        )
+        tickets = defaultdict(list)
+        for row, ticket in zip(ticket_rows, self.tickets.read(ticket_rows)):
+            tickets[row["order"]].append(ticket)
+
+        orders = []
+        for row in rows:
+            order = {"id": row["id"]}
+            if self.admin:
+                order["user"] = row["user"]
+            order["tickets"] = tickets.get(row["id"], [])
+            order["created_at"] = format_datetime(row["created_at"])
+            orders.append(order)
+        return orders
+
+
+flight_reader = FlightReader(available_seats=True)
+ticket_admin_reader = TicketReader(admin=True)
+order_reader = OrderReader()
+order_admin_reader = OrderReader(admin=True)
+
+
+class ReaderListMixin:
+    """List through list_reader instead of the serializer
+
+    Readers skip the serializer field machinery for the default response
+    shape, lists asking for ?fields= or ?expand= still go through the
+    serializer. Readers must render the same data as the serializer.
+    """
+    list_reader = None
+
+    def get_list_reader(self):
+        shape = self.get_shape()
+        if shape.fields is None and shape.expand is EXPAND_ALL:
+            return self.list_reader
+        return None
+
+    def list(self, request, *args, **kwargs):
+        reader = self.get_list_reader()
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.prefetch_related(None).values(*reader.fields)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.read(page))
+        return Response(reader.read(list(rows)))
@@ -0,0 +1,161 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from airport.versions import aget_version, bump_version, get_version
+
+SHARED_KEY = "airport:{}:{}:{}"
+
+# How stale another worker's changes may be before this one notices them
+VERSION_CHECK_INTERVAL = 1.0
+
+
+class ReferenceCache:
+    """Pre-serialized representations of slow-changing reference data
+
+    Entries are kept per worker and, with REFERENCE_CACHE_SHARED, in the
+    default cache under keys carrying the data set version, so a bump
+    drops them everywhere. The version itself is only re-read every
+    VERSION_CHECK_INTERVAL seconds instead of once per entry.
+    """
+
+    def __init__(self, name, serialize):
+        self.name = name
+        self.serialize = serialize
+        self._entries = {}
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _version_check_due(self):
+        return (
+            self._checked_at is None
+            or time.monotonic() - self._checked_at >= VERSION_CHECK_INTERVAL
+        )
+
+    def _checked_version(self, version):
+        with self._lock:
+            if version != self._version:
+                self._entries = {}
+                self._version = version
+            self._checked_at = time.monotonic()
+        return version
+
+    def _current_version(self):
+        if self._version_check_due():
+            return self._checked_version(get_version(self.name))
+        return self._version
+
+    async def _acurrent_version(self):
+        if self._version_check_due():
+            return self._checked_version(await aget_version(self.name))
+        return self._version
+
+    def get(self, instance, field):
+        """Representation of the object instance.field points to
+
+        Only follows the relation, which select_related may have loaded
+        already, when the representation is not cached yet.
+        """
+        pk = getattr(instance, f"{field}_id")
+        version = self._current_version()
+        entries = self._entries
+        data = entries.get(pk)
+        if data is not None:
+            return data
+
+        shared_key = SHARED_KEY.format(self.name, version, pk)
+        if settings.REFERENCE_CACHE_SHARED:
+            data = cache.get(shared_key)
+        if data is None:
+            data = dict(self.serialize(getattr(instance, field)))
+            if settings.REFERENCE_CACHE_SHARED:
+                cache.set(
+                    shared_key,
+                    data,
+                    timeout=settings.REFERENCE_CACHE_TTL.total_seconds(),
+                )
+        entries[pk] = data
+        return data
+
+    def get_many(self, pks, queryset):
+        """Representations of the objects with the pks, by pk
+
+        Objects not cached yet are loaded from queryset in one query.
+        """
+        version = self._current_version()
+        found, missing = self._cached(pks)
+        if missing and settings.REFERENCE_CACHE_SHARED:
+            shared_keys = self._shared_keys(version, missing)
+            self._add_shared(found, shared_keys, cache.get_many(shared_keys))
+            missing = set(shared_keys.values())
+        if missing:
+            loaded = self._serialize_all(queryset.in_bulk(missing))
+            if settings.REFERENCE_CACHE_SHARED:
+                cache.set_many(
+                    self._shared_entries(version, loaded),
+                    timeout=settings.REFERENCE_CACHE_TTL.total_seconds(),
+                )
+            found.update(loaded)
+        return found
+
+    async def aget_many(self, pks, queryset):
+        """get_many for async code"""
+        version = await self._acurrent_version()
+        found, missing = self._cached(pks)
+        if missing and settings.REFERENCE_CACHE_SHARED:
+            shared_keys = self._shared_keys(version, missing)
+            self._add_shared(
+                found, shared_keys, await cache.aget_many(shared_keys)
+            )
+            missing = set(shared_keys.values())
+        if missing:
+            loaded = self._serialize_all(await queryset.ain_bulk(missing))
+            if settings.REFERENCE_CACHE_SHARED:
+                await cache.aset_many(
+                    self._shared_entries(version, loaded),
+                    timeout=settings.REFERENCE_CACHE_TTL.total_seconds(),
+                )
+            found.update(loaded)
+        return found
+
+    def _cached(self, pks):
+        """Entries of this worker by pk and the set of pks it misses"""
+        entries = self._entries
+        found = {pk: entries[pk] for pk in pks if pk in entries}
+        return found, set(pks) - found.keys()
+
+    def _shared_keys(self, version, pks):
+        return {SHARED_KEY.format(self.name, version, pk): pk for pk in pks}
+
+    def _shared_entries(self, version, loaded):
+        return {
+            SHARED_KEY.format(self.name, version, pk): data
+            for pk, data in loaded.items()
+        }
+
+    def _add_shared(self, found, shared_keys, shared):
+        """Move pks found in the shared tier from shared_keys to found"""
+        for key, data in shared.items():
+            pk = shared_keys.pop(key)
+            found[pk] = self._entries[pk] = data
+
+    def _serialize_all(self, instances):
+        loaded = {
+            pk: dict(self.serialize(instance))
+            for pk, instance in instances.items()
+        }
+        self._entries.update(loaded)
+        return loaded
+
+    def expire(self):
+        """Re-read the version on the next lookup"""
+        self._checked_at = None
+
+    def invalidate(self):
+        bump_version(self.name)
+        self.expire()
+        transaction.on_commit(self.expire)
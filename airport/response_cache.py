@@ -0,0 +1,194 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from airport.versions import aget_version, get_version
+
+CATALOG_VERSION = "flight_catalog"
+
+RESPONSE_KEY = "airport:response:2:{}"
+
+# Longest time one worker may spend refreshing an entry for all others
+REFRESH_LOCK_TIMEOUT = 30
+
+
+def response_cache_key(request, basename, action, kwargs):
+    """Cache key of a response for the request, see CachedResponseMixin"""
+    query_params = request.GET
+    params = sorted(
+        (name, value)
+        for name in query_params
+        for value in query_params.getlist(name)
+        if value != ""
+    )
+    identity = json.dumps(
+        [
+            request.get_host(),
+            basename,
+            action,
+            sorted(kwargs.items()),
+            params,
+        ]
+    )
+    return RESPONSE_KEY.format(hashlib.sha256(identity.encode()).hexdigest())
+
+
+def build_entry(version, data, previous=None):
+    """Cache entry of data, validated by a hash of the data
+
+    A rebuild with the data unchanged keeps the ETag and the
+    Last-Modified time of the previous entry.
+    """
+    built_at = time.time()
+    fresh_ttl = settings.RESPONSE_CACHE_FRESH_TTL.total_seconds()
+    content = hashlib.sha256(
+        json.dumps(data, cls=JSONEncoder).encode()
+    ).hexdigest()
+    if previous is not None and previous["content"] == content:
+        modified_at = previous["modified_at"]
+    else:
+        modified_at = int(built_at)
+    return {
+        "version": version,
+        "fresh_until": built_at + fresh_ttl,
+        "modified_at": modified_at,
+        "content": content,
+        "data": data,
+    }
+
+
+def is_current(entry, version):
+    return time.time() < entry["fresh_until"] and entry["version"] == version
+
+
+def get_etag(entry, renderer_format):
+    return quote_etag(f"{entry['content']}.{renderer_format}")
+
+
+def set_validators(response, entry, renderer_format):
+    response["ETag"] = get_etag(entry, renderer_format)
+    response["Last-Modified"] = http_date(entry["modified_at"])
+
+
+def get_not_modified(request, entry, renderer_format):
+    """304 response if the request has the entry already, else None"""
+    return get_conditional_response(
+        request,
+        etag=get_etag(entry, renderer_format),
+        last_modified=entry["modified_at"],
+    )
+
+
+class CachedResponseMixin:
+    """Serve list and retrieve from the cache while the data set is unchanged
+
+    Entries remember the version of cache_version_name they were built
+    from and are kept for RESPONSE_CACHE_STALE_TTL. Once an entry is older
+    than RESPONSE_CACHE_FRESH_TTL or its version is outdated, one worker
+    rebuilds it while the others keep serving the stale copy, so a burst
+    of bumps at the start of a sale doesn't send every request to the
+    database. Only suitable for views whose responses don't depend on the
+    user.
+
+    ETag and Last-Modified follow the content of the entry, so
+    conditional requests are answered with 304 straight from the cache,
+    across rebuilds that don't change the response.
+    """
+    cache_version_name = CATALOG_VERSION
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_response_cache_key(self, request):
+        return response_cache_key(
+            request, self.basename, self.action, self.kwargs
+        )
+
+    def cached_response(self, view, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        version = get_version(self.cache_version_name)
+        entry = cache.get(key)
+        refreshing = entry is not None
+        if refreshing:
+            if is_current(entry, version):
+                return self.replay(request, entry, "HIT")
+            if not cache.add(f"{key}:refresh", 1, REFRESH_LOCK_TIMEOUT):
+                return self.replay(request, entry, "STALE")
+
+        stale_ttl = settings.RESPONSE_CACHE_STALE_TTL.total_seconds()
+        try:
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                entry = build_entry(version, response.data, entry)
+                cache.set(key, entry, stale_ttl)
+                self.set_validators(request, response, entry)
+        finally:
+            if refreshing:
+                cache.delete(f"{key}:refresh")
+        response["X-Cache"] = "MISS"
+        return response
+
+    def set_validators(self, request, response, entry):
+        set_validators(response, entry, request.accepted_renderer.format)
+
+    def replay(self, request, entry, state):
+        response = get_not_modified(
+            request, entry, request.accepted_renderer.format
+        )
+        if response is None:
+            response = Response(entry["data"])
+        self.set_validators(request, response, entry)
+        response["X-Cache"] = state
+        return response
+
+
+async def acached_response(
+    request, key, build, render, version_name=CATALOG_VERSION
+):
+    """CachedResponseMixin.cached_response for async JSON views
+
+    build is awaited for the data of a missing or outdated entry and
+    render turns data into the response. Entries are shared with the
+    DRF views under the same key.
+    """
+    version = await aget_version(version_name)
+    entry = await cache.aget(key)
+    refreshing = entry is not None
+    if refreshing:
+        if is_current(entry, version):
+            return replay_entry(request, entry, render, "HIT")
+        if not await cache.aadd(f"{key}:refresh", 1, REFRESH_LOCK_TIMEOUT):
+            return replay_entry(request, entry, render, "STALE")
+
+    stale_ttl = settings.RESPONSE_CACHE_STALE_TTL.total_seconds()
+    try:
+        entry = build_entry(version, await build(), entry)
+        await cache.aset(key, entry, stale_ttl)
+    finally:
+        if refreshing:
+            await cache.adelete(f"{key}:refresh")
+    response = render(entry["data"])
+    set_validators(response, entry, "json")
+    response["X-Cache"] = "MISS"
+    return response
+
+
+def replay_entry(request, entry, render, state):
+    response = get_not_modified(request, entry, "json")
+    if response is None:
+        response = render(entry["data"])
+    set_validators(response, entry, "json")
+    response["X-Cache"] = state
+    return response
@@ -0,0 +1,146 @@
+import heapq
+import threading
+from array import array
+from collections import deque
+
+from airport.models import Route
+from airport.versions import get_version
+
+VERSION_NAME = "route_network"
+
+
+class RouteNetwork:
+    """Routes as compressed sparse row arrays indexed by airport position
+
+    Departures of the airport at position i are targets[offsets[i]:
+    offsets[i + 1]] with the matching distances, so a whole network of
+    routes takes a few flat arrays instead of a Python object per route.
+    """
+
+    def __init__(self, routes):
+        routes = sorted(routes)
+        self.airport_ids = sorted(
+            {source for source, _, _ in routes}
+            | {destination for _, destination, _ in routes}
+        )
+        self.positions = {
+            airport_id: position
+            for position, airport_id in enumerate(self.airport_ids)
+        }
+
+        size = len(self.airport_ids)
+        self.offsets = array("q", bytes(8 * (size + 1)))
+        self.targets = array("q")
+        self.distances = array("q")
+        self.arrivals = array("q", bytes(8 * size))
+        for source, destination, distance in routes:
+            target = self.positions[destination]
+            self.offsets[self.positions[source] + 1] += 1
+            self.targets.append(target)
+            self.distances.append(distance)
+            self.arrivals[target] += 1
+        for position in range(size):
+            self.offsets[position + 1] += self.offsets[position]
+
+    @classmethod
+    def from_database(cls):
+        return cls(
+            Route.objects.values_list("source_id", "destination_id", "distance")
+        )
+
+    def departures(self, position):
+        """(target position, distance) pairs of an airport's routes"""
+        low, high = self.offsets[position], self.offsets[position + 1]
+        return zip(self.targets[low:high], self.distances[low:high])
+
+    def shortest_path(self, source, destination):
+        """Shortest (distance, airport ids) between airports or None"""
+        start = self.positions.get(source)
+        goal = self.positions.get(destination)
+        if start is None or goal is None:
+            return None
+
+        best = [None] * len(self.airport_ids)
+        best[start] = 0
+        previous = {}
+        heap = [(0, start)]
+        while heap:
+            distance, position = heapq.heappop(heap)
+            if position == goal:
+                path = [goal]
+                while path[-1] != start:
+                    path.append(previous[path[-1]])
+                return distance, [self.airport_ids[p] for p in reversed(path)]
+            if distance > best[position]:
+                continue
+            for target, length in self.departures(position):
+                candidate = distance + length
+                known = best[target]
+                if known is None or candidate < known:
+                    best[target] = candidate
+                    previous[target] = position
+                    heapq.heappush(heap, (candidate, target))
+        return None
+
+    def reachable(self, source, max_hops):
+        """Airport ids reachable from source in 1..max_hops routes"""
+        start = self.positions.get(source)
+        if start is None:
+            return {}
+
+        hops = {start: 0}
+        queue = deque([start])
+        while queue:
+            position = queue.popleft()
+            if hops[position] == max_hops:
+                continue
+            for target, _ in self.departures(position):
+                if target not in hops:
+                    hops[target] = hops[position] + 1
+                    queue.append(target)
+        del hops[start]
+        return {
+            self.airport_ids[position]: count
+            for position, count in hops.items()
+        }
+
+    def hubs(self, limit):
+        """Airports with the most departing plus arriving routes"""
+        offsets, arrivals = self.offsets, self.arrivals
+        ranking = heapq.nsmallest(
+            limit,
+            range(len(self.airport_ids)),
+            key=lambda p: (
+                -(offsets[p + 1] - offsets[p] + arrivals[p]),
+                self.airport_ids[p],
+            ),
+        )
+        return [
+            {
+                "airport": self.airport_ids[position],
+                "departures": offsets[position + 1] - offsets[position],
+                "arrivals": arrivals[position],
+                "degree": (
+                    offsets[position + 1] - offsets[position]
+                    + arrivals[position]
+                ),
+            }
+            for position in ranking
+        ]
+
+
+_network = None
+_network_version = None
+_network_lock = threading.Lock()
+
+
+def get_network():
+    """Route network of this worker, rebuilt when routes change"""
+    global _network, _network_version
+    version = get_version(VERSION_NAME)
+    if _network is None or _network_version != version:
+        with _network_lock:
+            if _network is None or _network_version != version:
+                _network = RouteNetwork.from_database()
+                _network_version = version
+    return _network
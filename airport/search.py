@@ -0,0 +1,21 @@
+import unicodedata
+
+
+def normalize_search_key(text):
+    """Case and accent folded form of a name, e.g. "Zürich" -> "zurich" """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).casefold()
+
+
+def matching_ids(model, text):
+    """Ids of City, Country or Airport rows whose name contains text
+
+    A values queryset, which filtering on it turns into a subquery.
+    """
+    return (
+        model.objects
+        .filter(search_key__contains=normalize_search_key(text))
+        .values("id")
+    )
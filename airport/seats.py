@@ -0,0 +1,41 @@
+import base64
+
+
+def seat_index(row, seat, seats_in_row):
+    return (row - 1) * seats_in_row + (seat - 1)
+
+
+def build_seat_bitmap(rows, seats_in_row, taken_seats):
+    """Pack taken (row, seat) pairs into a bitset of rows * seats_in_row bits.
+
+    Seat (row, seat) maps to bit (row - 1) * seats_in_row + (seat - 1),
+    counted from the most significant bit of the first byte. Pairs
+    outside the airplane, left by resizing it, are skipped.
+    """
+    bitmap = bytearray((rows * seats_in_row + 7) // 8)
+    for row, seat in taken_seats:
+        if not (1 <= row <= rows and 1 <= seat <= seats_in_row):
+            continue
+        index = seat_index(row, seat, seats_in_row)
+        bitmap[index // 8] |= 0x80 >> (index % 8)
+    return bytes(bitmap)
+
+
+def taken_seats(flight):
+    """(row, seat) pairs of the flight that are sold or held"""
+    return flight.tickets.values_list("row", "seat").union(
+        flight.held_seats.live().values_list("row", "seat"), all=True
+    )
+
+
+def seat_map(flight, taken_seats):
+    airplane = flight.airplane
+    bitmap = build_seat_bitmap(
+        airplane.rows, airplane.seats_in_row, taken_seats
+    )
+    return {
+        "flight": flight.id,
+        "rows": airplane.rows,
+        "seats_in_row": airplane.seats_in_row,
+        "taken": base64.b64encode(bitmap).decode("ascii"),
+    }
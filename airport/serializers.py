@@ -1,7 +1,14 @@
+import json
+
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 
+from airport.availability import publish_availability
+from airport.booking import book_tickets, book_hold, hold_seats
 from airport.models import (
     Airport,
     Route,
@@ -13,7 +20,17 @@ from airport.models import (
     Country,
     Ticket,
     Order,
+    OrderDocument,
+    SeatHold,
+    HeldSeat,
+    ChangeLogEntry,
+)
+from airport.identity_map import (
+    IdentityMapRelatedField,
+    IdentityMapSerializerMixin,
 )
+from airport.reference_cache import ReferenceCache
+from airport.shapes import ShapedSerializerMixin
 
 
 class CitySerializer(serializers.ModelSerializer):
@@ -34,7 +51,7 @@ class CountrySerializer(serializers.ModelSerializer):
         )
 
 
-class AirportSerializer(serializers.ModelSerializer):
+class AirportSerializer(ShapedSerializerMixin, serializers.ModelSerializer):
     city = serializers.SlugRelatedField(
         queryset=City.objects.all(),
         slug_field="name"
@@ -54,11 +71,20 @@ class AirportSerializer(serializers.ModelSerializer):
         )
 
 
-class RouteSerializer(serializers.ModelSerializer):
-    source = serializers.PrimaryKeyRelatedField(
+airport_cache = ReferenceCache(
+    "reference:airport", lambda airport: AirportSerializer(airport).data
+)
+
+
+class RouteSerializer(
+    IdentityMapSerializerMixin,
+    ShapedSerializerMixin,
+    serializers.ModelSerializer,
+):
+    source = IdentityMapRelatedField(
         queryset=Airport.objects.all()
     )
-    destination = serializers.PrimaryKeyRelatedField(
+    destination = IdentityMapRelatedField(
         queryset=Airport.objects.all()
     )
 
@@ -70,41 +96,13 @@ class RouteSerializer(serializers.ModelSerializer):
             "destination",
             "distance"
         )
+        expandable_fields = ("source", "destination")
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["source"] = AirportSerializer(
-            instance.source
-        ).data
-        representation["destination"] = AirportSerializer(
-            instance.destination
-        ).data
-        return representation
-
-    def to_internal_value(self, data):
-        internal_value = super().to_internal_value(data)
-        source_data = data.get("source")
-        destination_data = data.get("destination")
-
-        if isinstance(source_data, dict):
-            internal_value["source"] = Airport.objects.get(
-                id=source_data["id"]
-            )
-        elif isinstance(source_data, int):
-            internal_value["source"] = Airport.objects.get(
-                id=source_data
-            )
-
-        if isinstance(destination_data, dict):
-            internal_value["destination"] = Airport.objects.get(
-                id=destination_data["id"]
-            )
-        elif isinstance(destination_data, int):
-            internal_value["destination"] = Airport.objects.get(
-                id=destination_data
-            )
+    def expand_source(self, instance, expand):
+        return airport_cache.get(instance, "source")
 
-        return internal_value
+    def expand_destination(self, instance, expand):
+        return airport_cache.get(instance, "destination")
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
@@ -116,7 +114,11 @@ class AirplaneTypeSerializer(serializers.ModelSerializer):
         )
 
 
-class AirplaneSerializer(serializers.ModelSerializer):
+class AirplaneSerializer(
+    IdentityMapSerializerMixin,
+    ShapedSerializerMixin,
+    serializers.ModelSerializer,
+):
     model = serializers.SlugRelatedField(
         read_only=True, slug_field="name", source="airplane_type"
     )
@@ -136,6 +138,11 @@ class AirplaneSerializer(serializers.ModelSerializer):
         }
 
 
+airplane_cache = ReferenceCache(
+    "reference:airplane", lambda airplane: AirplaneSerializer(airplane).data
+)
+
+
 class CrewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Crew
@@ -150,17 +157,21 @@ class CrewSerializer(serializers.ModelSerializer):
         }
 
 
-class FlightSerializer(serializers.ModelSerializer):
+class FlightSerializer(
+    IdentityMapSerializerMixin,
+    ShapedSerializerMixin,
+    serializers.ModelSerializer,
+):
     departure_time = serializers.DateTimeField(
         format="%H:%M:%S %d.%m.%Y"
     )
     arrival_time = serializers.DateTimeField(
         format="%H:%M:%S %d.%m.%Y"
     )
-    airplane = serializers.PrimaryKeyRelatedField(
+    airplane = IdentityMapRelatedField(
         queryset=Airplane.objects.all()
     )
-    route = serializers.PrimaryKeyRelatedField(
+    route = IdentityMapRelatedField(
         queryset=Route.objects.all()
     )
     available_seats = serializers.IntegerField(read_only=True)
@@ -175,20 +186,17 @@ class FlightSerializer(serializers.ModelSerializer):
             "departure_time",
             "arrival_time",
         )
+        expandable_fields = ("airplane", "route")
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["airplane"] = AirplaneSerializer(
-            instance.airplane
-        ).data
-        representation["route"] = RouteSerializer(
-            instance.route
-        ).data
-        return representation
+    def expand_airplane(self, instance, expand):
+        return airplane_cache.get(instance, "airplane")
+
+    def expand_route(self, instance, expand):
+        return RouteSerializer(instance.route, context={"expand": expand}).data
 
 
 class FlightAdminSerializer(FlightSerializer):
-    crew = serializers.PrimaryKeyRelatedField(
+    crew = IdentityMapRelatedField(
         queryset=Crew.objects.all(), many=True
     )
 
@@ -202,55 +210,43 @@ class FlightAdminSerializer(FlightSerializer):
             "departure_time",
             "arrival_time",
         )
+        expandable_fields = ("airplane", "route", "crew")
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["crew"] = CrewSerializer(
-            instance.crew.all(), many=True
-        ).data
-        return representation
-
-    def to_internal_value(self, data):
-        internal_value = super().to_internal_value(data)
-        airplane_data = data.get("airplane")
-        route_data = data.get("route")
-        crew_data = data.get("crew")
-
-        if isinstance(airplane_data, dict):
-            internal_value["airplane"] = Airplane.objects.get(
-                id=airplane_data["id"]
-            )
-        elif isinstance(airplane_data, int):
-            internal_value["airplane"] = Airplane.objects.get(
-                id=airplane_data
-            )
-
-        if isinstance(route_data, dict):
-            internal_value["route"] = Route.objects.get(
-                id=route_data["id"]
-            )
-        elif isinstance(route_data, int):
-            internal_value["route"] = Route.objects.get(
-                id=route_data
-            )
-
-        if isinstance(crew_data, list):
-            internal_value["crew"] = Crew.objects.filter(
-                id__in=[c["id"] for c in crew_data]
-            )
-        elif isinstance(crew_data, int):
-            internal_value["crew"] = Crew.objects.get(
-                id=crew_data
-            )
+    def expand_crew(self, instance, expand):
+        return CrewSerializer(instance.crew.all(), many=True).data
 
-        return internal_value
 
+class TicketListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child.preload_related(data)
+        return super().to_internal_value(data)
 
-class TicketSerializer(serializers.ModelSerializer):
-    flight = serializers.PrimaryKeyRelatedField(
-        queryset=Flight.objects.all()
+    def validate(self, attrs):
+        seats = [
+            (ticket["flight"].id, ticket["row"], ticket["seat"])
+            for ticket in attrs
+        ]
+        if len(set(seats)) != len(seats):
+            raise ValidationError("Each seat can only be booked once")
+        return attrs
+
+
+class TicketSerializer(
+    IdentityMapSerializerMixin,
+    ShapedSerializerMixin,
+    serializers.ModelSerializer,
+):
+    flight = IdentityMapRelatedField(
+        queryset=Flight.objects.select_related("airplane")
     )
 
+    def get_validators(self):
+        # Taken seats of nested tickets are checked by book_tickets
+        if isinstance(self.parent, TicketListSerializer):
+            return []
+        return super().get_validators()
+
     def validate(self, attrs):
         data = super().validate(attrs=attrs)
         Ticket.validate_ticket(
@@ -270,28 +266,14 @@ class TicketSerializer(serializers.ModelSerializer):
             "flight",
             "order"
         )
+        read_only_fields = ("order",)
+        list_serializer_class = TicketListSerializer
+        expandable_fields = ("flight",)
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["flight"] = FlightSerializer(
-            instance.flight
+    def expand_flight(self, instance, expand):
+        return FlightSerializer(
+            instance.flight, context={"expand": expand}
         ).data
-        return representation
-
-    def to_internal_value(self, data):
-        internal_value = super().to_internal_value(data)
-        flight_data = data.get("flight")
-
-        if isinstance(flight_data, dict):
-            internal_value["flight"] = Flight.objects.get(
-                id=flight_data["id"]
-            )
-        elif isinstance(flight_data, int):
-            internal_value["flight"] = Flight.objects.get(
-                id=flight_data
-            )
-
-        return internal_value
 
 
 class TicketAdminSerializer(TicketSerializer):
@@ -303,18 +285,70 @@ class TicketAdminSerializer(TicketSerializer):
             "seat",
             "flight",
         )
+        list_serializer_class = TicketListSerializer
+        expandable_fields = ("flight",)
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["flight"] = FlightAdminSerializer(
-            instance.flight
+    def expand_flight(self, instance, expand):
+        return FlightAdminSerializer(
+            instance.flight, context={"expand": expand}
         ).data
-        return representation
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class HeldSeatSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = HeldSeat
+        fields = (
+            "row",
+            "seat",
+        )
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    seats = HeldSeatSerializer(many=True, allow_empty=False)
+    expires_at = serializers.DateTimeField(
+        format="%H:%M:%S %d.%m.%Y", read_only=True
+    )
+
+    class Meta:
+        model = SeatHold
+        fields = (
+            "id",
+            "flight",
+            "seats",
+            "expires_at",
+        )
+        read_only_fields = ("flight",)
+
+    def validate_seats(self, seats):
+        airplane = self.context["flight"].airplane
+        for seat in seats:
+            Ticket.validate_ticket(
+                seat["row"], seat["seat"], airplane, ValidationError
+            )
+        if len({(seat["row"], seat["seat"]) for seat in seats}) != len(seats):
+            raise ValidationError("Each seat can only be held once")
+        return seats
+
+    def create(self, validated_data):
+        return hold_seats(
+            validated_data["flight"],
+            validated_data["user"],
+            [(seat["row"], seat["seat"]) for seat in validated_data["seats"]],
+        )
+
+
+class OrderSerializer(
+    IdentityMapSerializerMixin,
+    ShapedSerializerMixin,
+    serializers.ModelSerializer,
+):
     tickets = TicketSerializer(
-        many=True, read_only=False, allow_empty=False
+        many=True, read_only=False, allow_empty=False, required=False
+    )
+    hold = IdentityMapRelatedField(
+        queryset=SeatHold.objects.select_related("flight"),
+        write_only=True,
+        required=False,
     )
     created_at = serializers.DateTimeField(
         format="%H:%M:%S %d.%m.%Y", read_only=True
@@ -325,18 +359,55 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = (
             "id",
             "tickets",
+            "hold",
             "created_at"
         )
 
+    def validate(self, attrs):
+        data = super().validate(attrs=attrs)
+        if ("tickets" in attrs) == ("hold" in attrs):
+            raise ValidationError(
+                "Provide either tickets or a seat hold to book"
+            )
+        hold = attrs.get("hold")
+        if hold is not None:
+            request = self.context.get("request")
+            if request is None or hold.user_id != request.user.id:
+                raise ValidationError({"hold": "Seat hold not found."})
+            if hold.expires_at <= timezone.now():
+                raise ValidationError({"hold": "Seat hold has expired."})
+        return data
+
     def create(self, validated_data):
         with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
+            tickets_data = validated_data.pop("tickets", None)
+            hold = validated_data.pop("hold", None)
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(
-                    order=order, **ticket_data
-                )
-            return order
+            if hold is not None:
+                tickets = book_hold(order, hold)
+            else:
+                tickets = book_tickets(order, tickets_data)
+            publish_availability({ticket.flight_id for ticket in tickets})
+
+            prefetch_related_objects(
+                [order],
+                Prefetch(
+                    "tickets",
+                    queryset=Ticket.objects.select_related(
+                        "flight__route__source__city",
+                        "flight__route__source__country",
+                        "flight__route__destination__city",
+                        "flight__route__destination__country",
+                        "flight__airplane__airplane_type",
+                    ).order_by("id"),
+                ),
+            )
+            # The order history lists the document instead of the tickets,
+            # it commits with the order
+            OrderDocument.objects.create(
+                order=order, body=json.dumps(OrderSerializer(order).data)
+            )
+        return order
 
 
 class OrderAdminSerializer(OrderSerializer):
@@ -352,3 +423,112 @@ class OrderAdminSerializer(OrderSerializer):
             "tickets",
             "created_at"
         )
+
+
+class DurationMinutesField(serializers.Field):
+    def to_representation(self, value):
+        return int(value.total_seconds() // 60)
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    from_ = serializers.PrimaryKeyRelatedField(queryset=Airport.objects.all())
+    to = serializers.PrimaryKeyRelatedField(queryset=Airport.objects.all())
+    date = serializers.DateField()
+    max_legs = serializers.IntegerField(min_value=1, max_value=3, default=2)
+    min_connection = serializers.IntegerField(min_value=0, default=45)
+    max_connection = serializers.IntegerField(min_value=0, default=360)
+    seats = serializers.IntegerField(min_value=1, default=1)
+    sort = serializers.ChoiceField(
+        choices=("duration", "distance"), default="duration"
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields["from"] = fields.pop("from_")
+        return fields
+
+    def validate(self, attrs):
+        data = super().validate(attrs=attrs)
+        if attrs["from"] == attrs["to"]:
+            raise ValidationError("Departure and arrival airports must differ")
+        if attrs["min_connection"] > attrs["max_connection"]:
+            raise ValidationError(
+                "min_connection can't be longer than max_connection"
+            )
+        return data
+
+
+class ItineraryLegSerializer(serializers.Serializer):
+    flight = serializers.IntegerField(source="id")
+    source = serializers.IntegerField()
+    destination = serializers.IntegerField()
+    distance = serializers.IntegerField()
+    departure_time = serializers.DateTimeField(format="%H:%M:%S %d.%m.%Y")
+    arrival_time = serializers.DateTimeField(format="%H:%M:%S %d.%m.%Y")
+    available_seats = serializers.IntegerField()
+
+
+class ItinerarySerializer(serializers.Serializer):
+    legs = ItineraryLegSerializer(many=True)
+    duration = DurationMinutesField()
+    distance = serializers.IntegerField()
+    connections = serializers.ListField(child=DurationMinutesField())
+
+
+class RouteNetworkQuerySerializer(serializers.Serializer):
+    """Query parameters of a route network endpoint, from_ read as ?from=
+
+    Parameters the endpoint doesn't declare are rejected.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if "from_" in fields:
+            fields["from"] = fields.pop("from_")
+        return fields
+
+    def to_internal_value(self, data):
+        unknown = (
+            set(data) - set(self.fields) - {api_settings.URL_FORMAT_OVERRIDE}
+        )
+        if unknown:
+            raise ValidationError(
+                {name: "Unknown parameter." for name in sorted(unknown)}
+            )
+        return super().to_internal_value(data)
+
+
+class ShortestRouteQuerySerializer(RouteNetworkQuerySerializer):
+    from_ = serializers.IntegerField()
+    to = serializers.IntegerField()
+
+
+class ReachableQuerySerializer(RouteNetworkQuerySerializer):
+    from_ = serializers.IntegerField()
+    hops = serializers.IntegerField(min_value=1, max_value=6, default=2)
+
+
+class HubsQuerySerializer(RouteNetworkQuerySerializer):
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class ChangeLogEntrySerializer(serializers.ModelSerializer):
+    available_seats = serializers.IntegerField(read_only=True, default=None)
+
+    class Meta:
+        model = ChangeLogEntry
+        fields = (
+            "id",
+            "model",
+            "object_id",
+            "action",
+            "data",
+            "available_seats",
+            "created_at",
+        )
+
+
+class ChangeFeedQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=100)
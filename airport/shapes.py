@@ -0,0 +1,189 @@
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+# Expand tree of responses without ?expand=, every relation expanded
+EXPAND_ALL = None
+
+
+def parse_names(value):
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def parse_expand(value):
+    """Tree of expanded relations from "route.source,airplane"
+
+    {"route": {"source": {}}, "airplane": {}}, empty dicts meaning the
+    relation is expanded but none of its own relations are.
+    """
+    tree = {}
+    for path in parse_names(value):
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def subtree(expand, name):
+    """Expand tree below the relation name or None if it isn't expanded"""
+    if expand is EXPAND_ALL:
+        return EXPAND_ALL
+    return expand.get(name)
+
+
+class Shape:
+    """Fields and expanded relations a response was asked for"""
+
+    def __init__(self, fields=None, expand=EXPAND_ALL):
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def from_query_params(cls, query_params):
+        fields = query_params.get("fields")
+        expand = query_params.get("expand")
+        return cls(
+            fields=None if fields is None else set(parse_names(fields)),
+            expand=EXPAND_ALL if expand is None else parse_expand(expand),
+        )
+
+    def includes(self, path):
+        """Whether the dotted relation path is rendered expanded"""
+        names = path.split(".")
+        if self.fields is not None and names[0] not in self.fields:
+            return False
+        expand = self.expand
+        for name in names:
+            if expand is EXPAND_ALL:
+                return True
+            expand = expand.get(name)
+            if expand is None:
+                return False
+        return True
+
+    def renders(self, path):
+        """Whether the dotted relation path is rendered at all, maybe as pks"""
+        parent, _, name = path.rpartition(".")
+        if parent:
+            return self.includes(parent)
+        return self.fields is None or name in self.fields
+
+    def nested(self, name):
+        """Shape of a relation always rendered nested, like order tickets"""
+        if self.expand is EXPAND_ALL:
+            return Shape()
+        return Shape(expand=self.expand.get(name, {}))
+
+    def apply(self, queryset, select_related_paths, prefetch_related_paths):
+        """Join the relation paths the shape renders to the queryset"""
+        for path, lookups in select_related_paths.items():
+            if self.includes(path):
+                queryset = queryset.select_related(*lookups)
+        for path, lookups in prefetch_related_paths.items():
+            if self.renders(path):
+                queryset = queryset.prefetch_related(*lookups)
+        return queryset
+
+
+class ShapedSerializerMixin:
+    """Render only ?fields= and expand only the relations in ?expand=
+
+    Relations in Meta.expandable_fields are rendered by expand_<name>(
+    instance, expand), which gets the expand tree below the relation, and
+    as plain pks when the relation isn't expanded. The shape is read from
+    the "fields" and "expand" context keys, fields only restrict the top
+    level serializer.
+    """
+
+    def is_top_level(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only = self.context.get("fields")
+        if only is not None and self.is_top_level():
+            fields = {
+                name: field for name, field in fields.items() if name in only
+            }
+        return fields
+
+    def get_expand(self):
+        """Expand tree of this serializer from the one of the root"""
+        expand = self.context.get("expand", EXPAND_ALL)
+        names = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                names.append(node.field_name)
+            node = node.parent
+        for name in reversed(names):
+            if expand is EXPAND_ALL:
+                break
+            expand = expand.get(name, {})
+        return expand
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        expand = self.get_expand()
+        for name in getattr(self.Meta, "expandable_fields", ()):
+            below = subtree(expand, name)
+            if name in representation and (
+                expand is EXPAND_ALL or below is not None
+            ):
+                representation[name] = getattr(self, f"expand_{name}")(
+                    instance, below
+                )
+        return representation
+
+
+class ShapedViewMixin:
+    """Pass ?fields= and ?expand= to the serializer and join accordingly
+
+    select_related_paths maps relation paths to the lookups joined when
+    the relation is expanded. prefetch_related_paths does the same for
+    many-to-many relations, which need their rows even when rendered as
+    pks. nested_prefetches maps relations rendered by a nested serializer
+    to the queryset prefetched for them and its own relation paths.
+    """
+    select_related_paths = {}
+    prefetch_related_paths = {}
+    nested_prefetches = {}
+
+    def get_shape(self):
+        if self.request.method in ("GET", "HEAD"):
+            return Shape.from_query_params(self.request.query_params)
+        return Shape()
+
+    def get_serializer_context(self):
+        shape = self.get_shape()
+        return {
+            **super().get_serializer_context(),
+            "fields": shape.fields,
+            "expand": shape.expand,
+        }
+
+    def shape_queryset(self, queryset):
+        shape = self.get_shape()
+        queryset = shape.apply(
+            queryset, self.select_related_paths, self.prefetch_related_paths
+        )
+        for name, nested in self.nested_prefetches.items():
+            if shape.renders(name):
+                related, select_paths, prefetch_paths = nested
+                queryset = queryset.prefetch_related(Prefetch(
+                    name,
+                    queryset=shape.nested(name).apply(
+                        related, select_paths, prefetch_paths
+                    ),
+                ))
+        return queryset
+
+
+def nest_paths(name, paths):
+    """Relation paths of a related object as seen from its parent"""
+    return {
+        f"{name}.{path}": tuple(f"{name}__{lookup}" for lookup in lookups)
+        for path, lookups in paths.items()
+    }
@@ -0,0 +1,199 @@
+from django.db.models.signals import (
+    pre_save,
+    post_save,
+    pre_delete,
+    post_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from airport import autocomplete, route_network
+from airport.availability import publish_availability, publish_hold
+from airport.booking import lock_flights, lock_deleted_flights
+from airport.changes import change_entry
+from airport.models import (
+    Flight,
+    Ticket,
+    Airport,
+    City,
+    Country,
+    Route,
+    AirplaneType,
+    Airplane,
+    SeatHold,
+    ChangeLogEntry,
+)
+from airport.order_documents import invalidate_documents, refresh_documents
+from airport.response_cache import CATALOG_VERSION
+from airport.search import normalize_search_key
+from airport.serializers import airport_cache, airplane_cache
+from airport.versions import bump_version
+
+
+@receiver(pre_save, sender=Flight)
+@receiver(pre_save, sender=Route)
+@receiver(pre_save, sender=Airplane)
+@receiver(pre_save, sender=AirplaneType)
+@receiver(pre_save, sender=Airport)
+@receiver(pre_save, sender=City)
+@receiver(pre_save, sender=Country)
+def fill_updated_at(sender, instance, raw, **kwargs):
+    # Raw saves skip auto_now, fixtures from before updated_at lack it
+    if raw and instance.updated_at is None:
+        instance.updated_at = timezone.now()
+
+
+@receiver(pre_save, sender=Airport)
+@receiver(pre_save, sender=City)
+@receiver(pre_save, sender=Country)
+def fill_search_key(sender, instance, **kwargs):
+    instance.search_key = normalize_search_key(instance.name)
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_flight(sender, instance, raw, **kwargs):
+    instance._previous_flight_id = None
+    if instance.pk and not raw:
+        instance._previous_flight_id = (
+            Ticket.objects
+            .filter(pk=instance.pk)
+            .values_list("flight_id", flat=True)
+            .first()
+        )
+    if not raw:
+        # Take flight locks before the ticket row, as book_tickets does
+        lock_flights({instance._previous_flight_id, instance.flight_id})
+
+
+@receiver(post_save, sender=Ticket)
+def update_sold_seats_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        # Fixtures carry their own counters, use recount_occupancy
+        return
+    previous_flight_id = getattr(instance, "_previous_flight_id", None)
+    if created or previous_flight_id is None:
+        Flight.objects.filter(pk=instance.flight_id).add_sold_seats(1)
+    elif previous_flight_id != instance.flight_id:
+        Flight.objects.filter(pk=previous_flight_id).add_sold_seats(-1)
+        Flight.objects.filter(pk=instance.flight_id).add_sold_seats(1)
+    publish_availability({previous_flight_id, instance.flight_id} - {None})
+
+
+@receiver(pre_delete, sender=Ticket)
+def lock_ticket_flight(sender, instance, origin=None, **kwargs):
+    # Re-locks the flight, unless the deletion started elsewhere
+    lock_deleted_flights(origin)
+    lock_flights({instance.flight_id})
+
+
+@receiver(post_delete, sender=Ticket)
+def update_sold_seats_on_delete(sender, instance, **kwargs):
+    Flight.objects.filter(pk=instance.flight_id).add_sold_seats(-1)
+    publish_availability({instance.flight_id})
+
+
+@receiver(post_save, sender=SeatHold)
+def publish_saved_hold(sender, instance, raw, **kwargs):
+    if not raw:
+        publish_hold(instance.flight_id, instance.expires_at)
+
+
+@receiver(post_delete, sender=SeatHold)
+def publish_deleted_hold(sender, instance, **kwargs):
+    publish_availability({instance.flight_id})
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Airport)
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=Country)
+def invalidate_autocomplete(sender, **kwargs):
+    bump_version(autocomplete.VERSION_NAME)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def invalidate_route_network(sender, **kwargs):
+    bump_version(route_network.VERSION_NAME)
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Airport)
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=Country)
+def invalidate_airport_cache(sender, **kwargs):
+    airport_cache.invalidate()
+
+
+@receiver(post_save, sender=Airplane)
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_delete, sender=AirplaneType)
+def invalidate_airplane_cache(sender, **kwargs):
+    airplane_cache.invalidate()
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_save, sender=Route)
+@receiver(post_save, sender=Airplane)
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_save, sender=Airport)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Country)
+@receiver(post_save, sender=Ticket)
+@receiver(post_save, sender=SeatHold)
+@receiver(post_delete, sender=Flight)
+@receiver(post_delete, sender=Route)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_delete, sender=Airport)
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=Country)
+@receiver(post_delete, sender=Ticket)
+@receiver(post_delete, sender=SeatHold)
+def invalidate_flight_catalog(sender, **kwargs):
+    bump_version(CATALOG_VERSION)
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_save, sender=Route)
+@receiver(post_save, sender=Airplane)
+@receiver(post_save, sender=Ticket)
+@receiver(post_save, sender=SeatHold)
+def log_saved_change(sender, instance, created, **kwargs):
+    if created:
+        change_entry(instance, ChangeLogEntry.Action.CREATED).save()
+    else:
+        change_entry(instance, ChangeLogEntry.Action.UPDATED).save()
+
+
+@receiver(post_delete, sender=Flight)
+@receiver(post_delete, sender=Route)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_delete, sender=Ticket)
+@receiver(post_delete, sender=SeatHold)
+def log_deleted_change(sender, instance, **kwargs):
+    change_entry(instance, ChangeLogEntry.Action.DELETED).save()
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_save, sender=Route)
+@receiver(post_save, sender=Airplane)
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_save, sender=Airport)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Country)
+def invalidate_order_documents(sender, instance, created, **kwargs):
+    # Deleted objects take their tickets along, see the ticket receiver
+    if not created:
+        invalidate_documents(instance)
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidate_ticket_order_document(sender, instance, **kwargs):
+    refresh_documents([instance.order_id])
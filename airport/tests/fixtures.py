@@ -0,0 +1,62 @@
+from airport.models import (
+    City,
+    Country,
+    Airport,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+)
+
+DEPARTURE_TIME = "2024-08-07T14:00:00Z"
+ARRIVAL_TIME = "2024-08-07T16:00:00Z"
+
+
+def create_airports(count=2):
+    """Airports "Airport 1" to "Airport {count}" in one city and country"""
+    city = City.objects.create(name="Test City")
+    country = Country.objects.create(name="Test Country")
+    return [
+        Airport.objects.create(
+            name=f"Airport {number}", city=city, country=country
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+def create_route(source=None, destination=None, distance=1000):
+    """Route between source and destination, or two new airports"""
+    if source is None and destination is None:
+        source, destination = create_airports()
+    return Route.objects.create(
+        source=source, destination=destination, distance=distance
+    )
+
+
+def create_airplane(
+    name="Airplane 1", airplane_type=None, rows=10, seats_in_row=4
+):
+    """Airplane of airplane_type, or of a new "Boeing 747" type"""
+    if airplane_type is None:
+        airplane_type = AirplaneType.objects.create(name="Boeing 747")
+    return Airplane.objects.create(
+        name=name,
+        airplane_type=airplane_type,
+        rows=rows,
+        seats_in_row=seats_in_row,
+    )
+
+
+def create_flight(
+    route=None,
+    airplane=None,
+    departure_time=DEPARTURE_TIME,
+    arrival_time=ARRIVAL_TIME,
+):
+    """Flight of route and airplane, creating the missing ones"""
+    return Flight.objects.create(
+        route=route or create_route(),
+        airplane=airplane or create_airplane(),
+        departure_time=departure_time,
+        arrival_time=arrival_time,
+    )
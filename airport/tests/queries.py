@@ -0,0 +1,32 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountMixin:
+    """Assertions on how the number of queries grows with the data"""
+
+    def assertQueryCountConstant(
+        self, run, sizes, setup=None, using=DEFAULT_DB_ALIAS
+    ):
+        """Assert run(size) runs as many queries for each of sizes
+
+        setup(size), if given, prepares the data for a size outside of
+        the count. Per-process caches should be warmed up beforehand.
+        """
+        captured = []
+        for size in sizes:
+            if setup is not None:
+                setup(size)
+            with CaptureQueriesContext(connections[using]) as queries:
+                run(size)
+            captured.append((size, queries.captured_queries))
+
+        first_size, first = captured[0]
+        for size, queries in captured[1:]:
+            self.assertEqual(
+                len(queries),
+                len(first),
+                f"{len(first)} queries for {first_size}, "
+                f"{len(queries)} for {size}:\n"
+                + "\n".join(query["sql"] for query in queries),
+            )
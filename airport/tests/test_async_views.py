@@ -0,0 +1,137 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from airport.models import AirplaneType, Order, Ticket
+from airport.tests.fixtures import (
+    create_airports,
+    create_route,
+    create_airplane,
+    create_flight,
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+AUTOCOMPLETE_URL = reverse("airport:airport-autocomplete")
+
+
+def flight_url(flight_id):
+    return reverse("airport:flight-detail", args=[flight_id])
+
+
+def seats_url(flight_id):
+    return reverse("airport:flight-seats", args=[flight_id])
+
+
+class AsyncViewTests(TestCase):
+    """Requests through AsyncClient run the ASGI handler and URLconf"""
+
+    @classmethod
+    def setUpTestData(cls):
+        airports = create_airports(3)
+        airplane_type = AirplaneType.objects.create(name="Boeing 747")
+        user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        cls.flights = []
+        for number in range(3):
+            flight = create_flight(
+                route=create_route(
+                    airports[number],
+                    airports[(number + 1) % 3],
+                    distance=1000 + number,
+                ),
+                airplane=create_airplane(
+                    name=f"Airplane {number}", airplane_type=airplane_type
+                ),
+                departure_time=f"2024-08-0{number + 1}T14:00:00Z",
+                arrival_time=f"2024-08-0{number + 1}T16:30:00Z",
+            )
+            order = Order.objects.create(user=user)
+            for seat in range(1, number + 1):
+                Ticket.objects.create(
+                    row=1, seat=seat, flight=flight, order=order
+                )
+            cls.flights.append(flight)
+
+    def setUp(self):
+        cache.clear()
+
+    async def assertServedAsync(self, url, data=None, **extra):
+        """Assert the async view answers like the DRF view, returning it"""
+        response = await self.async_client.get(url, data, **extra)
+        self.assertNotIsInstance(response, Response)
+        await cache.aclear()
+        expected = await self.sync_get(url, data, **extra)
+        self.assertIsInstance(expected, Response)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response["Content-Type"], expected["Content-Type"])
+        return response
+
+    async def sync_get(self, url, data=None, **extra):
+        return await sync_to_async(self.client.get)(url, data, **extra)
+
+    async def test_flight_list(self):
+        response = await self.assertServedAsync(FLIGHT_URL)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.json()["results"]), 2)
+
+        await self.assertServedAsync(response.json()["next"])
+        await self.assertServedAsync(
+            FLIGHT_URL, {"city": "test", "departure_time": "2024-08-02"}
+        )
+        await self.assertServedAsync(FLIGHT_URL, {"departure_time": "x"})
+        await self.assertServedAsync(FLIGHT_URL, {"cursor": "invalid"})
+
+    async def test_flight_list_cache(self):
+        first = await self.async_client.get(FLIGHT_URL)
+        second = await self.async_client.get(FLIGHT_URL)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.json(), first.json())
+
+        not_modified = await self.async_client.get(
+            FLIGHT_URL, headers={"If-None-Match": first["ETag"]}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+        # Entries are shared with the DRF view
+        response = await self.sync_get(FLIGHT_URL)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response["ETag"], first["ETag"])
+
+    async def test_flight_detail(self):
+        await self.assertServedAsync(flight_url(self.flights[1].id))
+        response = await self.assertServedAsync(flight_url(0))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_flight_seats(self):
+        await self.assertServedAsync(seats_url(self.flights[2].id))
+        response = await self.assertServedAsync(seats_url(0))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_autocomplete(self):
+        response = await self.assertServedAsync(
+            AUTOCOMPLETE_URL, {"q": "airprt", "limit": "2"}
+        )
+        self.assertEqual(len(response.json()), 2)
+
+    async def test_other_requests_go_to_drf_views(self):
+        html = {"Accept": "text/html"}
+        for url, data, headers in (
+            (FLIGHT_URL, {"fields": "id"}, {}),
+            (FLIGHT_URL, {"format": "api"}, {}),
+            (FLIGHT_URL, None, html),
+            (flight_url(self.flights[0].id), {"expand": ""}, {}),
+            (AUTOCOMPLETE_URL, None, html),
+        ):
+            response = await self.async_client.get(
+                url, data, headers=headers
+            )
+            self.assertIsInstance(response, Response)
+            self.assertEqual(response.status_code, 200)
+
+        response = await self.async_client.post(FLIGHT_URL)
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,98 @@
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.autocomplete import AutocompleteIndex
+from airport.models import City, Country, Airport
+
+AUTOCOMPLETE_URL = reverse("airport:airport-autocomplete")
+
+
+class CountingIndex(AutocompleteIndex):
+    """Counts the words and postings a search goes through"""
+
+    def prefixed(self, prefix):
+        for key in super().prefixed(prefix):
+            self.keys_visited += 1
+            yield key
+
+    def ranked(self, matches):
+        for airport_id in super().ranked(matches):
+            self.entries_visited += 1
+            yield airport_id
+
+
+class AutocompleteIndexTests(APITestCase):
+    def setUp(self):
+        self.germany = Country.objects.create(name="Germany")
+        self.frankfurt = Airport.objects.create(
+            name="Frankfurt Airport",
+            city=City.objects.create(name="Frankfurt"),
+            country=self.germany,
+        )
+        self.paris = Airport.objects.create(
+            name="Charles de Gaulle Airport",
+            city=City.objects.create(name="Paris"),
+            country=Country.objects.create(name="France"),
+        )
+        self.munich = Airport.objects.create(
+            name="Franz Josef Strauss Airport",
+            city=City.objects.create(name="München"),
+            country=self.germany,
+        )
+
+    def search(self, query, **params):
+        response = self.client.get(AUTOCOMPLETE_URL, {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [airport["id"] for airport in response.data]
+
+    def test_prefix_ranks_airport_names_before_countries(self):
+        # "franz" is the closest match, "france" only a country name
+        self.assertEqual(
+            self.search("fra"),
+            [self.munich.id, self.frankfurt.id, self.paris.id],
+        )
+
+    def test_accents_and_typos(self):
+        self.assertEqual(self.search("munc"), [self.munich.id])
+        self.assertEqual(self.search("frnakfurt"), [self.frankfurt.id])
+
+    def test_limit(self):
+        self.assertEqual(len(self.search("fra", limit=1)), 1)
+
+    def test_long_query_skips_lookups(self):
+        index = CountingIndex.from_database()
+        index.keys_visited = index.entries_visited = 0
+
+        self.assertEqual(index.search("frankfurt" * 200), [])
+        self.assertEqual(index.keys_visited, 0)
+        self.assertEqual(self.search("a" * 1500), [])
+
+    def test_index_follows_changes(self):
+        self.assertEqual(self.search("kyiv"), [])
+
+        City.objects.filter(pk=self.paris.city_id).update(name="Kyiv")
+        self.paris.city.refresh_from_db()
+        self.paris.city.save()
+
+        self.assertEqual(self.search("kyiv"), [self.paris.id])
+
+    def test_large_index_lookup_visits_few_entries(self):
+        index = CountingIndex(
+            {
+                "id": number,
+                "name": f"Airport {number:05}",
+                "city": f"City {number % 3000}",
+                "country": f"Country {number % 200}",
+            }
+            for number in range(10000)
+        )
+
+        for query in ("airport 0999", "city 29", "cuontry 1", "fra"):
+            index.keys_visited = index.entries_visited = 0
+            with self.assertNumQueries(0):
+                results = index.search(query)
+            # Lookups bisect into the words and stop at the limit rather
+            # than scanning the 10000 airports
+            self.assertLessEqual(len(results), 10)
+            self.assertLess(index.keys_visited, 200, query)
+            self.assertLessEqual(index.entries_visited, 20, query)
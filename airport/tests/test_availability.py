@@ -0,0 +1,233 @@
+import asyncio
+import json
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.availability import HoldExpiries, hub, publish_seat_changes
+from airport.models import (
+    ChangeLogEntry,
+    Order,
+    Ticket,
+    SeatHold,
+    HeldSeat,
+)
+from airport.tests.fixtures import create_flight
+
+STREAM_URL = reverse("airport:flight-availability-stream")
+
+
+class AvailabilityStreamTests(TestCase):
+    def setUp(self):
+        self.flight = create_flight()
+        user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.order = Order.objects.create(user=user)
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=user)
+
+    def book(self, row, seat):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_client.post(
+                reverse("airport:order-list"),
+                {
+                    "tickets": [
+                        {"row": row, "seat": seat, "flight": self.flight.id}
+                    ]
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def hold(self, row, seat):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_client.post(
+                reverse("airport:flight-holds", args=[self.flight.id]),
+                {"seats": [{"row": row, "seat": seat}]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+        return response.data["id"]
+
+    def delete_hold(self, hold_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            SeatHold.objects.filter(pk=hold_id).delete()
+
+    def create_ticket(self, row, seat):
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                row=row, seat=seat, flight=self.flight, order=self.order
+            )
+
+    def delete_tickets(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight.tickets.all().delete()
+
+    async def next_event(self, stream):
+        chunk = await asyncio.wait_for(anext(stream), 5)
+        event, data = chunk.decode().strip().split("\n")
+        self.assertEqual(event, "event: availability")
+        return json.loads(data.removeprefix("data: "))
+
+    async def test_stream_pushes_seat_changes(self):
+        response = await self.async_client.get(
+            STREAM_URL, {"flights": f"{self.flight.id}"}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+
+        self.assertEqual(
+            await self.next_event(stream),
+            {"flight": self.flight.id, "available_seats": 40},
+        )
+
+        await sync_to_async(self.book)(1, 1)
+        self.assertEqual(
+            await self.next_event(stream),
+            {"flight": self.flight.id, "available_seats": 39},
+        )
+
+        await sync_to_async(self.delete_tickets)()
+        self.assertEqual(
+            await self.next_event(stream),
+            {"flight": self.flight.id, "available_seats": 40},
+        )
+
+        # The ASGI handler cancels the response when the client goes away
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.1)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(hub.watched({self.flight.id}), set())
+
+    async def test_stream_pushes_holds_and_saved_tickets(self):
+        response = await self.async_client.get(
+            STREAM_URL, {"flights": f"{self.flight.id}"}
+        )
+        stream = aiter(response.streaming_content)
+        await self.next_event(stream)
+
+        hold_id = await sync_to_async(self.hold)(1, 1)
+        self.assertEqual(
+            await self.next_event(stream),
+            {"flight": self.flight.id, "available_seats": 39},
+        )
+
+        await sync_to_async(self.delete_hold)(hold_id)
+        self.assertEqual(
+            await self.next_event(stream),
+            {"flight": self.flight.id, "available_seats": 40},
+        )
+
+        # Saved one by one, like tickets of the admin or TicketViewSet
+        await sync_to_async(self.create_ticket)(1, 2)
+        self.assertEqual(
+            await self.next_event(stream),
+            {"flight": self.flight.id, "available_seats": 39},
+        )
+
+    def test_requires_asgi(self):
+        response = self.client.get(STREAM_URL, {"flights": self.flight.id})
+        self.assertEqual(response.status_code, 501)
+
+    async def test_invalid_flights(self):
+        response = await self.async_client.get(STREAM_URL, {"flights": "a"})
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.async_client.get(
+            STREAM_URL, {"flights": ",".join(map(str, range(100)))}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_bridge_publishes_changes_of_other_workers(self):
+        response = await self.async_client.get(
+            STREAM_URL, {"flights": f"{self.flight.id}"}
+        )
+        stream = aiter(response.streaming_content)
+        await self.next_event(stream)
+        cursor = await sync_to_async(
+            lambda: ChangeLogEntry.objects.latest("id").id
+        )()
+
+        # Saved without publishing, like a ticket sold by another worker
+        await sync_to_async(Ticket.objects.create)(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        await sync_to_async(publish_seat_changes)(cursor)
+
+        self.assertEqual(
+            await self.next_event(stream),
+            {"flight": self.flight.id, "available_seats": 39},
+        )
+
+    async def test_bridge_publishes_holds_of_other_workers(self):
+        response = await self.async_client.get(
+            STREAM_URL, {"flights": f"{self.flight.id}"}
+        )
+        stream = aiter(response.streaming_content)
+        await self.next_event(stream)
+        cursor = await sync_to_async(
+            lambda: ChangeLogEntry.objects.latest("id").id
+        )()
+
+        def hold_without_publishing():
+            hold = SeatHold.objects.create(
+                flight=self.flight,
+                user=self.order.user,
+                expires_at=timezone.now() + timedelta(minutes=10),
+            )
+            HeldSeat.objects.create(
+                hold=hold, flight=self.flight, row=1, seat=1
+            )
+
+        await sync_to_async(hold_without_publishing)()
+        with mock.patch.object(HoldExpiries, "add") as add:
+            await sync_to_async(publish_seat_changes)(cursor)
+
+        self.assertEqual(
+            await self.next_event(stream),
+            {"flight": self.flight.id, "available_seats": 39},
+        )
+        self.assertEqual(
+            [flight_id for _, flight_id in add.call_args.args[0]],
+            [self.flight.id],
+        )
+
+
+class HoldExpiryTests(SimpleTestCase):
+    def test_expired_holds_are_published(self):
+        expiries = HoldExpiries()
+        published = []
+        done = threading.Event()
+
+        def publish_watched(flight_ids):
+            published.append(flight_ids)
+            done.set()
+
+        with (
+            mock.patch.object(hub, "watched", side_effect=set),
+            mock.patch(
+                "airport.availability.publish_watched",
+                side_effect=publish_watched,
+            ),
+        ):
+            expiries.add([
+                (timezone.now() + timedelta(minutes=5), 2),
+                (timezone.now() + timedelta(milliseconds=50), 1),
+            ])
+            self.assertTrue(done.wait(5))
+        expiries._timer.cancel()
+
+        self.assertEqual(published, [{1}])
+        self.assertEqual(
+            [flight_id for _, flight_id in expiries._expiries], [2]
+        )
@@ -0,0 +1,90 @@
+import threading
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Ticket
+from airport.tests.fixtures import create_route, create_airplane, create_flight
+
+ORDER_URL = reverse("airport:order-list")
+
+
+@skipUnless(
+    connection.features.has_select_for_update,
+    "Concurrent booking needs row level locks"
+)
+class ConcurrentBookingTests(TransactionTestCase):
+    threads = 8
+    bookings_per_thread = 5
+
+    def setUp(self):
+        route = create_route()
+        airplane = create_airplane(rows=4)
+        self.flights = [
+            create_flight(route=route, airplane=airplane) for _ in range(2)
+        ]
+        self.users = [
+            get_user_model().objects.create_user(
+                email=f"user{number}@example.com", password="testpass123"
+            )
+            for number in range(self.threads)
+        ]
+
+    def book_concurrently(self, user, number, responses, barrier):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        flights = self.flights if number % 2 else self.flights[::-1]
+        barrier.wait()
+        try:
+            for booking in range(self.bookings_per_thread):
+                seat = (number + booking) % 4 + 1
+                response = client.post(
+                    ORDER_URL,
+                    {
+                        "tickets": [
+                            {"row": row, "seat": seat, "flight": flight.id}
+                            for flight in flights
+                            for row in (1, 2)
+                        ]
+                    },
+                    format="json",
+                )
+                responses.append(response)
+        finally:
+            connection.close()
+
+    def test_no_double_booking_and_no_deadlocks(self):
+        responses = []
+        barrier = threading.Barrier(self.threads)
+        threads = [
+            threading.Thread(
+                target=self.book_concurrently,
+                args=(user, number, responses, barrier),
+            )
+            for number, user in enumerate(self.users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+            self.assertFalse(thread.is_alive())
+
+        statuses = [response.status_code for response in responses]
+        self.assertEqual(
+            len(statuses), self.threads * self.bookings_per_thread
+        )
+        self.assertTrue(set(statuses) <= {201, 409})
+        self.assertEqual(statuses.count(201), 4)
+
+        for response in responses:
+            if response.status_code == 409:
+                self.assertTrue(response.data["seats"])
+
+        for flight in self.flights:
+            flight.refresh_from_db()
+            self.assertEqual(flight.sold_seats, 8)
+            self.assertEqual(Ticket.objects.filter(flight=flight).count(), 8)
@@ -0,0 +1,175 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.models import Order, ChangeLogEntry
+from airport.tests.fixtures import create_route, create_airplane, create_flight
+
+CHANGES_URL = reverse("airport:change-list")
+
+
+class ChangeFeedTests(APITestCase):
+    def setUp(self):
+        self.route = create_route()
+        self.airplane = create_airplane(rows=30, seats_in_row=6)
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.since = self.client.get(CHANGES_URL).data["cursor"]
+
+    def changes(self, **params):
+        response = self.client.get(
+            CHANGES_URL, {"since": self.since, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_flight_and_ticket_changes_in_order(self):
+        flight = create_flight(route=self.route, airplane=self.airplane)
+        self.client.post(
+            reverse("airport:order-list"),
+            {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]},
+            format="json",
+        )
+        flight.tickets.get().delete()
+
+        data = self.changes()
+
+        self.assertEqual(
+            [
+                (change["model"], change["action"])
+                for change in data["changes"]
+            ],
+            [
+                ("flight", "created"),
+                ("ticket", "created"),
+                ("ticket", "deleted"),
+            ],
+        )
+        self.assertEqual(
+            data["changes"][0]["data"]["departure_time"],
+            "2024-08-07T14:00:00Z",
+        )
+        self.assertEqual(
+            data["changes"][1]["data"],
+            {"flight": flight.id, "row": 1, "seat": 1},
+        )
+        self.assertEqual(data["cursor"], data["changes"][-1]["id"])
+        self.assertFalse(data["has_more"])
+
+    def test_flight_and_ticket_changes_carry_available_seats(self):
+        flight = create_flight(route=self.route, airplane=self.airplane)
+        self.client.post(
+            reverse("airport:order-list"),
+            {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]},
+            format="json",
+        )
+        self.route.save()
+
+        data = self.changes()
+
+        self.assertEqual(
+            [
+                (change["model"], change["available_seats"])
+                for change in data["changes"]
+            ],
+            [("flight", 179), ("ticket", 179), ("route", None)],
+        )
+
+        flight.delete()
+        self.assertIsNone(self.changes()["changes"][1]["available_seats"])
+
+    def test_paging_with_the_cursor(self):
+        for distance in (100, 200, 300):
+            self.route.distance = distance
+            self.route.save()
+
+        first = self.changes(limit=2)
+        self.assertTrue(first["has_more"])
+        self.since = first["cursor"]
+        second = self.changes(limit=2)
+
+        self.assertEqual(
+            [
+                change["data"]["distance"]
+                for change in first["changes"] + second["changes"]
+            ],
+            [100, 200, 300],
+        )
+        self.assertFalse(second["has_more"])
+
+    def test_waits_for_uncommitted_entries(self):
+        self.route.save()
+        entry = ChangeLogEntry.objects.get(id__gt=self.since)
+        # An entry of a transaction still in progress would fill the gap
+        entry.id += 1
+        entry.save()
+        ChangeLogEntry.objects.filter(id=entry.id - 1).delete()
+
+        data = self.changes()
+        self.assertEqual(data["changes"], [])
+        # Nothing to read until the gap fills or settles
+        self.assertEqual(data["cursor"], self.since)
+        self.assertFalse(data["has_more"])
+
+        ChangeLogEntry.objects.filter(id=entry.id).update(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+        self.assertEqual(
+            [change["id"] for change in self.changes()["changes"]],
+            [entry.id],
+        )
+
+    def test_purged_changes_answer_gone(self):
+        for distance in (100, 200):
+            self.route.distance = distance
+            self.route.save()
+        ChangeLogEntry.objects.update(
+            created_at=timezone.now() - settings.CHANGE_LOG_RETENTION
+        )
+        call_command("purge_change_log", stdout=StringIO())
+        self.route.distance = 300
+        self.route.save()
+
+        response = self.client.get(CHANGES_URL, {"since": self.since})
+
+        self.assertEqual(response.status_code, 410)
+        newest = ChangeLogEntry.objects.latest("id")
+        self.assertEqual(response.data["cursor"], newest.id)
+        self.since = response.data["cursor"]
+        self.assertEqual(self.changes()["changes"], [])
+
+    def test_purge_keeps_the_newest_entry(self):
+        self.route.save()
+        ChangeLogEntry.objects.update(
+            created_at=timezone.now() - settings.CHANGE_LOG_RETENTION
+        )
+
+        call_command("purge_change_log", stdout=StringIO())
+
+        self.assertEqual(
+            list(ChangeLogEntry.objects.values_list("model", flat=True)),
+            ["route"],
+        )
+        # A reader right behind the purge continues as usual
+        self.assertEqual(self.changes()["changes"][0]["model"], "route")
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(
+            user=get_user_model().objects.create_user(
+                email="test@example.com", password="testpass123"
+            )
+        )
+        response = self.client.get(CHANGES_URL)
+        self.assertEqual(response.status_code, 403)
+
+    def test_unrelated_orders_are_not_logged(self):
+        Order.objects.create(user=self.admin)
+        self.assertEqual(self.changes()["changes"], [])
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.models import Country, Order, Ticket
+from airport.tests.fixtures import create_airports, create_route, create_flight
+
+ROUTE_URL = reverse("airport:route-list")
+AIRPORT_URL = reverse("airport:airport-list")
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.source, destination = create_airports()
+        self.city = self.source.city
+        self.route = create_route(self.source, destination)
+        self.client.force_authenticate(
+            user=get_user_model().objects.create_superuser(
+                email="admin@example.com", password="testpass123"
+            )
+        )
+
+    def test_unchanged_routes_are_not_modified(self):
+        response = self.client.get(ROUTE_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                ROUTE_URL, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_related_changes_modify_routes(self):
+        etag = self.client.get(ROUTE_URL)["ETag"]
+
+        self.city.name = "Renamed City"
+        self.city.save()
+        response = self.client.get(ROUTE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_if_modified_since(self):
+        url = reverse("airport:airport-detail", args=[self.source.id])
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE="Mon, 01 Jan 2024 00:00:00 GMT"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_fixtures_without_updated_at_load(self):
+        fixture = [{"model": "airport.country", "fields": {"name": "Spain"}}]
+
+        for country in serializers.deserialize("python", fixture):
+            country.save()
+
+        self.assertIsNotNone(Country.objects.get(name="Spain").updated_at)
+
+    def test_deleted_rows_modify_airports(self):
+        etag = self.client.get(AIRPORT_URL)["ETag"]
+
+        # The newest airport stays, only the number of rows changes
+        self.source.delete()
+
+        response = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cached_public_flights_are_not_modified(self):
+        flight = create_flight(route=self.route)
+        self.client.force_authenticate(user=None)
+        etag = self.client.get(FLIGHT_URL)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(FLIGHT_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=flight,
+            order=Order.objects.create(user=get_user_model().objects.first()),
+        )
+        response = self.client.get(FLIGHT_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,202 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from airport.filters import FlightFilter, OrderFilter, AirportFilter
+from airport.models import (
+    City,
+    Country,
+    Airport,
+    Flight,
+    Order,
+    Ticket,
+)
+from airport.search import normalize_search_key
+from airport.tests.fixtures import create_route, create_airplane, create_flight
+
+
+class FlightDateFilterTests(TestCase):
+    def setUp(self):
+        route = create_route()
+        airplane = create_airplane()
+        # 23:30 on the 7th and 00:30 on the 8th in Europe/Kiev (UTC+3)
+        self.late_flight = create_flight(
+            route=route,
+            airplane=airplane,
+            departure_time="2024-08-07T20:30:00Z",
+            arrival_time="2024-08-07T23:00:00Z",
+        )
+        self.night_flight = create_flight(
+            route=route,
+            airplane=airplane,
+            departure_time="2024-08-07T21:30:00Z",
+            arrival_time="2024-08-08T00:00:00Z",
+        )
+
+    def filter_flights(self, **params):
+        return FlightFilter(params, queryset=Flight.objects.all()).qs
+
+    def assertUsesIndex(self, queryset):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+
+        if connection.vendor == "postgresql":
+            self.assertIn("Index", plan)
+        else:
+            self.assertIn("USING INDEX", plan)
+
+    def test_departure_day_in_local_time(self):
+        self.assertEqual(
+            list(self.filter_flights(departure_time="2024-08-07")),
+            [self.late_flight],
+        )
+        self.assertEqual(
+            list(self.filter_flights(departure_time="2024-08-08")),
+            [self.night_flight],
+        )
+
+    def test_arrival_day_in_local_time(self):
+        self.assertCountEqual(
+            self.filter_flights(arrival_time="2024-08-08"),
+            [self.late_flight, self.night_flight],
+        )
+
+    def test_departure_day_uses_index(self):
+        self.assertUsesIndex(self.filter_flights(departure_time="2024-08-07"))
+
+    def test_arrival_day_uses_index(self):
+        self.assertUsesIndex(self.filter_flights(arrival_time="2024-08-07"))
+
+
+class SearchKeyFilterTests(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name="Switzerland")
+        self.zurich = Airport.objects.create(
+            name="Zürich Airport",
+            city=City.objects.create(name="Zürich"),
+            country=country,
+        )
+        self.geneva = Airport.objects.create(
+            name="Genève Aéroport",
+            city=City.objects.create(name="Genève"),
+            country=country,
+        )
+        airplane = create_airplane()
+        self.flight = create_flight(
+            route=create_route(self.geneva, self.zurich, distance=230),
+            airplane=airplane,
+            arrival_time="2024-08-07T15:00:00Z",
+        )
+        create_flight(
+            route=create_route(self.zurich, self.geneva, distance=230),
+            airplane=airplane,
+            departure_time="2024-08-07T16:00:00Z",
+            arrival_time="2024-08-07T17:00:00Z",
+        )
+
+    def test_normalize_search_key(self):
+        self.assertEqual(normalize_search_key("Zürich"), "zurich")
+        self.assertEqual(normalize_search_key("GENÈVE"), "geneve")
+        self.assertEqual(self.zurich.search_key, "zurich airport")
+
+    def test_search_key_follows_renames(self):
+        self.zurich.name = "Kloten"
+        self.zurich.save(update_fields=["name"])
+
+        self.zurich.refresh_from_db()
+        self.assertEqual(self.zurich.search_key, "kloten")
+
+    def test_fixtures_get_search_keys(self):
+        # Fixtures from before the search keys carry only the name
+        fixture = [{
+            "model": "airport.city",
+            "fields": {"name": "Bâle", "updated_at": "2024-08-07T14:00Z"},
+        }]
+
+        for city in serializers.deserialize("python", fixture):
+            city.save()
+
+        self.assertEqual(City.objects.get(name="Bâle").search_key, "bale")
+
+    def test_rebuild_search_keys_command(self):
+        Airport.objects.filter(pk=self.zurich.pk).update(name="Kloten")
+        City.objects.update(search_key="")
+
+        out = StringIO()
+        call_command("rebuild_search_keys", stdout=out)
+
+        self.assertIn("3 row(s)", out.getvalue())
+        self.zurich.refresh_from_db()
+        self.assertEqual(self.zurich.search_key, "kloten")
+        flights = FlightFilter({"city": "zur"}, queryset=Flight.objects.all())
+        self.assertEqual(list(flights.qs), [self.flight])
+
+    def test_airport_filter_ignores_case_and_accents(self):
+        airports = AirportFilter(
+            {"name": "ZURICH"}, queryset=Airport.objects.all()
+        ).qs
+        self.assertEqual(list(airports), [self.zurich])
+
+        airports = AirportFilter(
+            {"city_name": "genev"}, queryset=Airport.objects.all()
+        ).qs
+        self.assertEqual(list(airports), [self.geneva])
+
+    def test_flight_filter_by_destination_city(self):
+        flights = FlightFilter(
+            {"city": "zur"}, queryset=Flight.objects.all()
+        ).qs
+
+        # Cities are matched in a subquery rather than a join
+        with self.assertNumQueries(1):
+            self.assertEqual(list(flights), [self.flight])
+        self.assertNotIn('JOIN "airport_city"', str(flights.query))
+
+    def test_order_filter_does_not_duplicate_orders(self):
+        order = Order.objects.create(
+            user=get_user_model().objects.create_user(
+                email="test@example.com", password="testpass123"
+            )
+        )
+        for seat in (1, 2, 3):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=self.flight, order=order
+            )
+
+        orders = OrderFilter(
+            {"country": "swiss", "city": "Zurich"},
+            queryset=Order.objects.all()
+        ).qs
+        self.assertEqual(list(orders), [])
+
+        orders = OrderFilter(
+            {"country": "switz", "city": "Zurich"},
+            queryset=Order.objects.all()
+        ).qs
+        self.assertEqual(list(orders), [order])
+
+        for params in (
+            {"departure_time_after": "2024-08-07"},
+            {
+                "arrival_time_after": "2024-08-07",
+                "arrival_time_before": "2024-08-07",
+            },
+            {"name": "airplane"},
+        ):
+            orders = OrderFilter(params, queryset=Order.objects.all()).qs
+            self.assertEqual(list(orders), [order])
+            self.assertIn(
+                'FROM "airport_order" WHERE EXISTS', str(orders.query)
+            )
+
+        orders = OrderFilter(
+            {"departure_time_before": "2024-08-06"},
+            queryset=Order.objects.all()
+        ).qs
+        self.assertEqual(list(orders), [])
@@ -0,0 +1,28 @@
+from unittest import mock
+
+from django.db.utils import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+
+HEALTH_URL = reverse("health")
+
+
+class HealthTests(TestCase):
+    def test_healthy(self):
+        response = self.client.get(HEALTH_URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {"status": "ok", "database": "ok", "cache": "ok"},
+        )
+
+    def test_database_unavailable(self):
+        with mock.patch(
+            "django.db.backends.utils.CursorWrapper.execute",
+            side_effect=OperationalError,
+        ):
+            response = self.client.get(HEALTH_URL)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["database"], "unavailable")
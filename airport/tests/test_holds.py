@@ -0,0 +1,145 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.models import Order, Ticket, SeatHold
+from airport.tests.fixtures import create_flight
+
+ORDER_URL = reverse("airport:order-list")
+
+
+class SeatHoldTests(APITestCase):
+    def setUp(self):
+        self.flight = create_flight()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def hold(self, seats):
+        return self.client.post(
+            reverse("airport:flight-holds", args=[self.flight.id]),
+            {"seats": [{"row": row, "seat": seat} for row, seat in seats]},
+            format="json",
+        )
+
+    def available_seats(self):
+        response = self.client.get(
+            reverse("airport:flight-detail", args=[self.flight.id])
+        )
+        return response.data["available_seats"]
+
+    def test_hold_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(self.hold([(1, 1)]).status_code, 401)
+
+    def test_hold_of_invalid_flight_id(self):
+        response = self.client.post(
+            "/api/airport/public-flights/abc/holds/",
+            {"seats": [{"row": 1, "seat": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_hold_reduces_available_seats(self):
+        response = self.hold([(1, 1), (1, 2)])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["seats"]), 2)
+        self.assertEqual(self.available_seats(), 38)
+
+    def test_held_seat_cannot_be_booked_or_held_by_others(self):
+        self.hold([(1, 1)])
+        self.client.force_authenticate(user=self.other_user)
+
+        self.assertEqual(self.hold([(1, 1)]).status_code, 409)
+        response = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 409)
+
+    def test_order_converts_hold_into_tickets(self):
+        hold_id = self.hold([(1, 1), (1, 2)]).data["id"]
+
+        response = self.client.post(
+            ORDER_URL, {"hold": hold_id}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["tickets"]), 2)
+        self.assertFalse(SeatHold.objects.exists())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.sold_seats, 2)
+        self.assertEqual(self.available_seats(), 38)
+
+    def test_order_of_hold_with_seat_taken_meanwhile(self):
+        hold_id = self.hold([(1, 1), (1, 2)]).data["id"]
+        Ticket.objects.create(
+            row=1,
+            seat=2,
+            flight=self.flight,
+            order=Order.objects.create(user=self.other_user),
+        )
+
+        response = self.client.post(
+            ORDER_URL, {"hold": hold_id}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(
+            response.data["seats"],
+            [{"flight": self.flight.id, "row": 1, "seat": 2}],
+        )
+        self.assertTrue(SeatHold.objects.filter(pk=hold_id).exists())
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_order_rejects_hold_of_other_user(self):
+        hold_id = self.hold([(1, 1)]).data["id"]
+        self.client.force_authenticate(user=self.other_user)
+
+        response = self.client.post(
+            ORDER_URL, {"hold": hold_id}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_expired_hold_is_released(self):
+        hold_id = self.hold([(1, 1)]).data["id"]
+        SeatHold.objects.update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        self.assertEqual(self.available_seats(), 40)
+        response = self.client.post(
+            ORDER_URL, {"hold": hold_id}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.hold([(1, 1)]).status_code, 201)
+
+    def test_release_expired_holds_command(self):
+        self.hold([(1, 1)])
+        self.hold([(2, 1)])
+        SeatHold.objects.filter(seats__row=1).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        out = StringIO()
+        call_command("release_expired_holds", stdout=out)
+
+        self.assertIn("Released 1 expired seat hold(s)", out.getvalue())
+        self.assertEqual(SeatHold.objects.count(), 1)
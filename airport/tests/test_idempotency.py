@@ -0,0 +1,103 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.idempotency import request_hash
+from airport.models import Order, IdempotencyKey
+from airport.tests.fixtures import create_flight
+
+ORDER_URL = reverse("airport:order-list")
+
+
+class IdempotentOrderTests(APITestCase):
+    def setUp(self):
+        self.flight = create_flight()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def book(self, key, seat=1):
+        return self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": seat, "flight": self.flight.id}]},
+            format="json",
+            headers={"Idempotency-Key": key},
+        )
+
+    def test_repeated_key_replays_response(self):
+        first = self.book("key-1")
+        with self.assertNumQueries(1):
+            second = self.book("key-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_with_different_body(self):
+        self.book("key-1")
+
+        response = self.book("key-1", seat=2)
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_request_can_be_retried(self):
+        self.book("key-1")
+
+        self.assertEqual(self.book("key-2").status_code, 409)
+        self.assertFalse(IdempotencyKey.objects.filter(key="key-2").exists())
+
+    def test_unfinished_claim_is_taken_over(self):
+        claim = IdempotencyKey.objects.create(
+            user=self.user,
+            key="key-1",
+            request_hash=request_hash(
+                {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]}
+            ),
+            expires_at=timezone.now() + timedelta(hours=1),
+            locked_until=timezone.now() + timedelta(minutes=1),
+        )
+
+        self.assertEqual(self.book("key-1").status_code, 409)
+
+        claim.locked_until = timezone.now() - timedelta(seconds=1)
+        claim.save()
+        response = self.book("key-1")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Order.objects.count(), 1)
+        claim.refresh_from_db()
+        self.assertEqual(claim.response_status, 201)
+        self.assertEqual(self.book("key-1").data, response.data)
+
+    def test_expired_key_is_reused(self):
+        self.book("key-1")
+        IdempotencyKey.objects.update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        response = self.book("key-1", seat=2)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_purge_idempotency_keys_command(self):
+        self.book("key-1")
+        self.book("key-2", seat=2)
+        IdempotencyKey.objects.filter(key="key-1").update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        out = StringIO()
+        call_command("purge_idempotency_keys", stdout=out)
+
+        self.assertIn("Purged 1 expired", out.getvalue())
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
@@ -0,0 +1,111 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Crew, Flight
+from airport.serializers import (
+    FlightAdminSerializer,
+    OrderSerializer,
+    RouteSerializer,
+)
+from airport.tests.fixtures import (
+    create_airports,
+    create_route,
+    create_airplane,
+    create_flight,
+)
+
+
+class IdentityMapTests(TestCase):
+    def setUp(self):
+        self.airports = create_airports()
+        self.route = create_route(*self.airports)
+        self.airplane = create_airplane()
+        self.flights = [
+            create_flight(
+                route=self.route,
+                airplane=self.airplane,
+                departure_time=f"2024-08-0{day}T14:00:00Z",
+                arrival_time=f"2024-08-0{day}T16:00:00Z",
+            )
+            for day in (1, 2)
+        ]
+        self.crew = [
+            Crew.objects.create(first_name=f"Pilot {number}", last_name="Doe")
+            for number in range(2)
+        ]
+
+    def test_order_loads_each_flight_once(self):
+        serializer = OrderSerializer(
+            data={
+                "tickets": [
+                    {"row": 1, "seat": seat, "flight": flight.id}
+                    for flight in self.flights
+                    for seat in range(1, 5)
+                ]
+            }
+        )
+
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        tickets = serializer.validated_data["tickets"]
+        self.assertIs(tickets[0]["flight"], tickets[3]["flight"])
+        self.assertEqual(tickets[4]["flight"], self.flights[1])
+
+    def test_flight_relations_load_once_per_model(self):
+        serializer = FlightAdminSerializer(
+            data={
+                "route": self.route.id,
+                "airplane": str(self.airplane.id),
+                "crew": [crew.id for crew in self.crew],
+                "departure_time": "2024-08-03T14:00:00Z",
+                "arrival_time": "2024-08-03T16:00:00Z",
+            }
+        )
+
+        with self.assertNumQueries(3):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data["crew"], self.crew)
+        self.assertEqual(serializer.validated_data["airplane"], self.airplane)
+
+    def test_unknown_and_malformed_pks(self):
+        serializer = RouteSerializer(
+            data={
+                "source": 0,
+                "destination": {"id": self.airports[1].id},
+                "distance": 100,
+            }
+        )
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(
+            serializer.errors["source"][0].code, "does_not_exist"
+        )
+        self.assertEqual(
+            serializer.errors["destination"][0].code, "incorrect_type"
+        )
+
+    def test_create_flight_with_crew(self):
+        client = APIClient()
+        client.force_authenticate(
+            user=get_user_model().objects.create_superuser(
+                email="admin@example.com", password="testpass123"
+            )
+        )
+
+        response = client.post(
+            reverse("airport:flights-list"),
+            {
+                "route": self.route.id,
+                "airplane": self.airplane.id,
+                "crew": [crew.id for crew in self.crew],
+                "departure_time": "2024-08-03T14:00:00Z",
+                "arrival_time": "2024-08-03T16:00:00Z",
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        flight = Flight.objects.get(pk=response.data["id"])
+        self.assertEqual(list(flight.crew.order_by("id")), self.crew)
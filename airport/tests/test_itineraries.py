@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.itineraries import FlightNetwork, Leg
+from airport.models import Route
+from airport.tests.fixtures import (
+    create_airports,
+    create_airplane,
+    create_flight,
+)
+
+ITINERARY_URL = reverse("airport:itinerary-list")
+
+
+def at(hour, minute=0):
+    return datetime(2024, 8, 7, hour, minute, tzinfo=timezone.utc)
+
+
+class FlightNetworkTests(APITestCase):
+    def setUp(self):
+        self.network = FlightNetwork([
+            Leg(1, "A", "C", 1000, at(6), at(8), 10),
+            Leg(2, "A", "B", 300, at(6), at(7), 10),
+            Leg(3, "B", "C", 400, at(8), at(9), 10),
+            Leg(4, "B", "C", 400, at(7, 20), at(8), 10),
+            Leg(5, "B", "A", 300, at(9), at(10), 10),
+            Leg(6, "B", "C", 400, at(16), at(17), 10),
+        ])
+
+    def search(self, **kwargs):
+        return self.network.search("A", "C", at(0), at(23), **kwargs)
+
+    def test_direct_and_connecting_by_duration(self):
+        itineraries = self.search()
+
+        self.assertEqual(
+            [[leg.id for leg in i.legs] for i in itineraries],
+            [[1], [2, 3]],
+        )
+        self.assertEqual(itineraries[1].duration, timedelta(hours=3))
+        self.assertEqual(itineraries[1].distance, 700)
+        self.assertEqual(itineraries[1].connections, [timedelta(hours=1)])
+
+    def test_sort_by_distance(self):
+        itineraries = self.search(sort="distance")
+
+        self.assertEqual(
+            [[leg.id for leg in i.legs] for i in itineraries],
+            [[2, 3], [1]],
+        )
+
+    def test_connection_window(self):
+        itineraries = self.search(
+            min_connection=timedelta(minutes=15),
+            max_connection=timedelta(hours=12),
+        )
+
+        self.assertEqual(
+            [[leg.id for leg in i.legs] for i in itineraries],
+            [[1], [2, 4], [2, 3], [2, 6]],
+        )
+
+    def test_max_legs_and_limit(self):
+        self.assertEqual(
+            [[leg.id for leg in i.legs] for i in self.search(max_legs=1)],
+            [[1]],
+        )
+        self.assertEqual(len(self.search(limit=1)), 1)
+
+
+class ItineraryApiTests(APITestCase):
+    def setUp(self):
+        self.airports = create_airports(3)
+        self.airplane = create_airplane(rows=2, seats_in_row=2)
+
+    def add_flight(self, source, destination, departure, arrival):
+        route, _ = Route.objects.get_or_create(
+            source=self.airports[source],
+            destination=self.airports[destination],
+            defaults={"distance": 500},
+        )
+        return create_flight(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure,
+            arrival_time=arrival,
+        )
+
+    def test_connecting_itinerary(self):
+        first = self.add_flight(0, 1, at(6), at(7))
+        second = self.add_flight(1, 2, at(8), at(9))
+        self.add_flight(1, 2, at(7, 10), at(8))
+
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                ITINERARY_URL,
+                {
+                    "from": self.airports[0].id,
+                    "to": self.airports[2].id,
+                    "date": "2024-08-07",
+                },
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        itinerary = response.data[0]
+        self.assertEqual(
+            [leg["flight"] for leg in itinerary["legs"]],
+            [first.id, second.id],
+        )
+        self.assertEqual(itinerary["duration"], 180)
+        self.assertEqual(itinerary["distance"], 1000)
+        self.assertEqual(itinerary["connections"], [60])
+        self.assertEqual(itinerary["legs"][0]["available_seats"], 4)
+
+    def test_invalid_params(self):
+        response = self.client.get(
+            ITINERARY_URL,
+            {
+                "from": self.airports[0].id,
+                "to": self.airports[0].id,
+                "date": "2024-08-07",
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(ITINERARY_URL, {"date": "2024-08-07"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,122 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.booking import lock_flights
+from airport.models import (
+    Flight,
+    Order,
+    Ticket,
+    ChangeLogEntry,
+)
+from airport.tests.fixtures import create_flight
+
+
+class FlightOccupancyTests(APITestCase):
+    def setUp(self):
+        self.flight = create_flight()
+        self.other_flight = create_flight(
+            route=self.flight.route,
+            airplane=self.flight.airplane,
+            departure_time="2024-08-08T14:00:00Z",
+            arrival_time="2024-08-08T16:00:00Z",
+        )
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.order = Order.objects.create(user=self.user)
+
+    def sold_seats(self, flight):
+        flight.refresh_from_db()
+        return flight.sold_seats
+
+    def test_ticket_create_and_delete_update_counter(self):
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        Ticket.objects.create(
+            row=1, seat=2, flight=self.flight, order=self.order
+        )
+        self.assertEqual(self.sold_seats(self.flight), 2)
+
+        ticket.delete()
+        self.assertEqual(self.sold_seats(self.flight), 1)
+
+        self.order.delete()
+        self.assertEqual(self.sold_seats(self.flight), 0)
+
+    def test_moving_ticket_updates_both_flights(self):
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        ticket.flight = self.other_flight
+        ticket.save()
+        self.assertEqual(self.sold_seats(self.flight), 0)
+        self.assertEqual(self.sold_seats(self.other_flight), 1)
+
+    def test_deleting_order_locks_its_flights_in_id_order_first(self):
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.other_flight, order=self.order
+        )
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        with mock.patch(
+            "airport.booking.lock_flights", wraps=lock_flights
+        ) as locked:
+            self.order.delete()
+
+        self.assertEqual(
+            locked.call_args_list[0],
+            mock.call({self.flight.pk, self.other_flight.pk}),
+        )
+        self.assertEqual(self.sold_seats(self.flight), 0)
+        self.assertEqual(self.sold_seats(self.other_flight), 0)
+
+    def test_public_flight_available_seats(self):
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        Ticket.objects.create(
+            row=1, seat=2, flight=self.flight, order=self.order
+        )
+
+        response = self.client.get(
+            reverse("airport:flight-detail", args=[self.flight.id])
+        )
+        self.assertEqual(response.data["available_seats"], 38)
+
+    def test_recount_occupancy_repairs_drift(self):
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        Flight.objects.filter(pk=self.flight.pk).update(sold_seats=7)
+        Flight.objects.filter(pk=self.other_flight.pk).update(sold_seats=3)
+
+        out = StringIO()
+        call_command("recount_occupancy", stdout=out)
+
+        self.assertIn("2 flight(s)", out.getvalue())
+        self.assertEqual(self.sold_seats(self.flight), 1)
+        self.assertEqual(self.sold_seats(self.other_flight), 0)
+        self.assertEqual(
+            list(
+                ChangeLogEntry.objects
+                .filter(model="flight", action="updated")
+                .values_list("object_id", flat=True)
+            ),
+            [self.flight.id, self.other_flight.id],
+        )
+
+    def test_recount_occupancy_refreshes_cached_flights(self):
+        url = reverse("airport:flight-detail", args=[self.flight.id])
+        Flight.objects.filter(pk=self.flight.pk).update(sold_seats=7)
+        self.assertEqual(self.client.get(url).data["available_seats"], 33)
+
+        call_command("recount_occupancy", "--batch-size=1", stdout=StringIO())
+
+        self.assertEqual(self.client.get(url).data["available_seats"], 40)
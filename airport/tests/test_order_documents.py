@@ -0,0 +1,203 @@
+import json
+import threading
+import time
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TransactionTestCase
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.models import (
+    Airport,
+    Order,
+    OrderDocument,
+    Ticket,
+)
+from airport.order_documents import rebuild_documents
+from airport.readers import order_reader
+from airport.tests.fixtures import create_flight
+
+ORDER_URL = reverse("airport:order-list")
+
+
+class OrderDocumentTests(APITestCase):
+    def setUp(self):
+        self.flight = create_flight()
+        self.airport = self.flight.route.source
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def book(self, *seats):
+        response = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": seat, "flight": self.flight.id}
+                    for seat in seats
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return Order.objects.get(pk=response.data["id"])
+
+    def history(self):
+        return self.client.get(ORDER_URL).json()["results"]
+
+    def test_document_built_at_booking(self):
+        order = self.book(1, 2)
+
+        self.assertEqual(
+            json.loads(order.document.body),
+            self.client.get(ORDER_URL, {"fields": "id,tickets,created_at"})
+            .json()["results"][0],
+        )
+        with self.assertNumQueries(2):
+            history = self.history()
+        self.assertEqual(history[0], json.loads(order.document.body))
+
+    def test_order_commits_with_its_document(self):
+        with mock.patch.object(
+            OrderDocument.objects, "create", side_effect=DatabaseError
+        ):
+            with self.assertRaises(DatabaseError):
+                self.book(1)
+
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_changes_invalidate_documents(self):
+        order = self.book(1)
+
+        self.airport.name = "Renamed Airport"
+        self.airport.save()
+        self.assertFalse(OrderDocument.objects.filter(order=order).exists())
+        route = self.history()[0]["tickets"][0]["flight"]["route"]
+        self.assertEqual(route["source"]["name"], "Renamed Airport")
+
+        self.flight.departure_time = "2024-08-07T15:00:00Z"
+        self.flight.save()
+        self.assertEqual(
+            self.history()[0]["tickets"][0]["flight"]["departure_time"],
+            "18:00:00 07.08.2024",
+        )
+
+        order.tickets.all().delete()
+        self.assertEqual(self.history()[0]["tickets"], [])
+
+    def test_changes_rebuild_documents_after_the_commit(self):
+        order = self.book(1, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.airport.name = "Renamed Airport"
+            self.airport.save()
+        document = json.loads(OrderDocument.objects.get(order=order).body)
+        route = document["tickets"][0]["flight"]["route"]
+        self.assertEqual(route["source"]["name"], "Renamed Airport")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.tickets.first().delete()
+        document = json.loads(OrderDocument.objects.get(order=order).body)
+        self.assertEqual(len(document["tickets"]), 1)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.history()[0], document)
+
+    def test_history_does_not_store_missing_documents(self):
+        # A request could store a document built from rows a concurrent
+        # change replaces before it writes
+        order = self.book(1)
+        OrderDocument.objects.filter(order=order).delete()
+
+        self.assertEqual(self.history()[0]["tickets"][0]["seat"], 1)
+        self.assertFalse(OrderDocument.objects.filter(order=order).exists())
+
+    def test_unrelated_changes_keep_documents(self):
+        order = self.book(1)
+
+        airport = Airport.objects.create(
+            name="Airport 3",
+            city=self.airport.city,
+            country=self.airport.country,
+        )
+        airport.name = "Renamed Airport"
+        airport.save()
+
+        self.assertTrue(OrderDocument.objects.filter(order=order).exists())
+
+    def test_rebuild_command(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        stored = self.book(2)
+
+        out = StringIO()
+        call_command("rebuild_order_documents", stdout=out)
+        self.assertIn("Built 1 order document(s)", out.getvalue())
+        self.assertEqual(
+            json.loads(order.document.body)["tickets"][0]["seat"], 1
+        )
+
+        call_command("rebuild_order_documents", "--all", stdout=out)
+        self.assertIn("Built 2 order document(s)", out.getvalue())
+        self.assertTrue(OrderDocument.objects.filter(order=stored).exists())
+
+
+@skipUnless(
+    connection.features.has_select_for_update,
+    "Ordering rebuilds needs row level locks"
+)
+class ConcurrentRebuildTests(TransactionTestCase):
+    def setUp(self):
+        flight = create_flight()
+        self.airport = flight.route.source
+        self.order = Order.objects.create(
+            user=get_user_model().objects.create_user(
+                email="test@example.com", password="testpass123"
+            )
+        )
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=self.order)
+
+    def test_rebuild_of_old_rows_is_replaced(self):
+        read = order_reader.read
+        rows_read = threading.Event()
+        resume = threading.Event()
+
+        def stall_after_reading(rows):
+            orders = read(rows)
+            if threading.current_thread() is rebuild:
+                rows_read.set()
+                resume.wait(10)
+            return orders
+
+        def run(target):
+            try:
+                target()
+            finally:
+                connection.close()
+
+        def rename():
+            self.airport.name = "Renamed Airport"
+            self.airport.save()
+
+        rebuild = threading.Thread(
+            target=run, args=(lambda: rebuild_documents([self.order.id]),)
+        )
+        change = threading.Thread(target=run, args=(rename,))
+        with mock.patch.object(order_reader, "read", stall_after_reading):
+            rebuild.start()
+            self.assertTrue(rows_read.wait(10))
+            # The change commits, its rebuild waits for the order lock
+            change.start()
+            time.sleep(0.5)
+            resume.set()
+            rebuild.join(10)
+            change.join(10)
+
+        document = json.loads(OrderDocument.objects.get(order=self.order).body)
+        route = document["tickets"][0]["flight"]["route"]
+        self.assertEqual(route["source"]["name"], "Renamed Airport")
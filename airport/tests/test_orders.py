@@ -0,0 +1,169 @@
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.models import (
+    AirplaneType,
+    Crew,
+    Order,
+    Ticket,
+)
+from airport.tests.fixtures import (
+    create_airports,
+    create_route,
+    create_airplane,
+    create_flight,
+)
+from airport.tests.queries import QueryCountMixin
+
+ORDER_URL = reverse("airport:order-list")
+ORDER_ADMIN_URL = reverse("airport:orders-list")
+
+
+class OrderCreateTests(QueryCountMixin, APITestCase):
+    def setUp(self):
+        self.flight = create_flight(
+            airplane=create_airplane(rows=30, seats_in_row=6)
+        )
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def book(self, seats, flight=None):
+        flight = flight or self.flight
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": flight.id}
+                    for row, seat in seats
+                ]
+            },
+            format="json",
+        )
+
+    def test_create_order(self):
+        response = self.book([(1, 1), (1, 2)])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["tickets"]), 2)
+        self.assertEqual(
+            response.data["tickets"][0]["flight"]["route"]["source"]["name"],
+            "Airport 1",
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.sold_seats, 2)
+
+    def test_create_order_query_count_is_constant(self):
+        seats = iter(
+            [(row, seat) for row in range(1, 31) for seat in range(1, 7)]
+        )
+
+        def book(size):
+            response = self.book(list(islice(seats, size)))
+            self.assertEqual(response.status_code, 201)
+
+        self.assertQueryCountConstant(book, sizes=(1, 168))
+
+    def test_create_order_with_taken_seat(self):
+        self.book([(1, 1)])
+
+        response = self.book([(1, 2), (1, 1)])
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(
+            response.data["seats"],
+            [{"flight": self.flight.id, "row": 1, "seat": 1}],
+        )
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_create_order_with_duplicate_seats(self):
+        response = self.book([(1, 1), (1, 1)])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_create_order_with_seat_out_of_range(self):
+        response = self.book([(31, 1)])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("row", response.data["tickets"][0])
+
+
+class OrderListTests(QueryCountMixin, APITestCase):
+    def setUp(self):
+        airports = create_airports()
+        crew = Crew.objects.create(first_name="Jane", last_name="Doe")
+        self.flights = []
+        for number in range(2):
+            flight = create_flight(
+                route=create_route(airports[number], airports[1 - number]),
+                airplane=create_airplane(
+                    name=f"Airplane {number}",
+                    airplane_type=AirplaneType.objects.create(
+                        name=f"Type {number}"
+                    ),
+                    rows=30,
+                    seats_in_row=6,
+                ),
+            )
+            flight.crew.add(crew)
+            self.flights.append(flight)
+        self.user = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def create_orders(self, count):
+        for number in range(self.user.orders.count(), count):
+            order = Order.objects.create(user=self.user)
+            for flight in self.flights:
+                Ticket.objects.create(
+                    row=number // 6 + 1,
+                    seat=number % 6 + 1,
+                    flight=flight,
+                    order=order,
+                )
+
+    def assertListQueriesConstant(self, url, **params):
+        def list_orders(size):
+            response = self.client.get(url, {**params, "page_size": size})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["results"]), size)
+
+        def setup(size):
+            # Fill the reference caches before counting
+            self.create_orders(size)
+            list_orders(size)
+
+        self.assertQueryCountConstant(list_orders, sizes=(1, 50), setup=setup)
+
+    def test_list_query_count_is_constant(self):
+        self.assertListQueriesConstant(ORDER_URL)
+        self.assertListQueriesConstant(ORDER_ADMIN_URL)
+
+    def test_shaped_list_query_count_is_constant(self):
+        self.assertListQueriesConstant(ORDER_URL, fields="id,tickets")
+        self.assertListQueriesConstant(
+            ORDER_URL, expand="tickets.flight.route.source"
+        )
+        self.assertListQueriesConstant(
+            ORDER_ADMIN_URL, expand="tickets.flight.crew"
+        )
+
+    def test_tickets_are_listed_in_booking_order(self):
+        self.create_orders(1)
+
+        response = self.client.get(ORDER_URL, {"fields": "id,tickets"})
+
+        self.assertEqual(
+            [
+                ticket["flight"]["id"]
+                for ticket in response.data["results"][0]["tickets"]
+            ],
+            [flight.id for flight in self.flights],
+        )
@@ -0,0 +1,187 @@
+import json
+from base64 import b64encode
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.models import (
+    Flight,
+    Order,
+    Ticket,
+)
+from airport.tests.fixtures import create_route, create_airplane, create_flight
+
+TICKET_URL = reverse("airport:ticket-list")
+
+
+class CursorPaginationTests(APITestCase):
+    def setUp(self):
+        route = create_route()
+        airplane = create_airplane()
+        start = datetime(2024, 8, 7, 14, tzinfo=timezone.utc)
+        # Some flights share a departure time to exercise the id tiebreak
+        self.flights = [
+            create_flight(
+                route=route,
+                airplane=airplane,
+                departure_time=start + timedelta(hours=hours),
+                arrival_time=start + timedelta(hours=hours + 2),
+            )
+            for hours in (5, 0, 3, 3, 3, 1, 4)
+        ]
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+
+    def walk(self, url):
+        ids = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            self.assertFalse(
+                any("COUNT(*)" in query["sql"] for query in queries)
+            )
+            ids += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+        return ids
+
+    def test_public_flights_are_walked_by_departure_time(self):
+        ids = self.walk(reverse("airport:flight-list"))
+
+        expected = sorted(
+            self.flights, key=lambda flight: (flight.departure_time, flight.id)
+        )
+        self.assertEqual(ids, [flight.id for flight in expected])
+
+    def test_pages_break_inside_ties(self):
+        expected = [
+            flight.id for flight in sorted(
+                self.flights,
+                key=lambda flight: (flight.departure_time, flight.id),
+            )
+        ]
+        url = reverse("airport:flight-list")
+        # The three flights at 17:00 are split over two pages
+        first = self.client.get(url, {"page_size": 3}).data
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(first["next"]).data
+        self.assertEqual(
+            [item["id"] for item in first["results"] + second["results"]],
+            expected[:6],
+        )
+        self.assertFalse(
+            any("OFFSET" in query["sql"] for query in queries)
+        )
+
+        previous = self.client.get(second["previous"]).data
+        self.assertEqual(
+            [item["id"] for item in previous["results"]], expected[:3]
+        )
+        self.assertIsNone(previous["previous"])
+
+        # A row added before the cursor does not shift the next page
+        Flight.objects.create(
+            route=self.flights[0].route,
+            airplane=self.flights[0].airplane,
+            departure_time=self.flights[1].departure_time,
+            arrival_time=self.flights[1].arrival_time,
+        )
+        self.assertEqual(
+            [item["id"] for item in self.client.get(first["next"]).data[
+                "results"
+            ]],
+            expected[3:6],
+        )
+
+    def test_invalid_cursor(self):
+        url = reverse("airport:flight-list")
+        for cursor in ("invalid", "cD0x", "cD1bIjEiXQ=="):
+            response = self.client.get(url, {"cursor": cursor})
+            self.assertEqual(response.status_code, 404)
+
+    def test_malformed_cursor_position(self):
+        self.client.force_authenticate(user=self.user)
+        departure_time = "2024-08-07 14:00:00+00:00"
+        positions = (
+            ["abc", "1"],
+            [departure_time, "x"],
+            [departure_time, "1" + "0" * 30],
+        )
+        for url in (
+            reverse("airport:flight-list"),
+            reverse("airport:order-list"),
+        ):
+            for position in positions:
+                cursor = b64encode(f"p={json.dumps(position)}".encode())
+                response = self.client.get(url, {"cursor": cursor.decode()})
+                self.assertEqual(response.status_code, 404)
+
+    def test_user_orders_are_walked_newest_first(self):
+        orders = [Order.objects.create(user=self.user) for _ in range(5)]
+        self.client.force_authenticate(user=self.user)
+
+        ids = self.walk(reverse("airport:order-list"))
+
+        self.assertEqual(ids, [order.id for order in reversed(orders)])
+
+
+class FlexibleCountPaginationTests(APITestCase):
+    def setUp(self):
+        flight = create_flight()
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="testpass123"
+        )
+        order = Order.objects.create(user=admin)
+        self.tickets = [
+            Ticket.objects.create(
+                row=1, seat=seat, flight=flight, order=order
+            )
+            for seat in range(1, 6)
+        ]
+        self.client.force_authenticate(user=admin)
+
+    def test_pages_without_count(self):
+        ids = []
+        url = f"{TICKET_URL}?count=none"
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertNotIn("count", response.data)
+            self.assertFalse(
+                any("COUNT(*)" in query["sql"] for query in queries)
+            )
+            ids += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+
+        self.assertEqual(ids, [ticket.id for ticket in self.tickets])
+
+    def test_previous_link(self):
+        response = self.client.get(TICKET_URL, {"page": 3, "count": "none"})
+
+        self.assertIsNone(response.data["next"])
+        self.assertIn("page=2", response.data["previous"])
+
+    def test_exact_count_by_default(self):
+        response = self.client.get(TICKET_URL)
+
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_estimated_count_falls_back_below_threshold(self):
+        response = self.client.get(TICKET_URL, {"count": "estimate"})
+
+        self.assertEqual(response.data["count"], 5)
+        self.assertFalse(response.data["count_is_estimate"])
+
+    def test_empty_page(self):
+        for count in ("exact", "none"):
+            response = self.client.get(
+                TICKET_URL, {"page": 4, "count": count}
+            )
+            self.assertEqual(response.status_code, 404)
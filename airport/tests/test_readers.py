@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.models import (
+    AirplaneType,
+    Crew,
+    Flight,
+    Order,
+    Ticket,
+)
+from airport.readers import (
+    flight_reader,
+    ticket_admin_reader,
+    order_reader,
+    order_admin_reader,
+)
+from airport.serializers import (
+    FlightSerializer,
+    TicketAdminSerializer,
+    OrderSerializer,
+    OrderAdminSerializer,
+)
+from airport.tests.fixtures import (
+    create_airports,
+    create_route,
+    create_airplane,
+    create_flight,
+)
+
+
+class ReaderTests(TestCase):
+    def setUp(self):
+        airports = create_airports(3)
+        airplane_type = AirplaneType.objects.create(name="Boeing 747")
+        crew = [
+            Crew.objects.create(first_name=f"Pilot {number}", last_name="Doe")
+            for number in range(2)
+        ]
+        self.user = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="testpass123"
+        )
+        for number in range(3):
+            flight = create_flight(
+                route=create_route(
+                    airports[number],
+                    airports[(number + 1) % 3],
+                    distance=1000 + number,
+                ),
+                airplane=create_airplane(
+                    name=f"Airplane {number}", airplane_type=airplane_type
+                ),
+                departure_time=f"2024-08-0{number + 1}T14:00:00Z",
+                arrival_time=f"2024-08-0{number + 1}T16:30:00Z",
+            )
+            flight.crew.set(crew[:number])
+            order = Order.objects.create(user=self.user)
+            for seat in range(1, number + 1):
+                Ticket.objects.create(
+                    row=1, seat=seat, flight=flight, order=order
+                )
+
+    def assertSameJSON(self, reader, serializer_class, queryset):
+        rows = list(queryset.values(*reader.fields))
+        self.assertEqual(
+            JSONRenderer().render(reader.read(rows)),
+            JSONRenderer().render(
+                serializer_class(queryset, many=True).data
+            ),
+        )
+
+    def test_flights(self):
+        self.assertSameJSON(
+            flight_reader,
+            FlightSerializer,
+            Flight.objects.with_available_seats().order_by("id"),
+        )
+
+    def test_tickets(self):
+        self.assertSameJSON(
+            ticket_admin_reader,
+            TicketAdminSerializer,
+            Ticket.objects.order_by("id"),
+        )
+
+    def test_orders(self):
+        queryset = Order.objects.order_by("id").prefetch_related(
+            Prefetch("tickets", queryset=Ticket.objects.order_by("id"))
+        )
+        self.assertSameJSON(order_reader, OrderSerializer, queryset)
+        self.assertSameJSON(order_admin_reader, OrderAdminSerializer, queryset)
+
+    def test_list_matches_fully_expanded_serializer(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        for url, expand in (
+            (
+                reverse("airport:flight-list"),
+                "airplane,route.source,route.destination",
+            ),
+            (
+                reverse("airport:ticket-list"),
+                "flight.airplane,flight.route.source,"
+                "flight.route.destination,flight.crew",
+            ),
+        ):
+            read = client.get(url)
+            serialized = client.get(url, {"expand": expand})
+            self.assertEqual(read.status_code, 200)
+            self.assertEqual(
+                read.json()["results"], serialized.json()["results"]
+            )
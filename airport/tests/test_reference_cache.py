@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.models import Airport, Route
+from airport.readers import AIRPORTS
+from airport.serializers import (
+    AirportSerializer,
+    RouteSerializer,
+    airport_cache,
+    airplane_cache,
+)
+from airport.tests.fixtures import create_route, create_airplane
+
+
+class ReferenceCacheTests(APITestCase):
+    def setUp(self):
+        self.route = create_route()
+        self.source = self.route.source
+
+    def test_cached_airports_skip_the_database(self):
+        RouteSerializer(Route.objects.get(pk=self.route.pk)).data
+
+        route = Route.objects.get(pk=self.route.pk)
+        with self.assertNumQueries(0):
+            data = RouteSerializer(route).data
+
+        self.assertEqual(data["source"], AirportSerializer(self.source).data)
+
+    def test_changes_invalidate_cached_airports(self):
+        RouteSerializer(self.route).data
+
+        self.source.city.name = "Renamed City"
+        self.source.city.save()
+        route = Route.objects.get(pk=self.route.pk)
+
+        self.assertEqual(
+            RouteSerializer(route).data["source"]["city"], "Renamed City"
+        )
+
+    @override_settings(REFERENCE_CACHE_SHARED=True)
+    def test_shared_tier(self):
+        RouteSerializer(self.route).data
+        airport_cache._entries.clear()
+
+        route = Route.objects.get(pk=self.route.pk)
+        with self.assertNumQueries(0):
+            data = RouteSerializer(route).data
+
+        self.assertEqual(data["source"]["name"], "Airport 1")
+
+    @override_settings(REFERENCE_CACHE_SHARED=True)
+    def test_shared_tier_hits_are_not_loaded_again(self):
+        pks = {self.route.source_id, self.route.destination_id}
+        airport_cache.get_many(pks, AIRPORTS)
+        airport_cache._entries.clear()
+
+        with self.assertNumQueries(0):
+            airports = airport_cache.get_many(pks, AIRPORTS)
+        self.assertEqual(airports.keys(), pks)
+
+        # Only the pk missing from both tiers is loaded
+        airport_cache._entries.clear()
+        airport = Airport.objects.create(
+            name="Airport 3",
+            city=self.source.city,
+            country=self.source.country,
+        )
+        with self.assertNumQueries(1):
+            airports = airport_cache.get_many(
+                pks | {airport.pk}, AIRPORTS
+            )
+        self.assertEqual(airports[airport.pk]["name"], "Airport 3")
+
+    def test_airplane_type_changes_invalidate_cached_airplanes(self):
+        airplane = create_airplane()
+        airplane_type = airplane.airplane_type
+        self.client.force_authenticate(
+            user=get_user_model().objects.create_superuser(
+                email="admin@example.com", password="testpass123"
+            )
+        )
+        flight = self.client.post(
+            reverse("airport:flights-list"),
+            {
+                "route": self.route.id,
+                "airplane": airplane.id,
+                "crew": [],
+                "departure_time": "2024-08-07T14:00:00Z",
+                "arrival_time": "2024-08-07T16:00:00Z",
+            },
+        )
+        self.assertEqual(flight.data["airplane"]["model"], "Boeing 747")
+
+        airplane_type.name = "Airbus A320"
+        airplane_type.save()
+        response = self.client.get(
+            reverse("airport:flights-detail", args=[flight.data["id"]])
+        )
+
+        self.assertEqual(response.data["airplane"]["model"], "Airbus A320")
+        self.assertIn(airplane.id, airplane_cache._entries)
@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.models import Order, Ticket
+from airport.tests.fixtures import create_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+class FlightResponseCacheTests(APITestCase):
+    def setUp(self):
+        self.flight = create_flight()
+        self.order = Order.objects.create(
+            user=get_user_model().objects.create_user(
+                email="test@example.com", password="testpass123"
+            )
+        )
+
+    def get(self, url=FLIGHT_URL, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_repeated_requests_are_served_from_cache(self):
+        self.assertEqual(self.get()["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            response = self.get()
+
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.data["results"][0]["id"], self.flight.id)
+
+    def test_params_are_normalized(self):
+        self.get(params={"source": "airport", "destination": "airport"})
+
+        response = self.get(
+            params={"destination": "airport", "source": "airport", "date": ""}
+        )
+
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_detail_and_tickets_refresh_the_cache(self):
+        url = reverse("airport:flight-detail", args=[self.flight.id])
+        self.assertEqual(self.get(url).data["available_seats"], 40)
+
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        response = self.get(url)
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["available_seats"], 39)
+
+    def test_stale_response_while_another_worker_refreshes(self):
+        self.get()
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+
+        # Another worker holds the refresh lock of every entry
+        with mock.patch.object(cache, "add", return_value=False):
+            with self.assertNumQueries(0):
+                response = self.get()
+
+        self.assertEqual(response["X-Cache"], "STALE")
+        self.assertEqual(response.data["results"][0]["available_seats"], 40)
+
+    def test_etag_follows_the_content(self):
+        etag = self.get()["ETag"]
+
+        # Both bump the version, leaving the same response behind
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        ticket.delete()
+        response = self.get()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response["ETag"], etag)
+
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        response = self.client.get(FLIGHT_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
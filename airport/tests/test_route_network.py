@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.models import Route
+from airport.route_network import RouteNetwork
+from airport.tests.fixtures import create_airports, create_route
+
+SHORTEST_URL = reverse("airport:route-shortest")
+REACHABLE_URL = reverse("airport:route-reachable")
+HUBS_URL = reverse("airport:route-hubs")
+
+
+class RouteNetworkTests(APITestCase):
+    def setUp(self):
+        self.network = RouteNetwork([
+            (1, 2, 500),
+            (2, 3, 500),
+            (1, 3, 1500),
+            (3, 4, 200),
+            (4, 1, 900),
+            (5, 1, 100),
+        ])
+
+    def test_shortest_path(self):
+        self.assertEqual(self.network.shortest_path(1, 4), (1200, [1, 2, 3, 4]))
+        self.assertEqual(self.network.shortest_path(4, 2), (1400, [4, 1, 2]))
+        self.assertIsNone(self.network.shortest_path(1, 5))
+        self.assertIsNone(self.network.shortest_path(1, 99))
+
+    def test_reachable(self):
+        self.assertEqual(self.network.reachable(1, 1), {2: 1, 3: 1})
+        self.assertEqual(self.network.reachable(1, 2), {2: 1, 3: 1, 4: 2})
+        self.assertEqual(self.network.reachable(99, 2), {})
+
+    def test_hubs(self):
+        self.assertEqual(
+            self.network.hubs(2),
+            [
+                {"airport": 1, "departures": 2, "arrivals": 2, "degree": 4},
+                {"airport": 3, "departures": 1, "arrivals": 2, "degree": 3},
+            ],
+        )
+
+
+class RouteNetworkApiTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(
+            user=get_user_model().objects.create_superuser(
+                email="admin@example.com", password="testpass123"
+            )
+        )
+        self.airports = create_airports(3)
+        self.first = create_route(*self.airports[:2], distance=400)
+        create_route(*self.airports[1:], distance=600)
+
+    def test_shortest(self):
+        response = self.client.get(
+            SHORTEST_URL,
+            {"from": self.airports[0].id, "to": self.airports[2].id},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["distance"], 1000)
+        self.assertEqual(
+            response.data["airports"], [airport.id for airport in self.airports]
+        )
+
+        response = self.client.get(
+            SHORTEST_URL,
+            {"from": self.airports[2].id, "to": self.airports[0].id},
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_network_follows_route_changes(self):
+        response = self.client.get(
+            REACHABLE_URL, {"from": self.airports[0].id, "hops": 1}
+        )
+        self.assertEqual(
+            response.data, [{"airport": self.airports[1].id, "hops": 1}]
+        )
+
+        Route.objects.create(
+            source=self.airports[0],
+            destination=self.airports[2],
+            distance=700,
+        )
+        self.first.delete()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                REACHABLE_URL, {"from": self.airports[0].id, "hops": 1}
+            )
+        self.assertEqual(
+            response.data, [{"airport": self.airports[2].id, "hops": 1}]
+        )
+
+    def test_hubs(self):
+        response = self.client.get(HUBS_URL, {"limit": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]["airport"], self.airports[1].id)
+        self.assertEqual(response.data[0]["degree"], 2)
+
+    def test_parameters_of_other_endpoints_are_rejected(self):
+        airport_id = self.airports[0].id
+        for url, params, unknown in (
+            (HUBS_URL, {"from": airport_id, "to": airport_id}, {"from", "to"}),
+            (HUBS_URL, {"hops": 1}, {"hops"}),
+            (
+                SHORTEST_URL,
+                {"from": airport_id, "to": airport_id, "hops": 1},
+                {"hops"},
+            ),
+            (REACHABLE_URL, {"from": airport_id, "limit": 1}, {"limit"}),
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(set(response.data), unknown)
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(HUBS_URL)
+        self.assertEqual(response.status_code, 401)
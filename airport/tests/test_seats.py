@@ -0,0 +1,74 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.models import Order, Ticket
+from airport.seats import build_seat_bitmap
+from airport.tests.fixtures import create_airplane, create_flight
+
+
+class SeatBitmapTests(APITestCase):
+    def test_build_seat_bitmap(self):
+        bitmap = build_seat_bitmap(3, 4, [(1, 1), (2, 2), (3, 4)])
+        self.assertEqual(bitmap, bytes([0b10000100, 0b00010000]))
+
+    def test_seats_outside_the_airplane_are_skipped(self):
+        # Row 4 would index past the bitmap
+        self.assertEqual(build_seat_bitmap(3, 4, [(4, 1)]), bytes(2))
+        # Seat 5 of row 1 would mark seat 1 of row 2
+        self.assertEqual(
+            build_seat_bitmap(3, 4, [(1, 5), (0, 1), (1, 0)]), bytes(2)
+        )
+
+    def test_flight_seat_map(self):
+        flight = create_flight(
+            airplane=create_airplane(rows=30, seats_in_row=6)
+        )
+        order = Order.objects.create(
+            user=get_user_model().objects.create_user(
+                email="test@example.com", password="testpass123"
+            )
+        )
+        Ticket.objects.create(row=1, seat=2, flight=flight, order=order)
+        Ticket.objects.create(row=30, seat=6, flight=flight, order=order)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("airport:flight-seats", args=[flight.id])
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["rows"], 30)
+        self.assertEqual(response.data["seats_in_row"], 6)
+        bitmap = base64.b64decode(response.data["taken"])
+        self.assertEqual(len(bitmap), 23)
+        self.assertEqual(bitmap[0], 0b01000000)
+        self.assertEqual(bitmap[-1], 0b00010000)
+        self.assertEqual(sum(bin(byte).count("1") for byte in bitmap), 2)
+
+    def test_invalid_flight_id(self):
+        response = self.client.get("/api/airport/public-flights/abc/seats/")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_airplane_cannot_shrink_below_taken_seats(self):
+        airplane = create_airplane()
+        flight = create_flight(airplane=airplane)
+        order = Order.objects.create(
+            user=get_user_model().objects.create_user(
+                email="test@example.com", password="testpass123"
+            )
+        )
+        Ticket.objects.create(row=5, seat=3, flight=flight, order=order)
+
+        airplane.rows = 4
+        with self.assertRaises(ValidationError):
+            airplane.full_clean()
+        airplane.rows, airplane.seats_in_row = 10, 2
+        with self.assertRaises(ValidationError):
+            airplane.full_clean()
+        airplane.rows, airplane.seats_in_row = 5, 3
+        airplane.full_clean()
@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from airport.models import Crew, Order, Ticket
+from airport.tests.fixtures import create_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+TICKET_URL = reverse("airport:ticket-list")
+ORDER_URL = reverse("airport:order-list")
+AIRPORT_URL = reverse("airport:airport-list")
+AIRPLANE_URL = reverse("airport:airplane-list")
+
+
+class ResponseShapeTests(APITestCase):
+    def setUp(self):
+        self.flight = create_flight()
+        self.route = self.flight.route
+        self.airplane = self.flight.airplane
+        self.crew = Crew.objects.create(first_name="Jane", last_name="Doe")
+        self.flight.crew.add(self.crew)
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="testpass123"
+        )
+        order = Order.objects.create(user=self.admin)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.sql = " ".join(query["sql"] for query in queries)
+        return response.data["results"][0]
+
+    def test_sparse_fields_skip_joins(self):
+        flight = self.get(FLIGHT_URL, fields="id,departure_time")
+
+        self.assertEqual(
+            flight,
+            {"id": self.flight.id, "departure_time": "17:00:00 07.08.2024"},
+        )
+        self.assertNotIn("airport_route", self.sql)
+        self.assertNotIn("airport_airplanetype", self.sql)
+
+    def test_expand_only_requested_relations(self):
+        flight = self.get(FLIGHT_URL, expand="route.source")
+
+        self.assertEqual(flight["airplane"], self.airplane.id)
+        self.assertEqual(flight["route"]["source"]["name"], "Airport 1")
+        self.assertEqual(
+            flight["route"]["destination"], self.route.destination_id
+        )
+        self.assertNotIn("airport_airplanetype", self.sql)
+
+    def test_nothing_expanded(self):
+        flight = self.get(FLIGHT_URL, expand="")
+
+        self.assertEqual(flight["route"], self.route.id)
+        self.assertEqual(flight["airplane"], self.airplane.id)
+
+    def test_everything_expanded_by_default(self):
+        flight = self.get(FLIGHT_URL)
+
+        self.assertEqual(flight["airplane"]["model"], "Boeing 747")
+        self.assertEqual(flight["route"]["destination"]["name"], "Airport 2")
+
+    def test_nested_expansion_of_tickets(self):
+        self.client.force_authenticate(user=self.admin)
+
+        ticket = self.get(TICKET_URL, expand="flight.crew")
+        self.assertEqual(ticket["flight"]["route"], self.route.id)
+        self.assertEqual(
+            ticket["flight"]["crew"],
+            [{"id": self.crew.id, "first_name": "Jane", "last_name": "Doe"}],
+        )
+
+        ticket = self.get(TICKET_URL, fields="id,flight", expand="")
+        self.assertEqual(set(ticket), {"id", "flight"})
+        self.assertEqual(ticket["flight"], self.flight.id)
+        self.assertNotIn("airport_crew", self.sql)
+
+    def test_order_tickets_follow_expand(self):
+        self.client.force_authenticate(user=self.admin)
+
+        order = self.get(ORDER_URL, expand="tickets.flight")
+
+        flight = order["tickets"][0]["flight"]
+        self.assertEqual(flight["id"], self.flight.id)
+        self.assertEqual(flight["route"], self.route.id)
+
+    def test_sparse_fields_of_airports_and_airplanes(self):
+        self.client.force_authenticate(user=self.admin)
+
+        airport = self.get(AIRPORT_URL, fields="id,city")
+        self.assertEqual(
+            airport, {"id": self.route.source_id, "city": "Test City"}
+        )
+        # The conditional GET aggregate joins countries, the page doesn't
+        self.assertNotIn('"airport_country"."name"', self.sql)
+
+        airplane = self.get(AIRPLANE_URL, fields="id,name")
+        self.assertEqual(
+            airplane, {"id": self.airplane.id, "name": "Airplane 1"}
+        )
+        self.assertNotIn("airport_heldseat", self.sql)
+
+        airplane = self.get(AIRPLANE_URL, fields="id,available_seats")
+        self.assertEqual(airplane["available_seats"], 39)
@@ -12,7 +12,10 @@ from airport.views import (
     TicketViewSet,
     OrderViewSet,
     OrderAdminViewSet,
-    FlightAdminViewSet
+    FlightAdminViewSet,
+    ItineraryViewSet,
+    ChangeLogViewSet,
+    flight_availability_stream,
 )
 
 router = routers.DefaultRouter()
@@ -27,7 +30,16 @@ router.register("flights", FlightAdminViewSet, basename="flights")
 router.register("tickets", TicketViewSet)
 router.register("user-orders", OrderViewSet)
 router.register("orders", OrderAdminViewSet, basename="orders")
+router.register("itineraries", ItineraryViewSet, basename="itinerary")
+router.register("changes", ChangeLogViewSet, basename="change")
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path(
+        "public-flights/availability/",
+        flight_availability_stream,
+        name="flight-availability-stream",
+    ),
+    path("", include(router.urls)),
+]
 
 app_name = "airport"
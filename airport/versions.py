@@ -0,0 +1,49 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = "airport:version:{}"
+
+
+def get_version(name):
+    """Current version of a named data set, shared by all workers
+
+    Versions live in the default cache, so workers only see each other's
+    bumps with a shared backend such as Redis or Memcached.
+    """
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock so an evicted version is never reused
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(name):
+    """get_version for async code"""
+    key = VERSION_KEY.format(name)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def _incr_version(name):
+    try:
+        cache.incr(VERSION_KEY.format(name))
+    except ValueError:
+        get_version(name)
+
+
+def bump_version(*names):
+    """Invalidate data sets now and again once the transaction commits
+
+    The second bump drops anything rebuilt from the database before the
+    change became visible to other connections.
+    """
+    for name in names:
+        _incr_version(name)
+        transaction.on_commit(lambda name=name: _incr_version(name))
@@ -1,23 +1,50 @@
-from django.db.models import F, Count
-from rest_framework import viewsets, mixins
-from rest_framework.pagination import PageNumberPagination
+import asyncio
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F, Sum, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import (
     IsAdminUser,
+    IsAuthenticated,
     AllowAny
 )
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 from rest_framework_simplejwt.authentication import (
     JWTAuthentication
 )
 
+from airport.autocomplete import get_index, search_limit
+from airport.availability import hub, watch_availability
+from airport.changes import add_available_seats, read_changes
+from airport.conditional import ConditionalGetMixin
 from airport.filters import (
     NameFilter,
+    SearchNameFilter,
     AirportFilter,
     FlightFilter,
     RouteFilter,
     TicketFilter,
     OrderFilter, OrderAdminFilter
 )
+from airport.filters import start_of_day
+from airport.idempotency import IdempotentCreateMixin
+from airport.itineraries import FlightNetwork
+from airport.response_cache import CachedResponseMixin
+from airport.route_network import get_network
+from airport.shapes import ShapedViewMixin, nest_paths
 from airport.models import (
     Airport,
     Route,
@@ -28,7 +55,22 @@ from airport.models import (
     Order,
     City,
     Country,
+    HeldSeat,
+)
+from airport.order_documents import order_document_reader
+from airport.readers import (
+    ReaderListMixin,
+    flight_reader,
+    ticket_admin_reader,
+    order_admin_reader,
+)
+from airport.pagination import (
+    StandardPagePagination,
+    FlightCursorPagination,
+    OrderCursorPagination,
+    FlexibleCountPagination,
 )
+from airport.seats import seat_map, taken_seats
 from airport.serializers import (
     RouteSerializer,
     AirplaneSerializer,
@@ -40,26 +82,24 @@ from airport.serializers import (
     OrderSerializer,
     OrderAdminSerializer,
     FlightAdminSerializer,
-    TicketAdminSerializer
+    TicketAdminSerializer,
+    SeatHoldSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
+    HubsQuerySerializer,
+    ShortestRouteQuerySerializer,
+    ReachableQuerySerializer,
+    ChangeLogEntrySerializer,
+    ChangeFeedQuerySerializer,
 )
 
 
-class StandardPagePagination(PageNumberPagination):
-    page_size = 5
-    max_page_size = 100
-
-
-class SmallPagePagination(PageNumberPagination):
-    page_size = 2
-    max_page_size = 100
-
-
 class CityViewSet(viewsets.ModelViewSet):
     """Manage cities as admin user"""
     queryset = City.objects.all()
     serializer_class = CitySerializer
     pagination_class = StandardPagePagination
-    filterset_class = NameFilter
+    filterset_class = SearchNameFilter
     permission_classes = (IsAdminUser,)
     authentication_classes = (JWTAuthentication,)
 
@@ -69,29 +109,124 @@ class CountryViewSet(viewsets.ModelViewSet):
     queryset = Country.objects.all()
     serializer_class = CountrySerializer
     pagination_class = StandardPagePagination
-    filterset_class = NameFilter
+    filterset_class = SearchNameFilter
     permission_classes = (IsAdminUser,)
     authentication_classes = (JWTAuthentication,)
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class AirportViewSet(
+    ConditionalGetMixin,
+    ShapedViewMixin,
+    viewsets.ModelViewSet,
+):
     """Manage airports as admin user"""
-    queryset = Airport.objects.select_related()
+    queryset = Airport.objects.all()
     serializer_class = AirportSerializer
     pagination_class = StandardPagePagination
     filterset_class = AirportFilter
     permission_classes = (IsAdminUser,)
     authentication_classes = (JWTAuthentication,)
+    last_modified_fields = (
+        "updated_at",
+        "city__updated_at",
+        "country__updated_at",
+    )
+
+    def get_queryset(self):
+        shape = self.get_shape()
+        # City and country are rendered by name, join them when rendered
+        return self.queryset.select_related(*(
+            name for name in ("city", "country") if shape.renders(name)
+        ))
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=(AllowAny,),
+        authentication_classes=(),
+    )
+    def autocomplete(self, request):
+        """Airports matching a typed prefix of airport, city or country"""
+        query = request.query_params.get("q", "")
+        limit = search_limit(request.query_params.get("limit"))
+        return Response(get_index().search(query, limit=limit))
+
+
+AIRPORT_RELATED_PATHS = {
+    "source": ("source__city", "source__country"),
+    "destination": ("destination__city", "destination__country"),
+}
+
+FLIGHT_RELATED_PATHS = {
+    "airplane": ("airplane__airplane_type",),
+    "route": ("route",),
+    **nest_paths("route", AIRPORT_RELATED_PATHS),
+}
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(
+    ConditionalGetMixin,
+    ShapedViewMixin,
+    viewsets.ModelViewSet,
+):
     """Manage flight routes as admin user"""
-    queryset = Route.objects.select_related()
+    queryset = Route.objects.all()
     serializer_class = RouteSerializer
     pagination_class = StandardPagePagination
     filterset_class = RouteFilter
     permission_classes = (IsAdminUser,)
     authentication_classes = (JWTAuthentication,)
+    last_modified_fields = (
+        "updated_at",
+        "source__updated_at",
+        "source__city__updated_at",
+        "source__country__updated_at",
+        "destination__updated_at",
+        "destination__city__updated_at",
+        "destination__country__updated_at",
+    )
+    select_related_paths = AIRPORT_RELATED_PATHS
+
+    def get_queryset(self):
+        return self.shape_queryset(self.queryset)
+
+    @action(detail=False, methods=["GET"])
+    def shortest(self, request):
+        """Shortest total route distance between two airports"""
+        query = ShortestRouteQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        found = get_network().shortest_path(params["from"], params["to"])
+        if found is None:
+            return Response(
+                {"detail": "No routes connect these airports"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        distance, airports = found
+        return Response({"distance": distance, "airports": airports})
+
+    @action(detail=False, methods=["GET"])
+    def reachable(self, request):
+        """Airports reachable from an airport within a number of routes"""
+        query = ReachableQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        reachable = get_network().reachable(params["from"], params["hops"])
+        return Response([
+            {"airport": airport, "hops": hops}
+            for airport, hops in sorted(
+                reachable.items(), key=lambda item: (item[1], item[0])
+            )
+        ])
+
+    @action(detail=False, methods=["GET"])
+    def hubs(self, request):
+        """Airports ranked by the number of routes they serve"""
+        query = HubsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return Response(get_network().hubs(query.validated_data["limit"]))
 
 
 class AirplaneTypeViewSet(viewsets.ModelViewSet):
@@ -104,7 +239,7 @@ class AirplaneTypeViewSet(viewsets.ModelViewSet):
     authentication_classes = (JWTAuthentication,)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(ShapedViewMixin, viewsets.ModelViewSet):
     """Manage airplanes as admin user"""
     queryset = Airplane.objects.select_related()
     serializer_class = AirplaneSerializer
@@ -114,13 +249,25 @@ class AirplaneViewSet(viewsets.ModelViewSet):
     authentication_classes = (JWTAuthentication,)
 
     def get_queryset(self):
+        if not self.get_shape().renders("available_seats"):
+            return self.queryset.order_by("id")
+        held_seats = Subquery(
+            HeldSeat.objects
+            .live()
+            .filter(flight__airplane=OuterRef("pk"))
+            .order_by()
+            .values("flight__airplane")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
         queryset = self.queryset
         queryset = (
             queryset
             .annotate(
                 available_seats=(
                         F("rows") * F("seats_in_row")
-                        - Count("flights__tickets")
+                        - Coalesce(Sum("flights__sold_seats"), 0)
+                        - Coalesce(held_seats, 0)
                 )
             )
             .order_by("id")
@@ -129,103 +276,258 @@ class AirplaneViewSet(viewsets.ModelViewSet):
 
 
 class FlightViewSet(
+    CachedResponseMixin,
+    ReaderListMixin,
+    ShapedViewMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     GenericViewSet,
 ):
     """View flights for everyone"""
-    queryset = Flight.objects.select_related()
+    queryset = Flight.objects.all()
     serializer_class = FlightSerializer
-    pagination_class = SmallPagePagination
+    list_reader = flight_reader
+    pagination_class = FlightCursorPagination
     filterset_class = FlightFilter
     permission_classes = (AllowAny,)
+    select_related_paths = FLIGHT_RELATED_PATHS
 
     def get_queryset(self):
         queryset = self.queryset
-        queryset = queryset.annotate(
-            available_seats=(
-                    F("airplane__rows")
-                    * F("airplane__seats_in_row")
-                    - Count("tickets")
-            )
-        ).order_by("id")
-        return queryset
+        queryset = queryset.with_available_seats()
+        return self.shape_queryset(queryset)
+
+    @action(detail=True, methods=["get"])
+    def seats(self, request, pk=None):
+        """Taken seats of the flight as a base64 encoded bitmap"""
+        flight = get_object_or_404(
+            Flight.objects.select_related("airplane"), pk=pk
+        )
+        return Response(seat_map(flight, taken_seats(flight)))
+
+    @action(
+        detail=True,
+        methods=["post"],
+        serializer_class=SeatHoldSerializer,
+        permission_classes=(IsAuthenticated,),
+        authentication_classes=(JWTAuthentication,),
+    )
+    def holds(self, request, pk=None):
+        """Hold seats of the flight before ordering them"""
+        flight = get_object_or_404(
+            Flight.objects.select_related("airplane"), pk=pk
+        )
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "flight": flight},
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save(flight=flight, user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class FlightAdminViewSet(viewsets.ModelViewSet):
+class FlightAdminViewSet(ShapedViewMixin, viewsets.ModelViewSet):
     """Manage flights as admin user"""
-    queryset = Flight.objects.select_related(
-        "route__destination__city",
-        "route__source__city",
-        "route__destination__country",
-        "route__source__country",
-        "airplane__airplane_type",
-    ).prefetch_related("crew")
+    queryset = Flight.objects.all()
     serializer_class = FlightAdminSerializer
-    pagination_class = SmallPagePagination
+    pagination_class = FlightCursorPagination
     filterset_class = FlightFilter
     permission_classes = (IsAdminUser,)
     authentication_classes = (JWTAuthentication,)
+    select_related_paths = FLIGHT_RELATED_PATHS
+    prefetch_related_paths = {"crew": ("crew",)}
+
+    def get_queryset(self):
+        return self.shape_queryset(self.queryset)
 
 
-class TicketViewSet(viewsets.ModelViewSet):
+TICKET_RELATED_PATHS = {
+    "flight": ("flight",),
+    **nest_paths("flight", FLIGHT_RELATED_PATHS),
+}
+
+TICKET_CREW_PATHS = {"flight.crew": ("flight__crew",)}
+
+# Tickets of an order in the order they were booked
+ORDER_TICKETS = Ticket.objects.order_by("id")
+
+
+class TicketViewSet(
+    ReaderListMixin,
+    ShapedViewMixin,
+    viewsets.ModelViewSet,
+):
     """Manage tickets as admin user"""
-    queryset = Ticket.objects.select_related(
-        "flight__route__destination__city",
-        "flight__route__source__city",
-        "flight__route__destination__country",
-        "flight__route__source__country",
-        "flight__airplane__airplane_type",
-    ).prefetch_related("flight__crew")
+    queryset = Ticket.objects.all()
     serializer_class = TicketAdminSerializer
-    pagination_class = SmallPagePagination
+    list_reader = ticket_admin_reader
+    pagination_class = FlexibleCountPagination
     filterset_class = TicketFilter
     permission_classes = (IsAdminUser,)
     authentication_classes = (JWTAuthentication,)
+    select_related_paths = TICKET_RELATED_PATHS
+    prefetch_related_paths = TICKET_CREW_PATHS
+
+    def get_queryset(self):
+        return self.shape_queryset(self.queryset)
 
 
 class OrderViewSet(
+    IdempotentCreateMixin,
+    ReaderListMixin,
+    ShapedViewMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     GenericViewSet,
 ):
     """Get or create order for authenticated user"""
-    queryset = Order.objects.select_related(
-        "tickets__flight__route__destination__city",
-        "tickets__flight__route__source__city",
-        "tickets__flight__route__destination__country",
-        "tickets__flight__route__source__country",
-        "tickets__flight__airplane__airplane_type",
-    )
+    queryset = Order.objects.all()
     serializer_class = OrderSerializer
-    pagination_class = SmallPagePagination
+    list_reader = order_document_reader
+    pagination_class = OrderCursorPagination
     filterset_class = OrderFilter
     authentication_classes = (JWTAuthentication,)
+    nested_prefetches = {
+        "tickets": (ORDER_TICKETS, TICKET_RELATED_PATHS, {}),
+    }
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        queryset = self.queryset.filter(user=self.request.user)
+        return self.shape_queryset(queryset)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class OrderAdminViewSet(viewsets.ModelViewSet,):
+class OrderAdminViewSet(
+    ReaderListMixin,
+    ShapedViewMixin,
+    viewsets.ModelViewSet,
+):
     """Manage orders as admin user"""
-    queryset = Order.objects.select_related(
-        "tickets__flight__route__destination__city",
-        "tickets__flight__route__source__city",
-        "tickets__flight__route__destination__country",
-        "tickets__flight__route__source__country",
-        "tickets__flight__airplane__airplane_type",
-    ).prefetch_related("tickets__flight__crew")
+    queryset = Order.objects.all()
     serializer_class = OrderAdminSerializer
-    pagination_class = SmallPagePagination
+    list_reader = order_admin_reader
+    pagination_class = OrderCursorPagination
     filterset_class = OrderAdminFilter
     permission_classes = (IsAdminUser,)
     authentication_classes = (JWTAuthentication,)
+    nested_prefetches = {
+        "tickets": (ORDER_TICKETS, TICKET_RELATED_PATHS, TICKET_CREW_PATHS),
+    }
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        queryset = self.queryset.filter(user=self.request.user)
+        return self.shape_queryset(queryset)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class ItineraryViewSet(viewsets.ViewSet):
+    """Search connecting flights for everyone"""
+    permission_classes = (AllowAny,)
+
+    def list(self, request):
+        search = ItinerarySearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        params = search.validated_data
+
+        start = start_of_day(params["date"])
+        end = start_of_day(params["date"] + timedelta(days=1))
+        network = FlightNetwork.from_database(start, end, params["seats"])
+        itineraries = network.search(
+            params["from"].id,
+            params["to"].id,
+            start,
+            end,
+            max_legs=params["max_legs"],
+            min_connection=timedelta(minutes=params["min_connection"]),
+            max_connection=timedelta(minutes=params["max_connection"]),
+            sort=params["sort"],
+            limit=params["limit"],
+        )
+        return Response(ItinerarySerializer(itineraries, many=True).data)
+
+
+class ChangeLogViewSet(viewsets.ViewSet):
+    """Follow flight, route, airplane, ticket and seat hold changes as admin"""
+    permission_classes = (IsAdminUser,)
+    authentication_classes = (JWTAuthentication,)
+
+    def list(self, request):
+        query = ChangeFeedQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        changes, cursor, has_more = read_changes(
+            query.validated_data["since"], query.validated_data["limit"]
+        )
+        return Response({
+            "changes": ChangeLogEntrySerializer(
+                add_available_seats(changes), many=True
+            ).data,
+            "cursor": cursor,
+            "has_more": has_more,
+        })
+
+
+MAX_STREAMED_FLIGHTS = 50
+
+
+async def flight_availability_stream(request):
+    """Server-sent events with the available seats of ?flights=1,2,...
+
+    Sends the current seats of every flight first, then one event per
+    change while the connection stays open. Only served by the ASGI
+    application, a WSGI worker would be held by the stream for good.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(
+            "Availability streams need the ASGI application", status=501
+        )
+    try:
+        flight_ids = {
+            int(flight_id)
+            for flight_id in request.GET.get("flights", "").split(",")
+        }
+    except ValueError:
+        return HttpResponseBadRequest("flights must be comma separated ids")
+    if len(flight_ids) > MAX_STREAMED_FLIGHTS:
+        return HttpResponseBadRequest(
+            f"At most {MAX_STREAMED_FLIGHTS} flights can be streamed"
+        )
+
+    async def events():
+        # Subscribe first so no change between the snapshot and the
+        # subscription gets lost
+        subscription = hub.subscribe(flight_ids)
+        keepalive = settings.AVAILABILITY_KEEPALIVE.total_seconds()
+        try:
+            seats = await sync_to_async(watch_availability)(flight_ids)
+            for flight_id, available in sorted(seats.items()):
+                yield availability_event(flight_id, available)
+            while True:
+                try:
+                    flight_id, available = await asyncio.wait_for(
+                        subscription.queue.get(), keepalive
+                    )
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if seats.get(flight_id) != available:
+                    seats[flight_id] = available
+                    yield availability_event(flight_id, available)
+        finally:
+            hub.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(
+        events(), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def availability_event(flight_id, seats):
+    data = json.dumps({"flight": flight_id, "available_seats": seats})
+    return f"event: availability\ndata: {data}\n\n"
@@ -0,0 +1,14 @@
+"""
+URL configuration for requests served over ASGI.
+
+Routes the public read endpoints to their async views, everything else
+goes to ROOT_URLCONF like under WSGI.
+"""
+from django.urls import path, include
+
+from airport_service.urls import urlpatterns as root_urlpatterns
+
+urlpatterns = [
+    path("api/airport/", include("airport.async_urls")),
+    *root_urlpatterns,
+]
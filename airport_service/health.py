@@ -0,0 +1,29 @@
+from django.core.cache import cache
+from django.db import connections
+from django.db.utils import DatabaseError
+from django.http import JsonResponse
+
+
+def health(request):
+    """Liveness and readiness for load balancers and container checks
+
+    Answers 503 while the database or the cache can't be reached.
+    """
+    checks = {}
+    try:
+        with connections["default"].cursor() as cursor:
+            cursor.execute("SELECT 1")
+        checks["database"] = "ok"
+    except DatabaseError:
+        checks["database"] = "unavailable"
+    try:
+        cache.get("airport:health")
+        checks["cache"] = "ok"
+    except Exception:
+        checks["cache"] = "unavailable"
+
+    healthy = all(state == "ok" for state in checks.values())
+    return JsonResponse(
+        {"status": "ok" if healthy else "unavailable", **checks},
+        status=200 if healthy else 503,
+    )
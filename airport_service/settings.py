@@ -71,6 +71,7 @@ SPECTACULAR_SETTINGS = {
 }
 
 MIDDLEWARE = [
+    "airport.middleware.asgi_urlconf_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -83,6 +84,9 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "airport_service.urls"
 
+# Routes the public read endpoints to async views under an ASGI server
+ASGI_URLCONF = "airport_service.asgi_urls"
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -141,6 +145,42 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": False,
 }
 
+SEAT_HOLD_TTL = timedelta(minutes=10)
+
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
+# A few times the longest request, a key claimed by a request that never
+# finished, like one of a killed worker, is taken over after this long
+IDEMPOTENCY_CLAIM_TIMEOUT = timedelta(minutes=2)
+
+# Also keep serialized airports and airplanes in the default cache, useful
+# with a backend shared by all workers such as Redis or Memcached
+REFERENCE_CACHE_SHARED = False
+
+REFERENCE_CACHE_TTL = timedelta(days=1)
+
+# Public flight responses are rebuilt after this long even if unchanged,
+# as seat holds expire without notice
+RESPONSE_CACHE_FRESH_TTL = timedelta(seconds=30)
+
+# Outdated responses are served while one worker rebuilds them
+RESPONSE_CACHE_STALE_TTL = timedelta(minutes=10)
+
+CHANGE_LOG_RETENTION = timedelta(days=30)
+
+# Longest expected write transaction, the change feed waits this long for
+# a change log entry with a lower id to commit before skipping past it.
+# Entries of transactions committing later are never read, raise it with
+# any longer writes, at the cost of readers waiting as long on rollbacks
+CHANGE_FEED_SETTLE = timedelta(seconds=30)
+
+# How often a worker with availability streams open polls the change log
+# for seats other workers sold or freed, None with a single worker
+AVAILABILITY_POLL_INTERVAL = None
+
+# Comment sent on idle availability streams to keep proxies from closing them
+AVAILABILITY_KEEPALIVE = timedelta(seconds=15)
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
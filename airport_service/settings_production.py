@@ -0,0 +1,63 @@
+"""
+Django settings for running airport_service in production.
+
+Extends settings.py with debugging off, without the development only
+apps and with persistent database connections. Selected with
+DJANGO_SETTINGS_MODULE=airport_service.settings_production, see
+entrypoint.sh and gunicorn.conf.py.
+"""
+
+import os
+from datetime import timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+
+from airport_service.settings import *  # noqa: F401,F403
+from airport_service.settings import DATABASES, INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS", "localhost").split(",")
+
+DEVELOPMENT_APPS = ("debug_toolbar",)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEVELOPMENT_APPS]
+
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware.split(".")[0] not in DEVELOPMENT_APPS
+]
+
+# Workers keep their connection between requests, checked before reuse
+# so a restarted database doesn't fail the first request. Set to 0 when
+# serving over ASGI, see README.
+DATABASES = {
+    **DATABASES,
+    "default": {
+        **DATABASES["default"],
+        "CONN_MAX_AGE": int(os.environ.get("DJANGO_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+    },
+}
+
+# Data set versions and cached responses have to be shared by the
+# workers, the default local memory cache would keep them per process
+# and leave every worker but the writing one serving stale data
+if not os.environ.get("REDIS_URL"):
+    raise ImproperlyConfigured(
+        "Set REDIS_URL, the production workers need a shared cache."
+    )
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
+}
+
+REFERENCE_CACHE_SHARED = True
+
+# Several workers serve availability streams, each has to see the seats
+# the others sold
+AVAILABILITY_POLL_INTERVAL = timedelta(seconds=1)
@@ -0,0 +1,16 @@
+#!/bin/sh
+# Production entrypoint: migrate, then serve with gunicorn.conf.py
+set -e
+
+export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:-airport_service.settings_production}"
+export GUNICORN_WORKER_CLASS="${GUNICORN_WORKER_CLASS:-gthread}"
+
+python manage.py wait_for_db
+python manage.py migrate --noinput
+
+if [ "$GUNICORN_WORKER_CLASS" = "uvicorn.workers.UvicornWorker" ]; then
+    # Persistent connections are not reused across async requests
+    export DJANGO_CONN_MAX_AGE="${DJANGO_CONN_MAX_AGE:-0}"
+    exec gunicorn airport_service.asgi:application
+fi
+exec gunicorn airport_service.wsgi:application
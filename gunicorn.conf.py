@@ -0,0 +1,45 @@
+"""Gunicorn settings for the production profile, see entrypoint.sh"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Threaded workers serve airport_service.wsgi, each thread keeps its
+# database connection for CONN_MAX_AGE. uvicorn.workers.UvicornWorker
+# serves airport_service.asgi instead, which the availability stream and
+# the async read views need, see entrypoint.sh
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Database connections the workers may hold at once. The default 80
+# leaves 20 of PostgreSQL's default max_connections = 100 to the
+# airport-stream service, migrations and maintenance. Raise it together
+# with max_connections, or behind a pooler like PgBouncer
+db_max_connections = int(os.environ.get("DJANGO_DB_MAX_CONNECTIONS", 80))
+# Uvicorn workers run the sync ORM calls on one thread each
+worker_connections = (
+    1 if worker_class == "uvicorn.workers.UvicornWorker" else threads
+)
+
+# Preforking workers sized to the cores, the usual 2 * cores + 1 keeps a
+# core busy while other workers wait on the database, as far as the
+# connection budget allows. GUNICORN_WORKERS overrides both
+default_workers = min(
+    multiprocessing.cpu_count() * 2 + 1,
+    db_max_connections // worker_connections,
+)
+workers = int(os.environ.get("GUNICORN_WORKERS", max(default_workers, 1)))
+
+# Loads Django once before forking, workers share the imported code
+preload_app = True
+
+# Recycles workers now and then, in case anything grows without bound
+max_requests = 1000
+max_requests_jitter = 100
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"